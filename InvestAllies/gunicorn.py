@@ -0,0 +1,23 @@
+"""gunicorn settings: load and warm the app once in the master, then fork.
+
+    gunicorn -c python:InvestAllies.gunicorn InvestAllies.wsgi:application
+
+With `preload_app`, importing `InvestAllies.wsgi` in the master runs
+`app.warmup.warm_up()` (URLs, templates, catalogs, caches, then
+`gc.freeze()`), so every worker starts warm and shares those pages.
+Point the load balancer's readiness check at `/ready/`. Each start begins
+with empty `/metrics` counters.
+"""
+
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+preload_app = True
+
+
+def on_starting(server) -> None:
+    # Runs after the preloaded app, so Django is configured
+    from app import metrics
+
+    metrics.clear()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,10 +46,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Static files bypass the whole stack (only with STATIC_SERVE)
+    "app.middleware.StaticFilesMiddleware",
+    # Outermost otherwise, so its timings cover the rest of the stack
+    "app.middleware.RequestTimingMiddleware",
+    "app.middleware.RateLimitMiddleware",
+    "app.middleware.PrimaryDatabaseMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     # LocaleMiddleware must come after SessionMiddleware
     "django.middleware.locale.LocaleMiddleware",
+    "app.middleware.PreloadLinkMiddleware",
+    "app.middleware.DisplayCurrencyMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -60,7 +69,8 @@ ROOT_URLCONF = "InvestAllies.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Stock Django backend that also records render time per request
+        "BACKEND": "app.timing.DjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -82,12 +92,61 @@ WSGI_APPLICATION = "InvestAllies.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# SQLite tuned for a web server: WAL so readers never wait for the writer,
+# writers queue on busy_timeout instead of failing, and transactions take the
+# write lock up front (no deadlock when a read transaction starts writing).
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64_000,  # KiB, i.e. 64 MB of page cache per connection
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": 5_000,  # ms
+    "temp_store": "MEMORY",
+}
+# Read-only connections must not try to change the journal mode
+SQLITE_REPLICA_PRAGMAS = {
+    **{k: v for k, v in SQLITE_PRAGMAS.items() if k != "journal_mode"},
+    "query_only": "ON",
+}
+# Seconds to keep a connection open between requests (0 = per request)
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", "600"))
+DB_PATH = Path(os.environ.get("DB_PATH", BASE_DIR / "db.sqlite3"))
+# Optional read-only copy (or the primary file itself, opened read-only);
+# reads go there through app.routers.PrimaryReplicaRouter
+DB_REPLICA_PATH = os.environ.get("DB_REPLICA_PATH")
+
+
+def _pragmas(pragmas):
+    return ";".join(f"PRAGMA {name}={value}" for name, value in pragmas.items())
+
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": DB_PATH,
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": _pragmas(SQLITE_PRAGMAS),
+            "transaction_mode": "IMMEDIATE",
+            "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000,
+        },
     }
 }
+if DB_REPLICA_PATH:
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": f"file:{DB_REPLICA_PATH}?mode=ro",
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"init_command": _pragmas(SQLITE_REPLICA_PRAGMAS)},
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["app.routers.PrimaryReplicaRouter"]
+# Requests under these paths, and every non-GET/HEAD request, read from the
+# primary so they see their own writes
+DB_PRIMARY_PATHS = ("/admin/",)
 
 
 # Password validation
@@ -144,6 +203,8 @@ MODELTRANSLATION_LANGUAGES = (
     "ar",
     "zh-hans",
 )  # Idiomas soportados
+# Languages of LANGUAGES missing above have no translation columns: their
+# model translations are `Translation` rows (see app/sparse_translations.py).
 
 TIME_ZONE = "UTC"
 
@@ -155,7 +216,7 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
-STATIC_URL = "static/"
+STATIC_URL = os.environ.get("STATIC_URL", "static/")
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
 MEDIA_URL = "/media/"
@@ -163,6 +224,101 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# collectstatic writes content-hashed names plus .gz/.br variants (see
+# app/staticfiles.py). Set STATIC_URL to the CDN's origin when there is one.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "app.staticfiles.PrecompressedManifestStorage"},
+}
+# Serve STATIC_ROOT from the app when no CDN or web server does
+STATIC_SERVE = os.environ.get("STATIC_SERVE", "1") == "1"
+
+# Public origin used to build absolute URLs (sitemaps, feeds)
+SITE_URL = os.environ.get("SITE_URL", "http://localhost:8000")
+
+# Generated sitemap index and gzip shards (see `manage.py build_sitemaps`)
+SITEMAP_ROOT = MEDIA_ROOT / "sitemaps"
+
+# Run app.warmup.warm_up() when InvestAllies.wsgi/asgi is imported, so a
+# worker only takes traffic (and /ready/ only answers 200) once it is warm
+WARMUP_ON_LOAD = os.environ.get("WARMUP_ON_LOAD", "1") == "1"
+
+# Subscribe/lead submissions are queued and bulk-inserted by a background
+# thread every LEAD_FLUSH_INTERVAL seconds (0 = write inline), see app/leads.py
+LEAD_FLUSH_INTERVAL = float(os.environ.get("LEAD_FLUSH_INTERVAL", "1.0"))
+LEAD_BATCH_SIZE = 500
+
+# Portfolio projections (see app/portfolio.py): Monte-Carlo paths per
+# projection, capped so paths x years x holdings <= PORTFOLIO_MAX_DRAWS, which
+# bounds the CPU time of one request (~20 ms at 500k); yearly volatility of
+# every object's return and correlation between objects.
+PORTFOLIO_PATHS = 5_000
+PORTFOLIO_MAX_DRAWS = 500_000
+PORTFOLIO_VOLATILITY = 0.15
+PORTFOLIO_CORRELATION = 0.3
+
+# Display currencies (see app/fx.py): rates per USD from FX_PROVIDER, which
+# each worker re-checks for changes every FX_CHECK_INTERVAL seconds
+FX_PROVIDER = "app.fx.FileRateProvider"
+FX_RATES_FILE = Path(
+    os.environ.get("FX_RATES_FILE", BASE_DIR / "app" / "fx_rates.json")
+)
+FX_CHECK_INTERVAL = 10.0
+FX_DEFAULT_CURRENCY = os.environ.get("FX_DEFAULT_CURRENCY", "USD")
+
+# Token buckets per client IP for expensive public routes (see app/ratelimit.py):
+# `burst` requests at once, refilled at `rate` per second.
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMITS = {
+    "app:search": {"rate": 0.5, "burst": 20},
+    "app:subscribe": {"rate": 0.1, "burst": 5},
+    "app:portfolio": {"rate": 1.0, "burst": 30},
+}
+# "memory" (per worker) or "sqlite" (shared by all workers on the host)
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SQLITE_PATH = BASE_DIR / "ratelimit.sqlite3"
+# Number of trusted proxies in front of the app; the client is then the
+# address that many X-Forwarded-For entries from the right (0: REMOTE_ADDR)
+RATE_LIMIT_TRUST_FORWARDED = int(os.environ.get("RATE_LIMIT_TRUST_FORWARDED", "0"))
+
+# Prometheus metrics at /metrics (see app/metrics.py): every worker adds its
+# request counters to METRICS_DIR/<pid>.db and the endpoint sums the files
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+METRICS_DIR = Path(
+    os.environ.get("METRICS_DIR", Path(tempfile.gettempdir()) / "investallies-metrics")
+)
+# Peer addresses allowed to scrape /metrics directly, not through a proxy
+METRICS_ALLOWED_IPS = os.environ.get("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",")
+
+# Logging: request threads only enqueue records; a listener thread writes
+# them to stdout as JSON lines (see app/log.py).
+# Share (0..1) of INFO/DEBUG records kept per URL name, e.g. {"app:home": 0.1}
+LOG_SAMPLE_RATES = {}
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "sampling": {"()": "app.log.RouteSampler", "rates": LOG_SAMPLE_RATES},
+    },
+    "formatters": {
+        "json": {"()": "app.log.JsonFormatter"},
+    },
+    "handlers": {
+        "stdout": {"class": "logging.StreamHandler", "formatter": "json"},
+        "queue": {
+            "class": "app.log.QueueHandler",
+            "handlers": ["stdout"],
+            "filters": ["sampling"],
+        },
+    },
+    "loggers": {
+        "app": {"handlers": ["queue"], "level": LOG_LEVEL, "propagate": False},
+        "django": {"handlers": ["queue"], "level": "WARNING", "propagate": False},
+    },
+}
+
 CKEDITOR_UPLOAD_PATH = "uploads/"
 CKEDITOR_CONFIGS = {
     "default": {
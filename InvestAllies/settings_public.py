@@ -0,0 +1,23 @@
+"""Settings for workers that only serve the public site.
+
+Same as `InvestAllies.settings` without the admin-only apps: the admin (and
+so the autodiscovery of `app/admin.py`, which pulls in import_export and the
+export/import machinery), import_export and CKEditor. URLs come from
+`InvestAllies.urls_public`, so `/admin/` and `/ckeditor/` are 404s here and
+must be routed to workers running the full settings. (modeltranslation
+still imports the `django.contrib.admin` package itself; no admin site or
+ModelAdmin is built.)
+
+    DJANGO_SETTINGS_MODULE=InvestAllies.settings_public gunicorn ...
+
+Compare the two profiles with `manage.py benchmark_startup`.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS
+
+ADMIN_ONLY_APPS = ("django.contrib.admin", "import_export", "ckeditor")
+
+INSTALLED_APPS = [name for name in INSTALLED_APPS if name not in ADMIN_ONLY_APPS]
+
+ROOT_URLCONF = "InvestAllies.urls_public"
@@ -18,9 +18,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from .urls_public import urlpatterns as public_urlpatterns
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("ckeditor/", include("ckeditor_uploader.urls")),
-    path("i18n/", include("django.conf.urls.i18n")),
-    path("", include("app.urls", namespace="app")),
+    *public_urlpatterns,
 ]
@@ -0,0 +1,24 @@
+"""URLs of the public site, without the admin and the CKEditor uploader.
+
+`InvestAllies.settings_public` serves these alone; `InvestAllies.urls` adds
+the admin-only ones on top.
+
+The pages of `app.urls` live under a language prefix (`/es/articles/<slug_es>/`),
+so every URL has exactly one representation and responses need not vary on
+the cookie or `Accept-Language`. `LocaleMiddleware` redirects an unprefixed
+URL to the prefix of the negotiated language; the views redirect a slug of
+another language to the active language's one.
+"""
+
+from django.conf.urls.i18n import i18n_patterns
+from django.urls import include, path
+
+from app import views as app_views
+
+urlpatterns = [
+    path("sitemap.xml", app_views.sitemap_index, name="sitemap_index"),
+    path("sitemaps/<str:name>", app_views.sitemap_shard, name="sitemap_shard"),
+    path("i18n/", include("django.conf.urls.i18n")),
+    path("ready/", app_views.ready, name="ready"),
+    path("metrics", app_views.metrics, name="metrics"),
+] + i18n_patterns(path("", include("app.urls", namespace="app")))
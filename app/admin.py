@@ -1,4 +1,6 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.contenttypes.admin import GenericTabularInline
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 
@@ -12,17 +14,24 @@ except ImportError:
 
 from modeltranslation.admin import TranslationAdmin
 
+from .changelists import ArticleSearchMixin, FastChangeListMixin
+from .exports import StreamingExportMixin
+from .imports import BulkImportMixin
+
 from .models import (
     Article,
     ArticleCategory,
     Country,
     FuelPrice,
+    ImportJob,
     InvestmentObject,
     LandingPage,
     Lead,
     MetalPrice,
     Service,
+    Translation,
 )
+from .sparse_translations import sparse_languages, translated_fields
 
 admin.site.site_header = "Invest Allies"
 admin.site.site_title = "Invest Allies admin"
@@ -75,7 +84,9 @@ class FuelPriceResource(resources.ModelResource):
 
 
 @admin.register(Country)
-class CountryAdmin(TranslationAdmin, ImportExportModelAdmin, admin.ModelAdmin):
+class CountryAdmin(
+    StreamingExportMixin, TranslationAdmin, ImportExportModelAdmin, admin.ModelAdmin
+):
     resource_class = CountryResource
     list_display = ("name", "slug", "active")
     search_fields = ("name", "slug")
@@ -83,7 +94,9 @@ class CountryAdmin(TranslationAdmin, ImportExportModelAdmin, admin.ModelAdmin):
 
 
 @admin.register(Service)
-class ServiceAdmin(TranslationAdmin, ImportExportModelAdmin, admin.ModelAdmin):
+class ServiceAdmin(
+    StreamingExportMixin, TranslationAdmin, ImportExportModelAdmin, admin.ModelAdmin
+):
     resource_class = ServiceResource
     list_display = ("title", "slug", "active")
     search_fields = ("title", "slug")
@@ -91,17 +104,55 @@ class ServiceAdmin(TranslationAdmin, ImportExportModelAdmin, admin.ModelAdmin):
 
 
 @admin.register(ArticleCategory)
-class ArticleCategoryAdmin(TranslationAdmin, ImportExportModelAdmin, admin.ModelAdmin):
+class ArticleCategoryAdmin(
+    StreamingExportMixin, TranslationAdmin, ImportExportModelAdmin, admin.ModelAdmin
+):
     resource_class = ArticleCategoryResource
     list_display = ("name", "slug")
     search_fields = ("name", "slug")
 
 
+class TranslationInline(GenericTabularInline):
+    """Texts in the languages without columns (app/sparse_translations.py)."""
+
+    model = Translation
+    extra = 0
+
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        if db_field.name == "field":
+            choices = [(f, f) for f in translated_fields(self.parent_model)]
+            kwargs["widget"] = forms.Select(choices=choices)
+        elif db_field.name == "language":
+            choices = [(c, c) for c in sparse_languages()]
+            kwargs["widget"] = forms.Select(choices=choices)
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
+
+
+class SparseTranslationAdminMixin:
+    """Show `TranslationInline` once a language is stored as rows."""
+
+    def get_inlines(self, request, obj):
+        inlines = list(super().get_inlines(request, obj))
+        if sparse_languages():
+            inlines.append(TranslationInline)
+        return inlines
+
+
 @admin.register(Article)
-class ArticleAdmin(TranslationAdmin, ImportExportModelAdmin, admin.ModelAdmin):
+class ArticleAdmin(
+    SparseTranslationAdminMixin,
+    ArticleSearchMixin,
+    BulkImportMixin,
+    StreamingExportMixin,
+    TranslationAdmin,
+    ImportExportModelAdmin,
+    admin.ModelAdmin,
+):
     resource_class = ArticleResource
     list_display = ("title", "category", "country", "publish", "created_at")
-    search_fields = ("title", "content")
+    list_select_related = ("category", "country")
+    search_fields = ("title", "slug")
+    deep_search_fields = ("content",)
     list_filter = ("publish", "category", "country")
     date_hierarchy = "created_at"
     fieldsets = (
@@ -137,17 +188,27 @@ class ArticleAdmin(TranslationAdmin, ImportExportModelAdmin, admin.ModelAdmin):
 
 
 @admin.register(InvestmentObject)
-class InvestmentObjectAdmin(ImportExportModelAdmin, admin.ModelAdmin):
+class InvestmentObjectAdmin(
+    BulkImportMixin, StreamingExportMixin, ImportExportModelAdmin, admin.ModelAdmin
+):
     resource_class = InvestmentObjectResource
     list_display = ("title", "country", "price", "expected_roi", "active")
+    list_select_related = ("country",)
     search_fields = ("title", "description")
     list_filter = ("country", "active")
 
 
 @admin.register(LandingPage)
-class LandingPageAdmin(TranslationAdmin, ImportExportModelAdmin, admin.ModelAdmin):
+class LandingPageAdmin(
+    SparseTranslationAdminMixin,
+    StreamingExportMixin,
+    TranslationAdmin,
+    ImportExportModelAdmin,
+    admin.ModelAdmin,
+):
     resource_class = LandingPageResource
     list_display = ("slug", "title", "service", "publish")
+    list_select_related = ("service",)
     search_fields = ("slug", "title")
     list_filter = ("publish",)
     fieldsets = (
@@ -170,16 +231,21 @@ class LandingPageAdmin(TranslationAdmin, ImportExportModelAdmin, admin.ModelAdmi
 
 
 @admin.register(Lead)
-class LeadAdmin(ImportExportModelAdmin, admin.ModelAdmin):
+class LeadAdmin(
+    FastChangeListMixin, StreamingExportMixin, ImportExportModelAdmin, admin.ModelAdmin
+):
     resource_class = LeadResource
     list_display = ("name", "email", "phone", "source", "created_at")
-    search_fields = ("name", "email", "phone", "message")
+    search_fields = ("name", "email", "phone")
+    deep_search_fields = ("message",)
     list_filter = ("source",)
     readonly_fields = ("created_at",)
 
 
 @admin.register(MetalPrice)
-class MetalPriceAdmin(ImportExportModelAdmin, admin.ModelAdmin):
+class MetalPriceAdmin(
+    FastChangeListMixin, StreamingExportMixin, ImportExportModelAdmin, admin.ModelAdmin
+):
     resource_class = MetalPriceResource
     list_display = ("metal", "price", "timestamp")
     list_filter = ("metal",)
@@ -187,8 +253,34 @@ class MetalPriceAdmin(ImportExportModelAdmin, admin.ModelAdmin):
 
 
 @admin.register(FuelPrice)
-class FuelPriceAdmin(ImportExportModelAdmin, admin.ModelAdmin):
+class FuelPriceAdmin(
+    FastChangeListMixin, StreamingExportMixin, ImportExportModelAdmin, admin.ModelAdmin
+):
     resource_class = FuelPriceResource
     list_display = ("fuel_type", "price", "currency", "timestamp")
     list_filter = ("fuel_type", "currency")
     date_hierarchy = "timestamp"
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "resource",
+        "status",
+        "progress_display",
+        "created",
+        "updated",
+        "failed",
+        "created_at",
+    )
+    list_filter = ("status", "resource")
+    readonly_fields = [f.name for f in ImportJob._meta.fields] + ["progress_display"]
+
+    @admin.display(description="Progress")
+    def progress_display(self, obj: ImportJob) -> str:
+        return f"{obj.processed}/{obj.total} ({obj.progress}%)"
+
+    def has_add_permission(self, request):
+        # Jobs are created from the Article / InvestmentObject changelists
+        return False
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AppConfig(AppConfig):
@@ -19,3 +20,9 @@ class AppConfig(AppConfig):
             # allow the app to still initialize; the import error will be surfaced
             # when translations are actually required.
             pass
+
+        from . import signals  # noqa: F401
+        from .search import install_after_migrate
+
+        # (Re)install the article full-text index and its triggers
+        post_migrate.connect(install_after_migrate, sender=self)
@@ -0,0 +1,205 @@
+"""Per-country statistics kept up to date as articles and objects change.
+
+`CountryStats` holds what the investments index and the country pages show
+about a country: its published articles (count, newest date) and active
+investment objects (count, price range and sums for the averages).
+
+`app/signals.py` calls `article_changed` / `object_changed` with a row's
+share of its country's stats before and after every save or delete. Counts
+and sums move by the difference, with one `UPDATE`; the minimum, maximum and
+newest date are recomputed for that country, in the same statement, only
+when the value that left was the extreme.
+
+`bulk_create` and `QuerySet.update()` send no signals: run `rebuild()`
+(`manage.py rebuild_country_stats`) after bulk loads. It recomputes every
+country from two grouped queries. Until then the stats have drifted, so
+counts never go below zero on the way down: deleting a row the stats never
+counted must still work.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    PositiveIntegerField,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from .models import Article, Country, CountryStats, InvestmentObject
+
+
+class ArticleShare(NamedTuple):
+    country_id: int
+    created_at: datetime
+
+
+class ObjectShare(NamedTuple):
+    country_id: int
+    price: Optional[Decimal]
+    roi: Decimal
+
+
+def article_share(
+    country_id: Optional[int], publish: bool, created_at: datetime
+) -> Optional[ArticleShare]:
+    """What an article adds to its country's stats, if anything."""
+    if not publish or country_id is None:
+        return None
+    return ArticleShare(country_id, created_at)
+
+
+def object_share(
+    country_id: Optional[int],
+    active: bool,
+    price: Optional[Decimal],
+    expected_roi: Decimal,
+) -> Optional[ObjectShare]:
+    """What an investment object adds to its country's stats, if anything."""
+    if not active or country_id is None:
+        return None
+    return ObjectShare(country_id, price, expected_roi)
+
+
+def _ensure(country_id: int) -> None:
+    CountryStats.objects.bulk_create(
+        [CountryStats(country_id=country_id)], ignore_conflicts=True
+    )
+
+
+def _recompute_if(column: str, value, aggregate) -> Case:
+    """`column` unchanged, or `aggregate` of the country when it was `value`."""
+    return Case(When(**{column: value}, then=aggregate), default=F(column))
+
+
+def _decrement(column: str) -> Greatest:
+    """`column` - 1, but not below 0 (the column's CHECK constraint)."""
+    return Greatest(F(column) - 1, Value(0), output_field=PositiveIntegerField())
+
+
+def _objects_of_country():
+    return InvestmentObject.objects.filter(
+        country=OuterRef("country_id"), active=True
+    ).values("country")
+
+
+def article_changed(old: Optional[ArticleShare], new: Optional[ArticleShare]) -> None:
+    if old == new:
+        return
+    if old is not None:
+        newest = Subquery(
+            Article.objects.filter(country=OuterRef("country_id"), publish=True)
+            .order_by("-created_at")
+            .values("created_at")[:1]
+        )
+        CountryStats.objects.filter(pk=old.country_id).update(
+            article_count=_decrement("article_count"),
+            latest_article_at=_recompute_if(
+                "latest_article_at", old.created_at, newest
+            ),
+        )
+    if new is not None:
+        _ensure(new.country_id)
+        created_at = Value(new.created_at)
+        CountryStats.objects.filter(pk=new.country_id).update(
+            article_count=F("article_count") + 1,
+            latest_article_at=Greatest(
+                Coalesce(F("latest_article_at"), created_at), created_at
+            ),
+        )
+
+
+def object_changed(old: Optional[ObjectShare], new: Optional[ObjectShare]) -> None:
+    if old == new:
+        return
+    if old is not None:
+        changes = {
+            "object_count": _decrement("object_count"),
+            "roi_sum": F("roi_sum") - old.roi,
+        }
+        if old.price is not None:
+            prices = _objects_of_country().annotate(low=Min("price"), high=Max("price"))
+            changes.update(
+                priced_count=_decrement("priced_count"),
+                price_sum=F("price_sum") - old.price,
+                price_min=_recompute_if(
+                    "price_min", old.price, Subquery(prices.values("low"))
+                ),
+                price_max=_recompute_if(
+                    "price_max", old.price, Subquery(prices.values("high"))
+                ),
+            )
+        CountryStats.objects.filter(pk=old.country_id).update(**changes)
+    if new is not None:
+        _ensure(new.country_id)
+        changes = {
+            "object_count": F("object_count") + 1,
+            "roi_sum": F("roi_sum") + new.roi,
+        }
+        if new.price is not None:
+            price = Value(new.price)
+            changes.update(
+                priced_count=F("priced_count") + 1,
+                price_sum=F("price_sum") + new.price,
+                price_min=Least(Coalesce(F("price_min"), price), price),
+                price_max=Greatest(Coalesce(F("price_max"), price), price),
+            )
+        CountryStats.objects.filter(pk=new.country_id).update(**changes)
+
+
+def rebuild(country_ids: Iterable[int] | None = None) -> int:
+    """Recompute the stats of `country_ids` (default: every country); return
+    the number of rows written."""
+    countries = Country._base_manager.all()
+    articles = Article._base_manager.filter(publish=True, country__isnull=False)
+    objects = InvestmentObject._base_manager.filter(active=True)
+    if country_ids is not None:
+        country_ids = list(country_ids)
+        countries = countries.filter(pk__in=country_ids)
+        articles = articles.filter(country__in=country_ids)
+        objects = objects.filter(country__in=country_ids)
+    by_country: Dict[int, CountryStats] = {
+        pk: CountryStats(country_id=pk) for pk in countries.values_list("pk", flat=True)
+    }
+    for row in articles.values("country").annotate(
+        count=Count("pk"), latest=Max("created_at")
+    ):
+        stats = by_country[row["country"]]
+        stats.article_count = row["count"]
+        stats.latest_article_at = row["latest"]
+    for row in objects.values("country").annotate(
+        count=Count("pk"),
+        priced=Count("price"),
+        total=Sum("price"),
+        low=Min("price"),
+        high=Max("price"),
+        roi=Sum("expected_roi"),
+    ):
+        stats = by_country[row["country"]]
+        stats.object_count = row["count"]
+        stats.priced_count = row["priced"]
+        stats.price_sum = row["total"] or 0
+        stats.price_min = row["low"]
+        stats.price_max = row["high"]
+        stats.roi_sum = row["roi"]
+    CountryStats._base_manager.bulk_create(
+        by_country.values(),
+        update_conflicts=True,
+        unique_fields=["country"],
+        update_fields=[
+            f.name for f in CountryStats._meta.concrete_fields if not f.primary_key
+        ],
+    )
+    return len(by_country)
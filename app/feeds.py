@@ -0,0 +1,129 @@
+"""Per-language Atom feeds of the latest articles per category and country.
+
+A feed is identified by its language (the URL prefix), its category or
+country, the name it is titled with and a cheap "stamp" (published article
+count plus newest `updated_at`). Together they are the ETag and the cache key,
+so a rendered feed is reused until the category or country is renamed or an
+article in it is saved or deleted, and polling clients that already hold the
+current version get a bodyless 304.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, List
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import Http404, HttpRequest, HttpResponse
+from django.urls import reverse
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed
+from modeltranslation.utils import (
+    build_localized_fieldname,
+    get_language,
+    resolution_order,
+)
+
+from .models import Article, ArticleCategory, Country
+from .timing import cache_get
+from .views import _get_by_slug_or_404
+
+FEED_MAX_ITEMS = 50
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_CONTENT_TYPE = "application/atom+xml; charset=utf-8"
+
+
+def _localized_columns(lang: str, *fields: str) -> List[str]:
+    """Return the translation columns needed to read `fields` in `lang`."""
+    langs = resolution_order(lang)
+    return [build_localized_fieldname(f, code) for f in fields for code in langs]
+
+
+class _ArticleFeed(Feed):
+    feed_type = Atom1Feed
+    lookup: str = ""
+
+    def get_object(self, request: HttpRequest, slug: str) -> Any:
+        return request.feed_object  # type: ignore[attr-defined]
+
+    def title(self, obj: Any) -> str:
+        return f"InvestAllies — {obj}"
+
+    def link(self, obj: Any) -> str:
+        return reverse("app:home")
+
+    def items(self, obj: Any):
+        # Only the columns the feed renders; `content` is never loaded.
+        columns = _localized_columns(
+            get_language(), "title", "slug", "meta_description"
+        )
+        return (
+            Article.objects.filter(publish=True, **{self.lookup: obj})
+            .order_by("-created_at")
+            .only("pk", "created_at", "updated_at", *columns)[:FEED_MAX_ITEMS]
+        )
+
+    def item_title(self, item: Article) -> str:
+        return item.title
+
+    def item_description(self, item: Article) -> str:
+        return item.meta_description
+
+    def item_link(self, item: Article) -> str:
+        return reverse("app:article_detail", kwargs={"slug": item.slug})
+
+    def item_pubdate(self, item: Article):
+        return item.created_at
+
+    def item_updateddate(self, item: Article):
+        return item.updated_at
+
+
+class CategoryFeed(_ArticleFeed):
+    lookup = "category"
+
+
+class CountryFeed(_ArticleFeed):
+    lookup = "country"
+
+
+def _serve_feed(
+    request: HttpRequest, feed: _ArticleFeed, model: type, slug: str
+) -> HttpResponse:
+    lang = translation.get_language()
+    if lang not in getattr(settings, "MODELTRANSLATION_LANGUAGES", ()):
+        # Languages stored as rows have no feed
+        raise Http404("Unknown language")
+    obj = _get_by_slug_or_404(model, slug)
+    stamp = Article.objects.filter(publish=True, **{feed.lookup: obj}).aggregate(
+        count=Count("pk"), modified=Max("updated_at")
+    )
+    version = (
+        f"{feed.lookup}:{obj.pk}:{lang}:{stamp['count']}:{stamp['modified']}:{obj}"
+    )
+    digest = hashlib.md5(version.encode(), usedforsecurity=False).hexdigest()
+    etag = f'"{digest}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        key = f"feed:{digest}"
+        body = cache_get(key)
+        if body is None:
+            request.feed_object = obj  # type: ignore[attr-defined]
+            body = feed(request, slug=slug).content
+            cache.set(key, body, FEED_CACHE_TIMEOUT)
+        response = HttpResponse(body, content_type=FEED_CONTENT_TYPE)
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=300)
+    return response
+
+
+def category_feed(request: HttpRequest, slug: str) -> HttpResponse:
+    return _serve_feed(request, CategoryFeed(), ArticleCategory, slug)
+
+
+def country_feed(request: HttpRequest, slug: str) -> HttpResponse:
+    return _serve_feed(request, CountryFeed(), Country, slug)
@@ -0,0 +1,100 @@
+from decimal import Decimal, InvalidOperation
+from typing import List, Optional, Tuple
+
+from django import forms
+
+from .portfolio import (
+    PORTFOLIO_DEFAULT_AMOUNT,
+    PORTFOLIO_DEFAULT_YEARS,
+    PORTFOLIO_MAX_HOLDINGS,
+    PORTFOLIO_MAX_YEARS,
+    Holding,
+)
+
+# Values accepted in the hidden `source` field of lead forms
+LEAD_SOURCES = ("form", "landing", "article", "header")
+
+
+class LeadForm(forms.Form):
+    """Public subscribe/contact form; only the email is mandatory.
+
+    A plain form rather than a ModelForm: validation must not query the
+    database, since the lead is written later by `app.leads.lead_writer`.
+    """
+
+    name = forms.CharField(max_length=150, required=False)
+    email = forms.EmailField()
+    phone = forms.CharField(max_length=50, required=False)
+    message = forms.CharField(required=False)
+    source = forms.CharField(max_length=50, required=False)
+
+    def clean_email(self) -> str:
+        return self.cleaned_data["email"].strip().lower()
+
+    def clean_source(self) -> str:
+        source = self.cleaned_data.get("source")
+        return source if source in LEAD_SOURCES else "form"
+
+
+_AMOUNT_LIMITS = {"min_value": Decimal("1"), "max_value": Decimal("1e12")}
+
+
+class ProjectionForm(forms.Form):
+    """Amount and horizon of the projection on an investment object's page."""
+
+    amount = forms.DecimalField(
+        decimal_places=2, initial=PORTFOLIO_DEFAULT_AMOUNT, **_AMOUNT_LIMITS
+    )
+    years = forms.IntegerField(
+        min_value=1, max_value=PORTFOLIO_MAX_YEARS, initial=PORTFOLIO_DEFAULT_YEARS
+    )
+
+    def values(self) -> Optional[Tuple[Decimal, int]]:
+        """Amount and years to project: the initial ones for an unbound form,
+        None for an invalid one."""
+        if not self.is_bound:
+            return self.fields["amount"].initial, self.fields["years"].initial
+        if not self.is_valid():
+            return None
+        return self.cleaned_data["amount"], self.cleaned_data["years"]
+
+
+class PortfolioForm(forms.Form):
+    """Query of the portfolio endpoint: `holdings=<object id>:<amount>,...`."""
+
+    holdings = forms.CharField(max_length=1000)
+    years = forms.IntegerField(
+        min_value=1, max_value=PORTFOLIO_MAX_YEARS, required=False
+    )
+
+    def clean_holdings(self) -> List[Holding]:
+        holdings = []
+        amount_field = forms.DecimalField(decimal_places=2, **_AMOUNT_LIMITS)
+        for item in self.cleaned_data["holdings"].split(","):
+            pk, _, amount = item.strip().partition(":")
+            try:
+                holdings.append(Holding(int(pk), amount_field.clean(amount)))
+            except (ValueError, InvalidOperation, forms.ValidationError):
+                raise forms.ValidationError(f"Invalid holding: {item!r}")
+        if len({h.object_id for h in holdings}) > PORTFOLIO_MAX_HOLDINGS:
+            raise forms.ValidationError(
+                f"At most {PORTFOLIO_MAX_HOLDINGS} objects per portfolio."
+            )
+        return holdings
+
+    def clean_years(self) -> int:
+        return self.cleaned_data["years"] or PORTFOLIO_DEFAULT_YEARS
+
+
+class BulkImportForm(forms.Form):
+    """Upload form of the admin's background bulk import."""
+
+    file = forms.FileField()
+    input_format = forms.ChoiceField(
+        choices=[("csv", "CSV"), ("xlsx", "XLSX"), ("json", "JSON")]
+    )
+    skip_diff = forms.BooleanField(
+        required=False,
+        initial=True,
+        help_text="Do not compute per-row diffs (much faster for large files).",
+    )
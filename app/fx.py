@@ -0,0 +1,261 @@
+"""Exchange rates, and prices converted to the visitor's display currency.
+
+Prices are stored in the currency they were entered in: `FuelPrice` has a
+`currency` column, `InvestmentObject` and `MetalPrice` prices are in
+`BASE_CURRENCY`. Pages show them in the display currency of the request
+(`display_currency()`: `?currency=XXX`, remembered in a cookie by
+`app.middleware.DisplayCurrencyMiddleware`).
+
+The rates come from `settings.FX_PROVIDER`; the default, `FileRateProvider`,
+reads `settings.FX_RATES_FILE`, a JSON file that a feed or an operator
+replaces. Each worker keeps them in a `RateTable`: codes plus one NumPy
+array of units per `BASE_CURRENCY`. It asks the provider whether they
+changed at most every `FX_CHECK_INTERVAL` seconds (for the file, one
+`stat()`), and reloads them when they did. A provider that fails is logged
+and retried an interval later; until then the last good rates stay.
+
+Listings are converted a batch at a time: `convert_prices()` looks every
+row's currency up, computes the batch's factors as one array, multiplies each
+amount in `Decimal` (so large amounts stay exact), and sets `display_price` (a
+`Money`) on each row; `converted()` does the same for lazily
+iterated (streamed) listings, one chunk at a time. Templates only print
+`display_price`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from itertools import islice
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+import numpy as np
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models import QuerySet
+from django.dispatch import receiver
+from django.http import HttpRequest
+from django.utils.module_loading import import_string
+
+from .streaming import STREAM_CHUNK_SIZE
+
+BASE_CURRENCY = "USD"
+FX_COOKIE_NAME = "currency"
+
+CENT = Decimal("0.01")
+
+logger = logging.getLogger(__name__)
+
+
+class Money(NamedTuple):
+    amount: Decimal
+    currency: str
+
+
+class FileRateProvider:
+    """Rates from a JSON file: `{"base": "USD", "as_of": "...", "rates":
+    {"EUR": "0.92", ...}}`, in units of each currency per unit of `base`.
+
+    A stand-in for a market data feed: anything that rewrites the file
+    (atomically, e.g. write and rename) updates every worker.
+    """
+
+    def __init__(self, path: Path | str | None = None) -> None:
+        self.path = Path(path or settings.FX_RATES_FILE)
+
+    def version(self) -> Hashable:
+        """Changes whenever the rates may have; cheap to call."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def fetch(self) -> Dict[str, Any]:
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("base", BASE_CURRENCY) != BASE_CURRENCY:
+            raise ValueError(f"{self.path}: rates must be per {BASE_CURRENCY}")
+        return data
+
+
+@dataclass(frozen=True)
+class RateTable:
+    codes: tuple
+    # Units of codes[i] per unit of BASE_CURRENCY
+    rates: np.ndarray
+    as_of: Optional[str] = None
+    index: Dict[str, int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "index", {c: i for i, c in enumerate(self.codes)})
+
+    @classmethod
+    def from_rates(cls, rates: Dict[str, Any], as_of: Optional[str] = None):
+        rates = {code.upper(): float(rate) for code, rate in rates.items()}
+        rates[BASE_CURRENCY] = 1.0
+        codes = tuple(sorted(rates))
+        return cls(codes, np.array([rates[c] for c in codes]), as_of)
+
+    def __contains__(self, code: object) -> bool:
+        return code in self.index
+
+    def convert(
+        self,
+        amounts: List[Optional[Decimal]],
+        currencies: List[str] | str,
+        target: str,
+    ) -> List[Optional[Money]]:
+        """`amounts` (each in `currencies`, or all in one) in `target`, in one
+        pass. An amount in a currency without a rate keeps its currency; a
+        missing amount stays None."""
+        if isinstance(currencies, str):
+            currencies = [currencies] * len(amounts)
+        sources = np.array([self.index.get(c, -1) for c in currencies], dtype=np.intp)
+        known = sources >= 0
+        factors = np.ones(len(amounts))
+        factors[known] = self.rates[self.index[target]] / self.rates[sources[known]]
+        prices: List[Optional[Money]] = []
+        for amount, factor, ok, currency in zip(
+            amounts, factors.tolist(), known.tolist(), currencies
+        ):
+            if amount is None:
+                prices.append(None)
+            elif ok:
+                # In Decimal: a float has ~16 significant digits
+                value = amount if factor == 1 else amount * Decimal(factor)
+                prices.append(Money(value.quantize(CENT), target))
+            else:
+                prices.append(Money(amount, currency))
+        return prices
+
+
+_lock = threading.Lock()
+_table: Optional[RateTable] = None
+_version: Hashable = None
+_checked_at = 0.0
+_provider: Any = None
+
+
+def _get_provider() -> Any:
+    global _provider
+    if _provider is None:
+        _provider = import_string(settings.FX_PROVIDER)()
+    return _provider
+
+
+def get_table() -> RateTable:
+    """The current rates; reloaded when the provider reports a change. If it
+    fails, the last good rates (or only the base currency), until the next
+    check."""
+    global _table, _version, _checked_at
+    now = time.monotonic()
+    if _table is not None and now - _checked_at < settings.FX_CHECK_INTERVAL:
+        return _table
+    with _lock:
+        _checked_at = now
+        try:
+            provider = _get_provider()
+            version = provider.version()
+            if _table is None or version != _version:
+                if version is None:
+                    # No rates at all: only the base currency
+                    _table = RateTable.from_rates({})
+                else:
+                    data = provider.fetch()
+                    _table = RateTable.from_rates(data["rates"], data.get("as_of"))
+                _version = version
+        except Exception:
+            logger.exception("Could not load exchange rates")
+            if _table is None:
+                _table = RateTable.from_rates({})
+                _version = None
+        return _table
+
+
+@receiver(setting_changed)
+def _reset(setting: str, **kwargs) -> None:
+    global _table, _provider
+    if setting.startswith("FX_"):
+        _table = _provider = None
+
+
+def requested_currency(request: HttpRequest) -> Optional[str]:
+    """A valid `?currency=` of the request, if any."""
+    code = request.GET.get("currency", "").upper()
+    return code if code in get_table() else None
+
+
+def display_currency(request: HttpRequest) -> str:
+    """The currency to show prices in for `request`. The response then
+    depends on the cookie (see `DisplayCurrencyMiddleware`)."""
+    request._display_currency_used = True  # type: ignore[attr-defined]
+    code = requested_currency(request)
+    if code is None:
+        code = request.COOKIES.get(FX_COOKIE_NAME, "").upper()
+    table = get_table()
+    if code not in table:
+        code = settings.FX_DEFAULT_CURRENCY
+    return code if code in table else BASE_CURRENCY
+
+
+def currency_context(request: HttpRequest) -> Dict[str, Any]:
+    """Template variables of the display currency selector in `base.html`."""
+    return {
+        "display_currency": display_currency(request),
+        "currencies": get_table().codes,
+    }
+
+
+def convert_prices(
+    rows: Iterable[Any],
+    target: str,
+    fields: Sequence[str] = ("price",),
+    currency_attr: Optional[str] = None,
+) -> List[Any]:
+    """Set `display_<field>` (a `Money`, or None) on every row for each of
+    its `fields`, which are in `currency_attr` (default: `BASE_CURRENCY`).
+    The whole batch is one conversion. Returns the rows."""
+    rows = list(rows)
+    amounts = [getattr(row, name) for row in rows for name in fields]
+    currencies = (
+        [getattr(row, currency_attr) for row in rows for _ in fields]
+        if currency_attr
+        else BASE_CURRENCY
+    )
+    prices = iter(get_table().convert(amounts, currencies, target))
+    for row in rows:
+        for name in fields:
+            setattr(row, f"display_{name}", next(prices))
+    return rows
+
+
+def converted(
+    items: Iterable[Any],
+    target: str,
+    fields: Sequence[str] = ("price",),
+    currency_attr: Optional[str] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[Any]:
+    """`convert_prices()` for a listing read lazily, `chunk_size` rows at a
+    time; querysets are read with `iterator()`."""
+    if isinstance(items, QuerySet):
+        items = items.iterator(chunk_size=chunk_size)
+    rows = iter(items)
+    for chunk in iter(lambda: list(islice(rows, chunk_size)), []):
+        yield from convert_prices(chunk, target, fields, currency_attr)
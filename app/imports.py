@@ -0,0 +1,373 @@
+"""Background bulk imports for the Article and InvestmentObject admins.
+
+The regular import_export flow saves row by row inside the admin request,
+which for `Article` means `Article.save`'s slug loop plus `SlugMixin`'s
+per-language loop, each a query per candidate slug. Here an `ImportJob` is
+processed in a background thread instead:
+
+* all missing slugs are allocated up front in memory (`SlugAllocator`), from
+  one query per slug column;
+* the rows are fed to a bulk variant of the admin's resource
+  (`use_bulk`, cached instance lookups, optional `skip_diff`) in batches of
+  `BATCH_SIZE`, each in its own transaction; updated rows get a fresh
+  `updated_at`, which `bulk_update` would otherwise leave alone;
+* the job row records progress after every batch, so the admin can show it;
+* `CountryStats`, which bulk saves do not update, is rebuilt for the
+  countries the rows touched once the job ends, also when it fails after
+  some batches were committed.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import threading
+import traceback
+from typing import Dict, Iterable, List, Set
+
+import tablib
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connection, models, transaction
+from django.db.models.base import ModelState
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import redirect, render
+from django.urls import path, reverse
+from django.utils import timezone, translation
+from django.utils.text import slugify
+from import_export.formats import base_formats
+from import_export.instance_loaders import CachedInstanceLoader
+from import_export.resources import ModelResource
+from import_export.results import RowResult
+
+from .country_stats import rebuild as rebuild_country_stats
+from .forms import BulkImportForm
+from .models import Article, ImportJob, ImportStatus, InvestmentObject, SlugMixin
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1_000
+MAX_REPORTED_ERRORS = 50
+COUNTRY_STATS_MODELS = (Article, InvestmentObject)
+PROGRESS_FIELDS = ["created", "updated", "failed", "processed", "errors"]
+INPUT_FORMATS = {
+    "csv": base_formats.CSV,
+    "xlsx": base_formats.XLSX,
+    "json": base_formats.JSON,
+}
+
+
+def _languages() -> List[str]:
+    return list(getattr(settings, "MODELTRANSLATION_LANGUAGES", ()))
+
+
+def _default_language() -> str:
+    return getattr(settings, "MODELTRANSLATION_DEFAULT_LANGUAGE", "en")
+
+
+class SlugAllocator:
+    """Hand out slugs that are unique per column without a query per row."""
+
+    def __init__(self, model: type[models.Model], columns: Iterable[str]) -> None:
+        manager = model.objects
+        if hasattr(manager, "rewrite"):
+            manager = manager.rewrite(False)
+        self.taken: Dict[str, Set[str]] = {
+            column: set(
+                manager.exclude(**{f"{column}__isnull": True}).values_list(
+                    column, flat=True
+                )
+            )
+            for column in columns
+        }
+
+    def reserve(self, column: str, slug: str) -> None:
+        self.taken[column].add(slug)
+
+    def allocate(self, column: str, source: str) -> str:
+        # Same shape as SlugMixin: slugified source, then -1, -2, ...
+        base = slugify(source)[:240] or "item"
+        taken = self.taken[column]
+        candidate, counter = base, 1
+        while candidate in taken:
+            candidate = f"{base}-{counter}"
+            counter += 1
+        taken.add(candidate)
+        return candidate
+
+
+def fill_slugs(dataset: tablib.Dataset, model: type[models.Model]) -> None:
+    """Fill empty slug columns of `dataset` in place from the source columns.
+
+    Mirrors `SlugMixin.save`: every language with a source value (e.g.
+    `title_es`) gets a unique `slug_es`; the base `slug` follows the default
+    language.
+    """
+    field, source = model.slug_field_name, model.slug_source_field
+    suffixes = [code.replace("-", "_") for code in _languages()]
+    default = _default_language().replace("-", "_")
+    columns = [f"{field}_{suffix}" for suffix in suffixes]
+    if not dataset.headers:
+        return
+    for column in [field] + columns:
+        if column not in dataset.headers:
+            dataset.append_col([""] * dataset.height, header=column)
+    allocator = SlugAllocator(model, [field] + columns)
+    headers = dataset.headers
+    rows = [dict(zip(headers, row)) for row in dataset]
+    for row in rows:
+        for column in [field] + columns:
+            if row.get(column):
+                allocator.reserve(column, row[column])
+    for row in rows:
+        for suffix, column in zip(suffixes, columns):
+            value = row.get(f"{source}_{suffix}") or (
+                row.get(source) if suffix == default else None
+            )
+            if not row.get(column):
+                # NULL rather than "" so unique slug columns accept many blanks
+                row[column] = allocator.allocate(column, str(value)) if value else None
+        if not row.get(field):
+            row[field] = row.get(f"{field}_{default}")
+    dataset.dict = rows
+
+
+class _PrototypeInitMixin:
+    """Create new instances by copying a blank one.
+
+    Instantiating a translated model runs modeltranslation's default lookup
+    (a language switch) for every translation field; doing it once and
+    copying the result is an order of magnitude cheaper per row.
+    """
+
+    _prototype = None
+
+    def init_instance(self, row=None):
+        if self._prototype is None:
+            self._prototype = super().init_instance(row)
+        model = type(self._prototype)
+        instance = model.__new__(model)
+        instance.__dict__ = {
+            # Fresh copies of mutable defaults such as JSONField(default=list)
+            key: copy.copy(value) if isinstance(value, (list, dict)) else value
+            for key, value in self._prototype.__dict__.items()
+        }
+        instance._state = ModelState()
+        return instance
+
+
+class _AutoNowMixin:
+    """Stamp the `auto_now` fields of updated rows, as `Model.save` would.
+
+    `QuerySet.bulk_update` runs no `pre_save`, so without this an imported
+    edit would leave `updated_at` (and with it the feed and sitemap stamps)
+    unchanged. `bulk_create` does set them for new rows.
+    """
+
+    def _auto_now_fields(self) -> List[str]:
+        return [
+            field.name
+            for field in self._meta.model._meta.concrete_fields
+            if getattr(field, "auto_now", False)
+        ]
+
+    def save_instance(self, instance, is_create, row, **kwargs):
+        if not is_create:
+            now = timezone.now()
+            for name in self._auto_now_fields():
+                setattr(instance, name, now)
+        super().save_instance(instance, is_create, row, **kwargs)
+
+    def get_bulk_update_fields(self):
+        fields = super().get_bulk_update_fields()
+        return fields + [name for name in self._auto_now_fields() if name not in fields]
+
+
+class _CountryTrackingMixin:
+    """Collect the countries of the rows imported (before and after), whose
+    `CountryStats` the import may change."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.country_ids: Set[int] = set()
+
+    def _track(self, instance) -> None:
+        country_id = getattr(instance, "country_id", None)
+        if country_id is not None:
+            self.country_ids.add(country_id)
+
+    def after_init_instance(self, instance, new, row, **kwargs):
+        self._track(instance)
+        super().after_init_instance(instance, new, row, **kwargs)
+
+    def save_instance(self, instance, is_create, row, **kwargs):
+        self._track(instance)
+        super().save_instance(instance, is_create, row, **kwargs)
+
+
+def bulk_resource(
+    resource_class: type[ModelResource], skip_diff: bool
+) -> ModelResource:
+    """Return an instance of `resource_class` configured for bulk writes."""
+    model = resource_class._meta.model
+    meta = type(
+        "Meta",
+        (),
+        {
+            "model": model,
+            "use_bulk": True,
+            "batch_size": BATCH_SIZE,
+            "skip_diff": skip_diff,
+            "instance_loader_class": CachedInstanceLoader,
+        },
+    )
+    bases = (_PrototypeInitMixin, _CountryTrackingMixin, _AutoNowMixin, resource_class)
+    resource = type(f"Bulk{resource_class.__name__}", bases, {"Meta": meta})()
+    for field in model._meta.fields:
+        if isinstance(field, models.CharField) and field.null:
+            # Keep NULL for empty cells of nullable text columns (the unique
+            # translated slugs) instead of import_export's default of ""
+            widget = getattr(resource.fields.get(field.name), "widget", None)
+            if widget is not None:
+                widget.allow_blank = False
+    return resource
+
+
+def load_dataset(job: ImportJob) -> tablib.Dataset:
+    fmt = INPUT_FORMATS[job.input_format]()
+    with job.file.open("rb") as fh:
+        data = fh.read()
+    if not fmt.is_binary():
+        data = data.decode("utf-8-sig")
+    return fmt.create_dataset(data)
+
+
+def _errors(result, offset: int) -> List[str]:
+    # Bulk writes fail per batch, and are reported as base errors
+    messages = [f"Rows {offset + 1}+: {err.error}" for err in result.base_errors]
+    for number, error in result.row_errors():
+        for err in error:
+            messages.append(f"Row {offset + number}: {err.error}")
+    for invalid in result.invalid_rows:
+        messages.append(f"Row {offset + invalid.number}: {invalid.error_dict}")
+    return messages
+
+
+def run_job(job_id: int, resource_class: type[ModelResource]) -> ImportJob:
+    """Process an ImportJob to completion in the calling thread."""
+    job = ImportJob.objects.get(pk=job_id)
+    job.status = ImportStatus.RUNNING
+    job.save(update_fields=["status"])
+    errors: List[str] = []
+    model = resource_class._meta.model
+    resource = None
+    try:
+        dataset = load_dataset(job)
+        if issubclass(model, SlugMixin):
+            fill_slugs(dataset, model)
+        job.total = dataset.height
+        job.save(update_fields=["total"])
+        resource = bulk_resource(resource_class, job.skip_diff)
+        # Untranslated column names (`title`) go to the default language
+        with translation.override(_default_language()):
+            for start in range(0, dataset.height, BATCH_SIZE):
+                batch = tablib.Dataset(
+                    *dataset[start : start + BATCH_SIZE], headers=dataset.headers
+                )
+                result = resource.import_data(
+                    batch, dry_run=False, use_transactions=True, raise_errors=False
+                )
+                job.created += result.totals[RowResult.IMPORT_TYPE_NEW]
+                job.updated += result.totals[RowResult.IMPORT_TYPE_UPDATE]
+                job.failed += (
+                    result.totals[RowResult.IMPORT_TYPE_ERROR]
+                    + result.totals[RowResult.IMPORT_TYPE_INVALID]
+                )
+                if result.base_errors:
+                    # The whole batch was rolled back
+                    job.created -= result.totals[RowResult.IMPORT_TYPE_NEW]
+                    job.updated -= result.totals[RowResult.IMPORT_TYPE_UPDATE]
+                    job.failed += batch.height
+                errors.extend(_errors(result, start))
+                job.processed = start + batch.height
+                job.errors = "\n".join(errors[:MAX_REPORTED_ERRORS])
+                job.save(update_fields=PROGRESS_FIELDS)
+        job.status = ImportStatus.DONE
+    except Exception:
+        logger.exception("Import job %s failed", job_id)
+        job.status = ImportStatus.FAILED
+        job.errors = "\n".join(errors[:MAX_REPORTED_ERRORS] + [traceback.format_exc()])
+    finally:
+        if model in COUNTRY_STATS_MODELS and resource is not None:
+            # Bulk saves send no signals, and the batches committed before a
+            # failure count as much as a finished job's
+            try:
+                rebuild_country_stats(resource.country_ids)
+            except Exception:
+                logger.exception("Country stats rebuild after job %s failed", job_id)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "errors", "finished_at"])
+    return job
+
+
+def start_job(job: ImportJob, resource_class: type[ModelResource]) -> None:
+    """Run `job` in a background thread once the current transaction commits."""
+
+    def target() -> None:
+        try:
+            run_job(job.pk, resource_class)
+        finally:
+            connection.close()
+
+    def start() -> None:
+        name = f"import-job-{job.pk}"
+        threading.Thread(target=target, name=name, daemon=True).start()
+
+    transaction.on_commit(start)
+
+
+class BulkImportMixin:
+    """Add a `bulk-import/` view that queues an ImportJob for this admin's
+    `resource_class`, and link it from the changelist."""
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                "bulk-import/",
+                self.admin_site.admin_view(self.bulk_import_view),
+                name=f"{opts.app_label}_{opts.model_name}_bulk_import",
+            ),
+        ] + super().get_urls()
+
+    def changelist_view(self, request: HttpRequest, extra_context=None):
+        extra_context = extra_context or {}
+        if self.has_import_permission(request):
+            opts = self.model._meta
+            extra_context["bulk_import_url"] = reverse(
+                f"admin:{opts.app_label}_{opts.model_name}_bulk_import"
+            )
+        return super().changelist_view(request, extra_context)
+
+    def bulk_import_view(self, request: HttpRequest) -> HttpResponse:
+        if not self.has_import_permission(request):
+            raise PermissionDenied
+        form = BulkImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            job = ImportJob.objects.create(
+                resource=self.model._meta.model_name,
+                file=form.cleaned_data["file"],
+                input_format=form.cleaned_data["input_format"],
+                skip_diff=form.cleaned_data["skip_diff"],
+                created_by=request.user,
+            )
+            start_job(job, self.resource_class)
+            self.message_user(request, f"Import #{job.pk} queued.")
+            return redirect("admin:app_importjob_change", job.pk)
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": f"Bulk import {self.model._meta.verbose_name_plural}",
+            "form": form,
+        }
+        return render(request, "admin/app/bulk_import.html", context)
@@ -0,0 +1,116 @@
+"""Buffered lead capture.
+
+`views.subscribe` validates a submission and hands the cleaned data to
+`lead_writer.submit()`, which only appends it to an in-memory queue. A
+background thread per process wakes up when leads arrive, waits
+`LEAD_FLUSH_INTERVAL` seconds so a burst collects into one batch, and writes
+the batch with a single `bulk_create`. Duplicates on (email, source) are
+dropped in the batch and, against existing rows, by the unique constraint.
+
+With `LEAD_FLUSH_INTERVAL = 0` every submission is written inline, which is
+what the tests and one-off scripts use. Leads still queued when the process
+exits are flushed from an `atexit` hook; a hard kill loses at most one
+interval's worth.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Lead
+
+logger = logging.getLogger(__name__)
+
+Submission = Dict[str, Any]
+
+
+class LeadWriter:
+    def __init__(self) -> None:
+        self._queue: queue.SimpleQueue[Submission] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+    @property
+    def interval(self) -> float:
+        return getattr(settings, "LEAD_FLUSH_INTERVAL", 1.0)
+
+    @property
+    def batch_size(self) -> int:
+        return getattr(settings, "LEAD_BATCH_SIZE", 500)
+
+    def submit(self, data: Submission) -> None:
+        """Queue one validated submission; never touches the database
+        unless the writer runs inline."""
+        self._queue.put(data)
+        if not self.interval:
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def flush(self) -> int:
+        """Write everything queued so far; return the number of rows sent."""
+        written = 0
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return written
+            written += self._write(batch)
+
+    def _drain(self, limit: int) -> List[Submission]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Submission]) -> int:
+        unique: Dict[tuple, Submission] = {}
+        for data in batch:
+            unique.setdefault((data["email"], data["source"]), data)
+        try:
+            Lead.objects.bulk_create(
+                [Lead(**data) for data in unique.values()], ignore_conflicts=True
+            )
+        except Exception:
+            logger.exception("Dropped %d leads: batch insert failed", len(unique))
+            return 0
+        return len(unique)
+
+    def _ensure_thread(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked child: the queue may hold the parent's leads
+                self._queue = queue.SimpleQueue()
+            self._pid = os.getpid()
+            thread = threading.Thread(target=self._run, name="lead-writer", daemon=True)
+            thread.start()
+            atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            # Block until there is work, then let the burst accumulate
+            first = self._queue.get()
+            time.sleep(self.interval)
+            try:
+                self._write([first] + self._drain(self.batch_size - 1))
+                self.flush()
+            finally:
+                connection.close()
+
+
+lead_writer = LeadWriter()
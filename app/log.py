@@ -0,0 +1,127 @@
+"""Non-blocking JSON logging, configured from `settings.LOGGING`.
+
+Request threads only filter a record and put it on an in-memory queue; a
+`QueueListener` thread formats it as one JSON line and writes it to the real
+handlers, so a slow stdout or log pipe never stalls a request. Messages are
+formatted on the writer thread when their arguments are plain values, and
+`RouteSampler` keeps only a share of the low-level records of busy routes.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from . import timing
+
+# Arguments of these types can safely be formatted later on another thread
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+def _route() -> str:
+    metrics = timing.current_metrics()
+    return metrics.route if metrics is not None else ""
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler whose listener is started lazily in every process.
+
+    Configure it in `LOGGING` with `"handlers": [...]` naming the handlers
+    that do the actual writing; `logging.config` builds the listener. The
+    listener is (re)started on the first record in each process, so it also
+    works in forked server workers.
+    """
+
+    listener: Optional[logging.handlers.QueueListener]
+
+    def __init__(self, q=None) -> None:
+        super().__init__(q if q is not None else queue.SimpleQueue())
+        self._pid: Optional[int] = None
+
+    def _start_listener(self) -> None:
+        listener = getattr(self, "listener", None)
+        if listener is None:
+            return
+        if self._pid is not None:
+            # Forked child: the parent's queue and thread are not ours
+            self.queue = listener.queue = queue.SimpleQueue()
+            listener._thread = None
+        self._pid = os.getpid()
+        listener.start()
+        atexit.register(listener.stop)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._pid != os.getpid():
+            self._start_listener()
+        super().emit(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the base class, do not format here: that is the writer
+        # thread's job. Only resolve what must not outlive this thread.
+        record = logging.makeLogRecord(record.__dict__)
+        if record.args and not all(
+            isinstance(arg, _PLAIN_TYPES) for arg in _as_tuple(record.args)
+        ):
+            record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if not hasattr(record, "route"):
+            record.route = _route()
+        return record
+
+
+def _as_tuple(args) -> tuple:
+    return tuple(args.values()) if isinstance(args, dict) else tuple(args)
+
+
+class RouteSampler(logging.Filter):
+    """Keep `rates[route]` (0..1) of the records below WARNING per route.
+
+    The route is the URL name of the current request (e.g. `app:home`);
+    records outside a request, and warnings and errors, are always kept.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, default: float = 1.0):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.default = default
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        route = getattr(record, "route", None) or _route()
+        if not route:
+            return True
+        rate = self.rates.get(route, self.default)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as a single JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        route = getattr(record, "route", "")
+        if route:
+            entry["route"] = route
+        metrics = getattr(record, "timing", None)
+        if metrics:
+            entry.update(metrics)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
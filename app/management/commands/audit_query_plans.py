@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from app.queryplans import FULL_SCAN, OR_LOOKUP, TEMP_BTREE, Report, audit
+
+TITLES = {
+    FULL_SCAN: "Full table scans",
+    TEMP_BTREE: "Temporary B-tree sorts",
+    OR_LOOKUP: "OR-of-columns lookups",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every named route in app/urls.py in every language, run "
+        "EXPLAIN QUERY PLAN on the SQL each one issues and report table scans, "
+        "temporary B-tree sorts and OR lookups, with suggested indexes."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--seed-scale",
+            type=int,
+            default=0,
+            help="Run `seed_fake_data --scale N` before auditing.",
+        )
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--languages", nargs="*", default=None)
+        parser.add_argument("--routes", nargs="*", default=None)
+        parser.add_argument("--output", default="", help="Write the report as JSON.")
+        parser.add_argument(
+            "--fail-on",
+            nargs="*",
+            choices=sorted(TITLES),
+            default=[],
+            help="Exit with an error if any finding of these kinds remains.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["seed_scale"]:
+            call_command(
+                "seed_fake_data",
+                scale=options["seed_scale"],
+                seed=options["seed"],
+                stdout=self.stdout,
+            )
+        try:
+            report = audit(options["languages"], options["routes"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        if not report.statements:
+            raise CommandError("No SQL captured; is the database seeded?")
+        self._report(report)
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report.as_dict(), indent=2))
+            self.stdout.write(f"Report written to {options['output']}")
+        failing = [f for f in report.findings if f.kind in options["fail_on"]]
+        if failing:
+            raise CommandError(f"{len(failing)} findings of {options['fail_on']}")
+
+    def _report(self, report: Report) -> None:
+        self.stdout.write(f"{report.statements} distinct SELECT statements")
+        # The same statement differs per language only in its column names
+        groups = defaultdict(list)
+        for finding in report.findings:
+            groups[(finding.kind, finding.table, finding.detail)].append(finding)
+        for kind, title in TITLES.items():
+            keys = [key for key in groups if key[0] == kind]
+            count = sum(len(groups[key]) for key in keys)
+            self.stdout.write(f"\n{title}: {count} statements")
+            for key in keys:
+                findings = groups[key]
+                views = sorted({r.split("|")[0] for f in findings for r in f.routes})
+                self.stdout.write(
+                    f"  {key[1]}: {key[2]} x{len(findings)}  [{', '.join(views)}]"
+                )
+                self.stdout.write(f"    {findings[0].sql[:200]}")
+        self.stdout.write(f"\nSuggested indexes: {len(report.suggestions)}")
+        by_model = defaultdict(list)
+        for suggestion in report.suggestions:
+            by_model[suggestion.model].append(suggestion)
+        for model, suggestions in by_model.items():
+            self.stdout.write(f"  {model}.Meta.indexes:")
+            for suggestion in suggestions:
+                self.stdout.write(f"    {suggestion.declaration()},")
+                self.stdout.write(f"      # {'; '.join(suggestion.reasons)}")
+        if by_model:
+            self.stdout.write(
+                "Add the ones worth keeping to the models, then run makemigrations."
+            )
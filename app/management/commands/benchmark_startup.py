@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = ("InvestAllies.settings", "InvestAllies.settings_public")
+METRICS = ("load_s", "first_response_s", "max_rss_kib", "modules")
+
+
+class Command(BaseCommand):
+    help = (
+        "Start fresh worker processes under each settings profile, serve one "
+        "page and compare load time, first-response time, peak RSS and the "
+        "number of imported modules (medians over --runs)."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--profiles", nargs="+", default=list(PROFILES))
+        parser.add_argument("--path", default="/", help="Page served once per run.")
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--output", default="", help="Write results as JSON.")
+
+    def handle(self, *args, **options) -> None:
+        results = {
+            profile: self._measure(profile, options["path"], options["runs"])
+            for profile in options["profiles"]
+        }
+        self._report(results)
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _measure(self, profile: str, path: str, runs: int) -> Dict[str, Any]:
+        # Rate limits and the first-request log line are not what is measured
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=profile,
+            RATE_LIMIT_ENABLED="0",
+            LOG_LEVEL="WARNING",
+        )
+        samples: List[Dict[str, Any]] = []
+        for _ in range(runs):
+            done = subprocess.run(
+                [sys.executable, "-m", "app.startup_probe", path],
+                cwd=settings.BASE_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            if done.returncode != 0:
+                raise CommandError(f"{profile} failed to start:\n{done.stderr}")
+            samples.append(json.loads(done.stdout.strip().splitlines()[-1]))
+        statuses = sorted({s["status"] for s in samples})
+        return {
+            "runs": runs,
+            "statuses": statuses,
+            **{m: statistics.median(s[m] for s in samples) for m in METRICS},
+        }
+
+    def _report(self, results: Dict[str, Dict[str, Any]]) -> None:
+        self.stdout.write(
+            f"{'profile':<32} {'load ms':>9} {'first ms':>9} {'RSS MiB':>9} "
+            f"{'modules':>8} {'status':>7}"
+        )
+        for profile, row in results.items():
+            self.stdout.write(
+                f"{profile:<32} {row['load_s'] * 1000:>9.1f} "
+                f"{row['first_response_s'] * 1000:>9.1f} "
+                f"{row['max_rss_kib'] / 1024:>9.1f} {row['modules']:>8} "
+                f"{','.join(map(str, row['statuses'])):>7}"
+            )
+        if len(results) < 2:
+            return
+        (base_name, base), *others = results.items()
+        for profile, row in others:
+            self.stdout.write(
+                f"{profile} vs {base_name}: load "
+                f"{_change(base['load_s'], row['load_s'])}, RSS "
+                f"{_change(base['max_rss_kib'], row['max_rss_kib'])}"
+            )
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from app.sitemaps import build_sitemaps
+
+
+class Command(BaseCommand):
+    help = "Regenerate the sitemap index and any sitemap shards that changed."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rewrite every shard instead of only the modified ones.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        stats = build_sitemaps(full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Sitemaps: {written} written, {skipped} unchanged, "
+                "{removed} removed".format(**stats)
+            )
+        )
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.sparse_translations import copy_columns
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the translation columns of the given languages into Translation "
+        "rows, before removing those languages from MODELTRANSLATION_LANGUAGES "
+        "(see app/sparse_translations.py)."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("languages", nargs="+")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options) -> None:
+        columns = getattr(settings, "MODELTRANSLATION_LANGUAGES", ())
+        for lang in options["languages"]:
+            if lang not in columns:
+                raise CommandError(f"{lang!r} has no translation columns")
+            written = copy_columns(lang, options["batch_size"])
+            self.stdout.write(f"{lang}: {written} rows")
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from app.routes import Route, iter_routes, language_headers
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile; `samples` must be sorted."""
+    if not samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(samples)))
+    return samples[rank - 1]
+
+
+def _summarise(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError(f"Server did not start listening on port {port}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test every named route in app/urls.py in every language against a "
+        "local gunicorn/uvicorn server and report throughput, latency "
+        "percentiles and SQL query counts, optionally against a saved baseline."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--seed-scale",
+            type=int,
+            default=0,
+            help="Run `seed_fake_data --scale N` before testing.",
+        )
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--server", choices=("gunicorn", "uvicorn", "none"), default="gunicorn"
+        )
+        parser.add_argument(
+            "--url", default="", help="Test an already running server instead."
+        )
+        parser.add_argument("--server-workers", type=int, default=2)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--requests", type=int, default=50, help="Requests per route and language."
+        )
+        parser.add_argument("--languages", nargs="*", default=None)
+        parser.add_argument("--routes", nargs="*", default=None)
+        parser.add_argument("--output", default="", help="Write results as JSON.")
+        parser.add_argument("--baseline", default="", help="Compare with this JSON.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed relative p95 slowdown before a route is a regression.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["seed_scale"]:
+            call_command(
+                "seed_fake_data",
+                scale=options["seed_scale"],
+                seed=options["seed"],
+                stdout=self.stdout,
+            )
+
+        routes = list(iter_routes(options["languages"], options["routes"]))
+        if not routes:
+            raise CommandError("No routes to test; is the database seeded?")
+        with override_settings(RATE_LIMIT_ENABLED=False):
+            queries = self._count_queries(routes)
+
+        server: Optional[subprocess.Popen] = None
+        base_url = options["url"].rstrip("/")
+        if not base_url:
+            if options["server"] == "none":
+                raise CommandError("--server none requires --url")
+            server, base_url = self._start_server(
+                options["server"], options["server_workers"]
+            )
+        try:
+            results = self._drive(
+                routes, base_url, options["requests"], options["concurrency"]
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+        for route in routes:
+            results["routes"][route.key]["queries"] = queries[route.key]
+        self._report(results)
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+        if options["baseline"]:
+            self._compare(results, options["baseline"], options["tolerance"])
+
+    def _count_queries(self, routes: List[Route]) -> Dict[str, int]:
+        """Count SQL statements per route in-process with the test client."""
+        client = Client()
+        counts = {}
+        for route in routes:
+            client.cookies[settings.LANGUAGE_COOKIE_NAME] = route.language
+            client.get(route.path)  # populate per-process caches first
+            with CaptureQueriesContext(connection) as ctx:
+                client.get(route.path)
+            counts[route.key] = len(ctx.captured_queries)
+        return counts
+
+    def _start_server(self, kind: str, workers: int) -> tuple[subprocess.Popen, str]:
+        port = _free_port()
+        if kind == "gunicorn":
+            cmd = [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                "InvestAllies.wsgi:application",
+                "--bind",
+                f"127.0.0.1:{port}",
+                "--workers",
+                str(workers),
+                "--log-level",
+                "warning",
+            ]
+        else:
+            cmd = [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "InvestAllies.asgi:application",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(port),
+                "--workers",
+                str(workers),
+                "--log-level",
+                "warning",
+            ]
+        # The child inherits DJANGO_SETTINGS_MODULE from this process; rate
+        # limits would turn most of the measured requests into 429s
+        env = dict(os.environ, RATE_LIMIT_ENABLED="0")
+        server = subprocess.Popen(cmd, cwd=settings.BASE_DIR, env=env)
+        try:
+            _wait_for_port(port, timeout=30)
+        except CommandError:
+            server.kill()
+            raise
+        return server, f"http://127.0.0.1:{port}"
+
+    def _drive(
+        self, routes: List[Route], base_url: str, count: int, concurrency: int
+    ) -> Dict[str, Any]:
+        def fetch(route: Route) -> Tuple[int, float]:
+            """(status, seconds); status 0 when no response arrived."""
+            request = urllib.request.Request(
+                base_url + route.path, headers=language_headers(route.language)
+            )
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as exc:
+                # Redirects were followed: anything left is a 4xx/5xx
+                status = exc.code
+            except OSError:
+                status = 0
+            return status, time.perf_counter() - start
+
+        per_route: Dict[str, Dict[str, Any]] = {}
+        by_name: Dict[str, List[float]] = defaultdict(list)
+        by_lang: Dict[str, List[float]] = defaultdict(list)
+        total_start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            for route in routes:
+                fetch(route)  # warm-up, not recorded
+                start = time.perf_counter()
+                samples = list(pool.map(fetch, [route] * count))
+                elapsed = time.perf_counter() - start
+                # Only successful responses are latency samples; a route
+                # answering 404 or 429 quickly must not look fast
+                latencies = [s for status, s in samples if 200 <= status < 400]
+                per_route[route.key] = _summarise(
+                    latencies, len(samples) - len(latencies), elapsed
+                )
+                statuses = Counter(str(status or "none") for status, _ in samples)
+                per_route[route.key]["statuses"] = dict(sorted(statuses.items()))
+                by_name[route.name].extend(latencies)
+                by_lang[route.language].extend(latencies)
+        return {
+            "base_url": base_url,
+            "wall_seconds": round(time.perf_counter() - total_start, 2),
+            "routes": per_route,
+            "by_route": {k: _summarise(v, 0, 0) for k, v in by_name.items()},
+            "by_language": {k: _summarise(v, 0, 0) for k, v in by_lang.items()},
+        }
+
+    def _report(self, results: Dict[str, Any]) -> None:
+        self.stdout.write(
+            f"{'route|lang':<40} {'rps':>8} {'p50':>8} {'p95':>8} "
+            f"{'p99':>8} {'err':>5} {'sql':>5}"
+        )
+        for key, row in results["routes"].items():
+            self.stdout.write(
+                f"{key:<40} {row['rps']:>8} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+                f"{row['p99_ms']:>8} {row['errors']:>5} {row['queries']:>5}"
+            )
+            if row["errors"]:
+                statuses = ", ".join(f"{k}: {v}" for k, v in row["statuses"].items())
+                self.stdout.write(f"  statuses {statuses}")
+        for title, group in (("route", "by_route"), ("language", "by_language")):
+            self.stdout.write(f"\nPer {title} (ms): p50 / p95 / p99")
+            for key, row in results[group].items():
+                self.stdout.write(
+                    f"  {key:<30} {row['p50_ms']} / {row['p95_ms']} / {row['p99_ms']}"
+                )
+
+    def _compare(self, results: Dict[str, Any], path: str, tolerance: float) -> None:
+        baseline = json.loads(Path(path).read_text())["routes"]
+        regressions = []
+        for key, row in results["routes"].items():
+            before = baseline.get(key)
+            if before is None:
+                continue
+            if row["queries"] > before["queries"]:
+                regressions.append(
+                    f"{key}: queries {before['queries']} -> {row['queries']}"
+                )
+            if row["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{key}: p95 {before['p95_ms']}ms -> {row['p95_ms']}ms"
+                )
+            if row["errors"] > before["errors"]:
+                regressions.append(
+                    f"{key}: errors {before['errors']} -> {row['errors']}"
+                )
+        if regressions:
+            for line in regressions:
+                self.stderr.write(line)
+            raise CommandError(f"{len(regressions)} regression(s) against {path}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {path}"))
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.country_stats import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per-country article and investment object stats from "
+        "scratch, e.g. after bulk_create() or QuerySet.update() changed rows "
+        "without sending signals."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "countries", nargs="*", type=int, help="Country ids (default: all)."
+        )
+
+    def handle(self, *args, **options) -> None:
+        with transaction.atomic():
+            written = rebuild(options["countries"] or None)
+        self.stdout.write(self.style.SUCCESS(f"Country stats: {written} rebuilt"))
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import multiprocessing
 import random
+from contextlib import contextmanager
 from decimal import Decimal
+from typing import Any, Dict, Iterator, List
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.models import Max
 from django.utils import timezone
 from django.utils.text import slugify
 
@@ -12,6 +18,7 @@ try:
 except Exception:  # pragma: no cover - instruct user to install
     Faker = None  # type: ignore
 
+from app.country_stats import rebuild as rebuild_country_stats
 from app.models import (
     Article,
     ArticleCategory,
@@ -25,6 +32,48 @@ from app.models import (
     SocialLink,
     SocialPlatform,
 )
+from app.seeding import (
+    ScalePlan,
+    build_vocabulary,
+    generate_chunk,
+    init_worker,
+    plan_tasks,
+    zipf_weights,
+)
+
+# Category popularity for --scale mode; unlisted categories get weight 1
+CATEGORY_WEIGHTS = {"gold": 8, "fuel": 6, "investments": 5, "legal": 3, "offshore": 2}
+
+
+@contextmanager
+def _raw_timestamps(*models) -> Iterator[None]:
+    """Let bulk_create keep generated dates instead of auto_now(_add)."""
+    patched = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            flags = (
+                getattr(field, "auto_now", False),
+                getattr(field, "auto_now_add", False),
+            )
+            if any(flags):
+                patched.append((field, flags))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in patched:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _instances(model, rows: List[Dict[str, Any]]) -> list:
+    """Build instances positionally, skipping the per-kwarg lookup rewriting
+    modeltranslation applies in `__init__` (the dominant cost at scale)."""
+    fields = model._meta.concrete_fields
+    defaults = [None if f.primary_key else f.get_default() for f in fields]
+    return [
+        model(*[row.get(f.attname, default) for f, default in zip(fields, defaults)])
+        for row in rows
+    ]
 
 
 class Command(BaseCommand):
@@ -36,12 +85,34 @@ class Command(BaseCommand):
         parser.add_argument("--articles", type=int, default=20)
         parser.add_argument("--objects", type=int, default=12)
         parser.add_argument("--socials", type=int, default=6)
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=0,
+            help=(
+                "Bulk mode: generate this many Articles, plus scale/20 "
+                "InvestmentObjects, scale/4 Leads and scale price ticks."
+            ),
+        )
+        parser.add_argument(
+            "--seed", type=int, default=None, help="Seed for reproducible data."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=max(1, multiprocessing.cpu_count() - 1),
+            help="Generator processes used by --scale.",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
 
     def handle(self, *args, **options) -> None:
         if Faker is None:
             self.stderr.write("Faker is not installed. Install with: pip install Faker")
             return
 
+        if options["seed"] is not None:
+            random.seed(options["seed"])
+            Faker.seed(options["seed"])
         fake = Faker()
         now = timezone.now()
 
@@ -88,45 +159,6 @@ class Command(BaseCommand):
             )
             categories.append(cat)
 
-        # Articles
-        for _ in range(options["articles"]):
-            title = fake.sentence(nb_words=6)
-            # Article model does not have a `slug` field; use title as unique lookup
-            cat = random.choice(categories)
-            country = (
-                random.choice(countries)
-                if countries and random.random() < 0.6
-                else None
-            )
-            Article.objects.get_or_create(
-                title=title,
-                defaults={
-                    "content": fake.paragraph(nb_sentences=5),
-                    "category": cat,
-                    "country": country,
-                    "publish": True,
-                },
-            )
-
-        # Investment objects
-        for _ in range(options["objects"]):
-            title = fake.sentence(nb_words=4).rstrip(".")
-            slug = slugify(title)[:50]
-            country = random.choice(countries) if countries else None
-            price = Decimal(random.randint(5_000, 2_000_000))
-            roi = Decimal(random.uniform(3.0, 25.0)).quantize(Decimal("0.01"))
-            InvestmentObject.objects.get_or_create(
-                title=title,
-                defaults={
-                    "description": fake.paragraph(nb_sentences=3),
-                    "country": country,
-                    "price": price,
-                    "expected_roi": roi,
-                    "active": True,
-                    "images": [fake.image_url() for _ in range(2)],
-                },
-            )
-
         # Landing pages
         for svc in services:
             slug = f"landing-{svc.slug}"
@@ -140,27 +172,73 @@ class Command(BaseCommand):
                 },
             )
 
-        # Leads (sample)
-        for _ in range(6):
-            Lead.objects.create(
-                name=fake.name(),
-                email=fake.email(),
-                phone=fake.phone_number(),
-                message=fake.sentence(nb_words=10),
-                source=random.choice(["form", "landing", "article"]),
-            )
+        if options["scale"]:
+            self._seed_at_scale(options, countries, categories)
+        else:
+            # Articles
+            for _ in range(options["articles"]):
+                title = fake.sentence(nb_words=6)
+                # Article model does not have a `slug` field; use title as unique lookup
+                cat = random.choice(categories)
+                country = (
+                    random.choice(countries)
+                    if countries and random.random() < 0.6
+                    else None
+                )
+                Article.objects.get_or_create(
+                    title=title,
+                    defaults={
+                        "content": fake.paragraph(nb_sentences=5),
+                        "category": cat,
+                        "country": country,
+                        "publish": True,
+                    },
+                )
 
-        # Metal prices
-        MetalPrice.objects.create(metal="gold", price=Decimal("1950.25"), timestamp=now)
-        MetalPrice.objects.create(metal="silver", price=Decimal("23.12"), timestamp=now)
+            # Investment objects
+            for _ in range(options["objects"]):
+                title = fake.sentence(nb_words=4).rstrip(".")
+                slug = slugify(title)[:50]
+                country = random.choice(countries) if countries else None
+                price = Decimal(random.randint(5_000, 2_000_000))
+                roi = Decimal(random.uniform(3.0, 25.0)).quantize(Decimal("0.01"))
+                InvestmentObject.objects.get_or_create(
+                    title=title,
+                    defaults={
+                        "description": fake.paragraph(nb_sentences=3),
+                        "country": country,
+                        "price": price,
+                        "expected_roi": roi,
+                        "active": True,
+                        "images": [fake.image_url() for _ in range(2)],
+                    },
+                )
 
-        # Fuel price
-        FuelPrice.objects.create(
-            fuel_type="Fuel Platts",
-            price=Decimal("78.45"),
-            currency="USD",
-            timestamp=now,
-        )
+            # Leads (sample)
+            for _ in range(6):
+                Lead.objects.create(
+                    name=fake.name(),
+                    email=fake.unique.email(),
+                    phone=fake.phone_number(),
+                    message=fake.sentence(nb_words=10),
+                    source=random.choice(["form", "landing", "article"]),
+                )
+
+            # Metal prices
+            MetalPrice.objects.create(
+                metal="gold", price=Decimal("1950.25"), timestamp=now
+            )
+            MetalPrice.objects.create(
+                metal="silver", price=Decimal("23.12"), timestamp=now
+            )
+
+            # Fuel price
+            FuelPrice.objects.create(
+                fuel_type="Fuel Platts",
+                price=Decimal("78.45"),
+                currency="USD",
+                timestamp=now,
+            )
 
         # Social links (create entries for each platform up to requested number)
         platforms = [p.value for p in SocialPlatform]
@@ -176,3 +254,86 @@ class Command(BaseCommand):
             created_links += 1
 
         self.stdout.write(self.style.SUCCESS("Seeding completed."))
+
+    def _seed_at_scale(self, options: Dict[str, Any], countries, categories) -> None:
+        """Generate rows in worker processes and insert them with bulk_create."""
+        scale = options["scale"]
+        batch_size = options["batch_size"]
+        seed = options["seed"] if options["seed"] is not None else 0
+        languages = tuple(settings.MODELTRANSLATION_LANGUAGES)
+
+        # Popularity follows a long tail; shuffle so it isn't tied to pk order
+        ordered = sorted({c.pk: c for c in countries}.values(), key=lambda c: c.pk)
+        random.Random(seed).shuffle(ordered)
+        plan = ScalePlan(
+            seed=seed,
+            languages=languages,
+            country_ids=tuple(c.pk for c in ordered),
+            country_weights=tuple(zipf_weights(len(ordered))),
+            category_ids=tuple(c.pk for c in categories),
+            category_weights=tuple(
+                float(CATEGORY_WEIGHTS.get(c.slug, 1)) for c in categories
+            ),
+            now=timezone.now(),
+        )
+        # Article slugs embed the row index; continue after existing rows
+        offset = Article.objects.aggregate(last=Max("pk"))["last"] or 0
+        tasks = (
+            plan_tasks("article", scale, batch_size, offset)
+            + plan_tasks("object", scale // 20, batch_size)
+            + plan_tasks("lead", scale // 4, batch_size)
+            + plan_tasks("tick", scale, batch_size)
+        )
+        vocabulary = build_vocabulary(seed, languages)
+        # Workers never touch the database; don't let them inherit connections
+        connections.close_all()
+
+        totals: Dict[str, int] = {}
+        with multiprocessing.Pool(
+            options["workers"], initializer=init_worker, initargs=(vocabulary, plan)
+        ) as pool:
+            # imap keeps task order, so inserted pks are reproducible too
+            for kind, rows in pool.imap(generate_chunk, tasks):
+                self._insert(kind, rows, batch_size)
+                totals[kind] = totals.get(kind, 0) + len(rows)
+                self.stdout.write(f"  - {kind}: {totals[kind]} rows")
+        # bulk_create sent no signals to keep CountryStats current
+        rebuild_country_stats()
+
+    def _insert(self, kind: str, rows: List[Dict[str, Any]], batch_size: int) -> None:
+        default = settings.MODELTRANSLATION_DEFAULT_LANGUAGE.replace("-", "_")
+        with transaction.atomic():
+            if kind == "article":
+                for row in rows:
+                    row["title"] = row[f"title_{default}"]
+                    row["slug"] = row[f"slug_{default}"]
+                    row["content"] = row[f"content_{default}"]
+                    row["updated_at"] = row["created_at"]
+                with _raw_timestamps(Article):
+                    Article.objects.bulk_create(
+                        _instances(Article, rows), batch_size=batch_size
+                    )
+            elif kind == "object":
+                for row in rows:
+                    row["title"] = row[f"title_{default}"]
+                    row["description"] = row[f"description_{default}"]
+                InvestmentObject.objects.bulk_create(
+                    _instances(InvestmentObject, rows), batch_size=batch_size
+                )
+            elif kind == "lead":
+                with _raw_timestamps(Lead):
+                    Lead.objects.bulk_create(
+                        _instances(Lead, rows),
+                        batch_size=batch_size,
+                        ignore_conflicts=True,
+                    )
+            else:
+                metals, fuels = [], []
+                for row in rows:
+                    (metals if row.pop("model") == "metal" else fuels).append(row)
+                MetalPrice.objects.bulk_create(
+                    _instances(MetalPrice, metals), batch_size=batch_size
+                )
+                FuelPrice.objects.bulk_create(
+                    _instances(FuelPrice, fuels), batch_size=batch_size
+                )
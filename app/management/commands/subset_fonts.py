@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.staticfiles import FONT_SUBSETS, FONT_WEIGHTS, font_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the per-script WOFF2 subsets of Inter that static/css/styles.css "
+        "declares, from the full Inter fonts (one file per weight). Needs the "
+        "fonttools and brotli packages."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("fonts", nargs="+", type=Path)
+        parser.add_argument(
+            "--output", type=Path, default=Path(settings.BASE_DIR) / "static"
+        )
+
+    def handle(self, *args, **options) -> None:
+        try:
+            from fontTools import subset
+            from fontTools.ttLib import TTFont
+        except ImportError:
+            raise CommandError("subset_fonts needs fonttools: pip install fonttools")
+        for source in options["fonts"]:
+            weight = TTFont(source)["OS/2"].usWeightClass
+            if weight not in FONT_WEIGHTS:
+                self.stdout.write(f"{source}: skipping weight {weight}")
+                continue
+            for name, ranges in FONT_SUBSETS.items():
+                # Subsetting changes the font in place: start from the source
+                font = TTFont(source)
+                subsetter = subset.Subsetter(subset.Options(flavor="woff2"))
+                subsetter.populate(unicodes=subset.parse_unicodes(ranges))
+                subsetter.subset(font)
+                target = options["output"] / font_name(name, weight)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                font.save(target)
+                self.stdout.write(f"{target}: {target.stat().st_size} bytes")
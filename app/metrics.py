@@ -0,0 +1,294 @@
+"""Request metrics in the Prometheus text format, summed across workers.
+
+`RequestTimingMiddleware` calls `observe_request` once per request with the
+numbers it already collects (see `app.timing`). Each process adds them to its
+own memory-mapped file, `METRICS_DIR/<pid>.db`: no lock is shared between
+workers and a request costs about ten in-place float updates. The `/metrics`
+view (`render`) reads and sums every file in the directory, then adds gauges
+computed at scrape time: cache hit ratios and the age of the newest metal and
+fuel prices.
+
+Files of exited workers are kept, so counters never go backwards while the
+server runs; `clear()` empties the directory and is called when gunicorn
+starts (see `InvestAllies/gunicorn.py`).
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import FuelPrice, MetalPrice
+from .timing import RequestMetrics
+
+Labels = Tuple[Tuple[str, str], ...]
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+REQUESTS = "app_http_requests_total"
+DURATION = "app_http_request_duration_seconds"
+DB_QUERIES = "app_db_queries_per_request"
+DB_DURATION = "app_db_duration_seconds"
+CACHE = "app_cache_lookups_total"
+CACHE_RATIO = "app_cache_hit_ratio"
+PRICE_AGE = "app_price_age_seconds"
+
+COUNTERS = {
+    REQUESTS: "Requests by route and status code.",
+    CACHE: "Cache lookups by route and result (hit or miss).",
+}
+HISTOGRAMS = {
+    DURATION: ("Request latency by route.", TIME_BUCKETS),
+    DB_QUERIES: ("SQL statements per request by route.", QUERY_BUCKETS),
+    DB_DURATION: ("Time spent in SQL per request by route.", TIME_BUCKETS),
+}
+
+_HEADER = struct.Struct("<Q")
+_LENGTH = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+_INITIAL_SIZE = 64 * 1024
+
+
+class MmapValues:
+    """Float values by string key in a file that other processes can read.
+
+    Layout: the number of used bytes, then entries of a key length, the key
+    (padded so the value is 8-byte aligned) and the value. New keys are
+    appended and the used size is written last, so a reader never sees a
+    partial entry.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._lock = threading.Lock()
+        self._file = open(path, "a+b")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _INITIAL_SIZE:
+            self._file.truncate(_INITIAL_SIZE)
+            size = _INITIAL_SIZE
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._used = _HEADER.unpack_from(self._map, 0)[0]
+        if not self._used:
+            self._used = _HEADER.size
+            _HEADER.pack_into(self._map, 0, self._used)
+        self._positions = {key: pos for key, _, pos in _entries(self._map)}
+
+    def add(self, key: str, amount: float) -> None:
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._append(key)
+            value = _VALUE.unpack_from(self._map, position)[0]
+            _VALUE.pack_into(self._map, position, value + amount)
+
+    def _append(self, key: str) -> int:
+        encoded = key.encode()
+        padding = -(_LENGTH.size + len(encoded)) % 8
+        size = _LENGTH.size + len(encoded) + padding + _VALUE.size
+        while self._used + size > len(self._map):
+            capacity = len(self._map) * 2
+            self._file.truncate(capacity)
+            self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), capacity)
+        start = self._used
+        _LENGTH.pack_into(self._map, start, len(encoded))
+        self._map[start + _LENGTH.size : start + _LENGTH.size + len(encoded)] = encoded
+        position = start + size - _VALUE.size
+        _VALUE.pack_into(self._map, position, 0.0)
+        self._used += size
+        _HEADER.pack_into(self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+def _entries(data) -> Iterator[Tuple[str, float, int]]:
+    used = _HEADER.unpack_from(data, 0)[0]
+    position = _HEADER.size
+    while position < used:
+        length = _LENGTH.unpack_from(data, position)[0]
+        start = position + _LENGTH.size
+        key = bytes(data[start : start + length]).decode()
+        value_at = start + length + (-(_LENGTH.size + length) % 8)
+        yield key, _VALUE.unpack_from(data, value_at)[0], value_at
+        position = value_at + _VALUE.size
+
+
+_store: Optional[MmapValues] = None
+_store_pid: Optional[int] = None
+_store_lock = threading.Lock()
+_keys: Dict[Tuple[str, Labels], str] = {}
+
+
+def _directory() -> Path:
+    return Path(settings.METRICS_DIR)
+
+
+def _get_store() -> MmapValues:
+    global _store, _store_pid
+    pid = os.getpid()
+    if _store_pid != pid:
+        with _store_lock:
+            if _store_pid != pid:
+                # Forked child: the parent's file is not ours to write
+                _directory().mkdir(parents=True, exist_ok=True)
+                _store = MmapValues(_directory() / f"{pid}.db")
+                _store_pid = pid
+    return _store
+
+
+@receiver(setting_changed)
+def _reset(setting: str, **kwargs) -> None:
+    global _store, _store_pid
+    if setting.startswith("METRICS"):
+        if _store is not None and _store_pid == os.getpid():
+            _store.close()
+        _store = _store_pid = None
+
+
+def _key(name: str, labels: Labels) -> str:
+    key = _keys.get((name, labels))
+    if key is None:
+        key = _keys[(name, labels)] = json.dumps([name, labels])
+    return key
+
+
+def _observe(store: MmapValues, name: str, labels: Labels, value: float) -> None:
+    buckets = HISTOGRAMS[name][1]
+    # Buckets are stored per bucket and made cumulative when rendered
+    le = bisect_left(buckets, value)
+    bound = str(buckets[le]) if le < len(buckets) else "+Inf"
+    store.add(_key(f"{name}_bucket", labels + (("le", bound),)), 1)
+    store.add(_key(f"{name}_sum", labels), value)
+
+
+def observe_request(
+    route: str, status: int, seconds: float, request: RequestMetrics
+) -> None:
+    if not settings.METRICS_ENABLED:
+        return
+    store = _get_store()
+    labels: Labels = (("route", route),)
+    store.add(_key(REQUESTS, labels + (("status", str(status)),)), 1)
+    _observe(store, DURATION, labels, seconds)
+    _observe(store, DB_QUERIES, labels, request.db_queries)
+    _observe(store, DB_DURATION, labels, request.db_seconds)
+    if request.cache_hits:
+        store.add(_key(CACHE, labels + (("result", "hit"),)), request.cache_hits)
+    if request.cache_misses:
+        store.add(_key(CACHE, labels + (("result", "miss"),)), request.cache_misses)
+
+
+def collect() -> Dict[Tuple[str, Labels], float]:
+    """Sum of every worker's values."""
+    totals: Dict[Tuple[str, Labels], float] = defaultdict(float)
+    directory = _directory()
+    if not directory.is_dir():
+        return totals
+    for path in directory.glob("*.db"):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            continue
+        for key, value, _ in _entries(data):
+            name, labels = json.loads(key)
+            totals[(name, tuple(tuple(pair) for pair in labels))] += value
+    return totals
+
+
+def clear() -> None:
+    directory = _directory()
+    if directory.is_dir():
+        for path in directory.glob("*.db"):
+            path.unlink(missing_ok=True)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _sample(name: str, labels: Labels, value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+        name = f"{name}{{{rendered}}}"
+    if float(value).is_integer():
+        return f"{name} {int(value)}"
+    return f"{name} {value!r}"
+
+
+def _price_ages() -> List[Tuple[Labels, float]]:
+    now = timezone.now()
+    ages = []
+    for metal, _ in MetalPrice._meta.get_field("metal").choices:
+        newest = (
+            MetalPrice.objects.filter(metal=metal)
+            .values_list("timestamp", flat=True)
+            .first()
+        )
+        if newest is not None:
+            ages.append(((("feed", "metal"), ("kind", metal)), newest))
+    latest = FuelPrice.objects.values_list("timestamp", "fuel_type").first()
+    if latest is not None:
+        ages.append(((("feed", "fuel"), ("kind", latest[1])), latest[0]))
+    return [(labels, (now - newest).total_seconds()) for labels, newest in ages]
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    totals = collect()
+    by_name: Dict[str, List[Tuple[Labels, float]]] = defaultdict(list)
+    for (name, labels), value in sorted(totals.items()):
+        by_name[name].append((labels, value))
+    lines: List[str] = []
+
+    for name, help_text in COUNTERS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        lines += [_sample(name, labels, value) for labels, value in by_name[name]]
+
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        per_bucket: Dict[Labels, Dict[str, float]] = defaultdict(dict)
+        for labels, value in by_name[f"{name}_bucket"]:
+            per_bucket[labels[:-1]][labels[-1][1]] = value
+        sums = dict(by_name[f"{name}_sum"])
+        for labels, counts in per_bucket.items():
+            running = 0.0
+            for bound in [str(b) for b in buckets] + ["+Inf"]:
+                running += counts.get(bound, 0.0)
+                bucket_labels = labels + (("le", bound),)
+                lines.append(_sample(f"{name}_bucket", bucket_labels, running))
+            lines.append(_sample(f"{name}_sum", labels, sums.get(labels, 0.0)))
+            lines.append(_sample(f"{name}_count", labels, running))
+
+    lines += [
+        f"# HELP {CACHE_RATIO} Share of cache lookups that hit, by route.",
+        f"# TYPE {CACHE_RATIO} gauge",
+    ]
+    lookups: Dict[Labels, Dict[str, float]] = defaultdict(dict)
+    for labels, value in by_name[CACHE]:
+        lookups[labels[:-1]][labels[-1][1]] = value
+    for labels, results in lookups.items():
+        total = results.get("hit", 0.0) + results.get("miss", 0.0)
+        lines.append(_sample(CACHE_RATIO, labels, results.get("hit", 0.0) / total))
+
+    lines += [
+        f"# HELP {PRICE_AGE} Seconds since the newest stored price, by feed.",
+        f"# TYPE {PRICE_AGE} gauge",
+    ]
+    lines += [_sample(PRICE_AGE, labels, age) for labels, age in _price_ages()]
+    return "\n".join(lines) + "\n"
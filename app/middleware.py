@@ -0,0 +1,215 @@
+import logging
+import math
+import time
+from pathlib import Path
+from typing import Callable
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse
+from django.utils import translation
+from django.utils.cache import patch_vary_headers
+
+from . import metrics as app_metrics
+from . import fx, ratelimit, routers, staticfiles, timing
+
+logger = logging.getLogger("app.requests")
+
+
+class StaticFilesMiddleware:
+    """Serve the collected static files when nothing in front of the app does.
+
+    Active when `STATIC_SERVE` is on and `STATIC_URL` is a local path (not a
+    CDN). Files are indexed once, at startup, so run `collectstatic` before
+    starting the server. Answers before any other middleware; see
+    `app.staticfiles` for the variants and caching headers.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+        prefix = settings.STATIC_URL or ""
+        if not getattr(settings, "STATIC_SERVE", False) or "://" in prefix:
+            raise MiddlewareNotUsed
+        self.files = staticfiles.build_index(Path(settings.STATIC_ROOT), prefix)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        entry = self.files.get(request.path_info)
+        if entry is None or request.method not in ("GET", "HEAD"):
+            return self.get_response(request)
+        return staticfiles.serve(request, entry)
+
+
+class PreloadLinkMiddleware:
+    """Add a `Link: rel=preload` header for the stylesheet and font to pages.
+
+    Browsers start those downloads before parsing the HTML; CDNs that
+    support it turn the header into a 103 Early Hints response.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        content_type = response.get("Content-Type", "")
+        if response.status_code == 200 and content_type.startswith("text/html"):
+            response["Link"] = staticfiles.preload_links(translation.get_language())
+        return response
+
+
+class DisplayCurrencyMiddleware:
+    """Remember a `?currency=` choice in a cookie, and mark the responses
+    that showed prices in the visitor's currency as varying on it.
+
+    Pages without prices never read the cookie (`app.fx.display_currency`),
+    so they stay cacheable for everyone.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        if getattr(request, "_display_currency_used", False):
+            code = fx.requested_currency(request)
+            if code is not None:
+                response.set_cookie(
+                    fx.FX_COOKIE_NAME, code, max_age=365 * 24 * 3600, samesite="Lax"
+                )
+            patch_vary_headers(response, ("Cookie",))
+        return response
+
+
+class RequestTimingMiddleware:
+    """Measure every request and report where the time went.
+
+    Adds a `Server-Timing` header (total, database, template and cache),
+    adds the request to the `/metrics` counters (`app.metrics`) and writes
+    one log record per request to the `app.requests` logger. The
+    record's `timing` attribute carries the same numbers as a dict for
+    structured formatters. Keep this first in `MIDDLEWARE` so the total
+    includes the other middleware.
+
+    For a streamed response the log record and the counters wait until the
+    body has been sent, so they include the lists read while streaming; the
+    header, sent first, covers the time to the first byte only.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        metrics = timing.RequestMetrics()
+        start = time.perf_counter()
+        with timing.recording(metrics):
+            response = self.get_response(request)
+        if not metrics.route:
+            metrics.route = "unresolved"
+        response["Server-Timing"] = metrics.server_timing(time.perf_counter() - start)
+        if response.streaming and not response.is_async:
+            response.streaming_content = timing.TimedStream(
+                response.streaming_content,
+                metrics,
+                lambda: self._finish(request, response, metrics, start),
+            )
+        else:
+            self._finish(request, response, metrics, start)
+        return response
+
+    def _finish(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+        metrics: timing.RequestMetrics,
+        start: float,
+    ) -> None:
+        total = time.perf_counter() - start
+        # Current again, so the record is sampled by its route (`app.log`)
+        with timing.using(metrics):
+            self._log(request, response, metrics.as_dict(total))
+        app_metrics.observe_request(metrics.route, response.status_code, total, metrics)
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        # Known from here on, so log records from the view can carry it
+        timing.current_metrics().route = request.resolver_match.view_name
+
+    def _log(self, request: HttpRequest, response: HttpResponse, record: dict) -> None:
+        record.update(method=request.method, status=response.status_code)
+        logger.info(
+            "%s %s %s %s %.1fms db=%.1fms/%d tpl=%.1fms cache=%d/%d",
+            record["method"],
+            request.path,
+            record["route"],
+            record["status"],
+            record["total_ms"],
+            record["db_ms"],
+            record["db_queries"],
+            record["template_ms"],
+            record["cache_hits"],
+            record["cache_misses"],
+            extra={"timing": record},
+        )
+
+
+class RateLimitMiddleware:
+    """Answer over-limit requests to routes in `RATE_LIMITS` with a 429.
+
+    Runs in `process_view`, once the route is known and before the view
+    does any work; the 429 itself is a constant plain-text body.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        return self.get_response(request)
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        if not getattr(settings, "RATE_LIMIT_ENABLED", True):
+            return None
+        route = request.resolver_match.view_name
+        rule = ratelimit.get_rules().get(route)
+        if rule is None:
+            return None
+        key = f"{route}|{ratelimit.client_ip(request)}"
+        wait = ratelimit.get_backend().take(key, rule, time.time())
+        if not wait:
+            return None
+        response = HttpResponse(
+            "Too many requests.\n", status=429, content_type="text/plain"
+        )
+        response["Retry-After"] = str(max(1, math.ceil(wait)))
+        return response
+
+
+class PrimaryDatabaseMiddleware:
+    """Pin requests that write, or show just-written data, to the primary.
+
+    Non-GET/HEAD requests and paths under `DB_PRIMARY_PATHS` (the admin)
+    read from `default`, streamed bodies included; everything else may read
+    from the replica. Does nothing unless a `replica` database is configured.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if routers.REPLICA_DB_ALIAS in settings.DATABASES and self._pin(request):
+            with routers.use_primary():
+                response = self.get_response(request)
+            if response.streaming:
+                # Read after this returns (admin stream exports): keep the pin
+                wrap = (
+                    routers.apinned_iterator
+                    if response.is_async
+                    else routers.pinned_iterator
+                )
+                response.streaming_content = wrap(response.streaming_content)
+            return response
+        return self.get_response(request)
+
+    def _pin(self, request: HttpRequest) -> bool:
+        if request.method not in ("GET", "HEAD"):
+            return True
+        paths = getattr(settings, "DB_PRIMARY_PATHS", ())
+        return request.path_info.startswith(tuple(paths))
@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_leads(apps, schema_editor):
+    """Keep the oldest lead per (email, source) before adding the constraint."""
+    Lead = apps.get_model("app", "Lead")
+    keep = (
+        Lead.objects.values("email", "source")
+        .annotate(first=Min("pk"))
+        .values_list("first", flat=True)
+    )
+    Lead.objects.exclude(pk__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_article_updated_at_country_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_leads, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='lead',
+            constraint=models.UniqueConstraint(fields=('email', 'source'), name='unique_lead_email_source'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.1.2 on 2026-10-19 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_importjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['created_at'], name='app_article_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fuelprice',
+            index=models.Index(fields=['timestamp'], name='app_fuelprice_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='metalprice',
+            index=models.Index(fields=['timestamp'], name='app_metalprice_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='metalprice',
+            index=models.Index(fields=['metal', 'timestamp'], name='app_metalprice_metal_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.1.2 on 2026-10-19 13:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_admin_changelist_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['country', 'publish', '-created_at'], name='article_country_publish_cr_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['category', 'publish', '-created_at'], name='article_category_publish_c_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 6.1.2 on 2026-10-19 14:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+
+def fill_country_stats(apps, schema_editor):
+    """`app.country_stats.rebuild()` as of this migration, on its models."""
+    CountryStats = apps.get_model("app", "CountryStats")
+    Article = apps.get_model("app", "Article")
+    InvestmentObject = apps.get_model("app", "InvestmentObject")
+    by_country = {
+        pk: CountryStats(country_id=pk)
+        for pk in apps.get_model("app", "Country").objects.values_list("pk", flat=True)
+    }
+    articles = Article.objects.filter(publish=True, country__isnull=False)
+    for row in articles.values("country").annotate(
+        count=Count("pk"), latest=Max("created_at")
+    ):
+        stats = by_country[row["country"]]
+        stats.article_count = row["count"]
+        stats.latest_article_at = row["latest"]
+    objects = InvestmentObject.objects.filter(active=True)
+    for row in objects.values("country").annotate(
+        count=Count("pk"),
+        priced=Count("price"),
+        total=Sum("price"),
+        low=Min("price"),
+        high=Max("price"),
+        roi=Sum("expected_roi"),
+    ):
+        stats = by_country[row["country"]]
+        stats.object_count = row["count"]
+        stats.priced_count = row["priced"]
+        stats.price_sum = row["total"] or 0
+        stats.price_min = row["low"]
+        stats.price_max = row["high"]
+        stats.roi_sum = row["roi"]
+    CountryStats.objects.bulk_create(by_country.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_translation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CountryStats',
+            fields=[
+                ('country', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='app.country')),
+                ('article_count', models.PositiveIntegerField(default=0)),
+                ('latest_article_at', models.DateTimeField(blank=True, null=True)),
+                ('object_count', models.PositiveIntegerField(default=0)),
+                ('priced_count', models.PositiveIntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=26)),
+                ('price_min', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True)),
+                ('price_max', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True)),
+                ('roi_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name_plural': 'country stats',
+            },
+        ),
+        migrations.RunPython(fill_country_stats, migrations.RunPython.noop),
+    ]
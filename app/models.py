@@ -1,10 +1,105 @@
+from decimal import Decimal
 from enum import StrEnum
-from typing import Any
+from itertools import islice
+from typing import Any, Iterator, List
 
 from ckeditor.fields import RichTextField
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models.query import ModelIterable
+from django.utils import translation
 from django.utils.text import slugify
+from modeltranslation.fields import TranslationField
+from modeltranslation.utils import get_language, resolution_order
+
+
+def language_fields(model: type[models.Model], lang: str | None = None) -> List[str]:
+    """Concrete field names of `model` needed to read it in `lang`.
+
+    Translation columns of other languages than `lang` (default: the active
+    one) and its fallbacks are left out, and so are the untranslated base
+    columns the translated fields replace.
+    """
+    langs = resolution_order(lang or get_language())
+    fields = model._meta.concrete_fields
+    translated = {
+        f.translated_field.name for f in fields if isinstance(f, TranslationField)
+    }
+    return [
+        f.name
+        for f in fields
+        if f.name not in translated
+        and (not isinstance(f, TranslationField) or f.language in langs)
+    ]
+
+
+class TranslatedQuerySet(models.QuerySet):
+    """QuerySet of the models registered in `app/translation.py`."""
+
+    # Set by `for_language` for a language kept in `Translation` rows
+    _sparse_language: str | None = None
+    _sparse_related: tuple = ()
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._sparse_language = self._sparse_language
+        clone._sparse_related = self._sparse_related
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is not None
+        super()._fetch_all()
+        if not fetched and self._attaches_rows():
+            self._attach_rows(self._result_cache)
+
+    def iterator(self, chunk_size: int | None = None) -> Iterator[Any]:
+        rows = super().iterator(chunk_size)
+        if not self._attaches_rows():
+            return rows
+        return self._attached_chunks(rows, chunk_size or 2000)
+
+    def _attached_chunks(self, rows: Iterator[Any], size: int) -> Iterator[Any]:
+        # One `Translation` query per chunk the database cursor returns
+        for chunk in iter(lambda: list(islice(rows, size)), []):
+            self._attach_rows(chunk)
+            yield from chunk
+
+    def _attaches_rows(self) -> bool:
+        return bool(self._sparse_language) and self._iterable_class is ModelIterable
+
+    def _attach_rows(self, objs: List[Any]) -> None:
+        from .sparse_translations import attach
+
+        instances = list(objs)
+        for obj in objs:
+            instances += [getattr(obj, name, None) for name in self._sparse_related]
+        attach([obj for obj in instances if obj is not None], self._sparse_language)
+
+    def for_language(self, *related: str, lang: str | None = None):
+        """Load only the columns `lang` (default: the active language) reads.
+
+        `related` names foreign keys to follow with `select_related`; their
+        models are loaded in `lang` too. Rows are about one language wide
+        instead of all of them, for the public views; the admin edits every
+        language and keeps the full rows. For a language without columns,
+        each page of results, or chunk of `iterator()`, gets its
+        `Translation` rows attached with one query (see
+        `app/sparse_translations.py`).
+        """
+        from .sparse_translations import is_sparse
+
+        names = language_fields(self.model, lang)
+        for name in related:
+            target = self.model._meta.get_field(name).related_model
+            names += [f"{name}__{f}" for f in language_fields(target, lang)]
+        queryset = self.select_related(*related) if related else self
+        queryset = queryset.only(*names)
+        lang = lang or translation.get_language()
+        if is_sparse(lang):
+            queryset._sparse_language = lang
+            queryset._sparse_related = related
+        return queryset
 
 
 class SlugMixin:
@@ -88,6 +183,9 @@ class Country(SlugMixin, models.Model):
     name = models.CharField(max_length=100)  # i18n en plantilla
     slug = models.SlugField(unique=True)
     active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TranslatedQuerySet.as_manager()
 
     def __str__(self):
         return self.name
@@ -99,6 +197,9 @@ class Service(SlugMixin, models.Model):
     description = models.TextField()  # traducible
     slug = models.SlugField(unique=True)
     active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TranslatedQuerySet.as_manager()
 
     def __str__(self):
         return self.title
@@ -109,6 +210,8 @@ class ArticleCategory(SlugMixin, models.Model):
     name = models.CharField(max_length=150)  # traducible por i18n
     slug = models.SlugField(unique=True)
 
+    objects = TranslatedQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -134,6 +237,25 @@ class Article(SlugMixin, models.Model):
     og_description = models.TextField(blank=True)
     og_image = models.ImageField(upload_to="og_images/", null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TranslatedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Admin date_hierarchy and newest-first listings
+            models.Index(fields=["created_at"], name="app_article_created_idx"),
+            # Per-country and per-category listings and feeds, newest first
+            # (from `manage.py audit_query_plans`)
+            models.Index(
+                fields=["country", "publish", "-created_at"],
+                name="article_country_publish_cr_idx",
+            ),
+            models.Index(
+                fields=["category", "publish", "-created_at"],
+                name="article_category_publish_c_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -163,10 +285,52 @@ class InvestmentObject(models.Model):
     active = models.BooleanField(default=True)
     images = models.JSONField(default=list, blank=True)  # URLs o rutas de imagen
 
+    objects = TranslatedQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
 
+class CountryStats(models.Model):
+    """What the country pages show about a country's published articles and
+    active investment objects, kept up to date by `app.country_stats`."""
+
+    country = models.OneToOneField(
+        Country, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    article_count = models.PositiveIntegerField(default=0)
+    latest_article_at = models.DateTimeField(null=True, blank=True)
+    object_count = models.PositiveIntegerField(default=0)
+    # Objects with a price; min, max and the sum cover those only
+    priced_count = models.PositiveIntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=26, decimal_places=2, default=0)
+    price_min = models.DecimalField(
+        max_digits=20, decimal_places=2, null=True, blank=True
+    )
+    price_max = models.DecimalField(
+        max_digits=20, decimal_places=2, null=True, blank=True
+    )
+    roi_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "country stats"
+
+    def __str__(self):
+        return f"Stats of {self.country_id}"
+
+    @property
+    def price_avg(self) -> Decimal | None:
+        if not self.priced_count:
+            return None
+        return (self.price_sum / self.priced_count).quantize(Decimal("0.01"))
+
+    @property
+    def roi_avg(self) -> Decimal | None:
+        if not self.object_count:
+            return None
+        return (self.roi_sum / self.object_count).quantize(Decimal("0.01"))
+
+
 class LandingPage(SlugMixin, models.Model):
     slug = models.SlugField(unique=True)
     slug_source_field = "title"
@@ -183,6 +347,9 @@ class LandingPage(SlugMixin, models.Model):
     og_title = models.CharField(max_length=100, blank=True)
     og_description = models.TextField(blank=True)
     og_image = models.ImageField(upload_to="og_images/", null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TranslatedQuerySet.as_manager()
 
     def __str__(self):
         return self.title
@@ -198,6 +365,14 @@ class Lead(models.Model):
     )  # landing / article / header…
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # Repeated submissions of the same form are kept once
+            models.UniqueConstraint(
+                fields=["email", "source"], name="unique_lead_email_source"
+            ),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -222,6 +397,12 @@ class MetalPrice(models.Model):
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["timestamp"], name="app_metalprice_ts_idx"),
+            models.Index(
+                fields=["metal", "timestamp"], name="app_metalprice_metal_ts_idx"
+            ),
+        ]
 
 
 class FuelPrice(models.Model):
@@ -232,6 +413,9 @@ class FuelPrice(models.Model):
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["timestamp"], name="app_fuelprice_ts_idx"),
+        ]
 
 
 class SocialPlatform(StrEnum):
@@ -273,3 +457,67 @@ class SocialLink(models.Model):
         ordering = ["order", "platform"]
         verbose_name = "Social Link"
         verbose_name_plural = "Social Links"
+
+
+class ImportStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class ImportJob(models.Model):
+    """A background bulk import started from the admin (see app/imports.py)."""
+
+    resource = models.CharField(max_length=50)  # model name, e.g. "article"
+    file = models.FileField(upload_to="imports/")
+    input_format = models.CharField(max_length=10, default="csv")
+    skip_diff = models.BooleanField(default=True)
+    status = models.CharField(
+        max_length=10,
+        choices=[(s.value, s.value.title()) for s in ImportStatus],
+        default=ImportStatus.PENDING.value,
+    )
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    errors = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.resource} import #{self.pk} ({self.status})"
+
+    @property
+    def progress(self) -> int:
+        """Percentage of rows processed so far."""
+        return int(self.processed * 100 / self.total) if self.total else 0
+
+
+class Translation(models.Model):
+    """A translated field value of an object in a language that has no
+    columns of its own (see app/sparse_translations.py)."""
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    field = models.CharField(max_length=50)
+    language = models.CharField(max_length=15)
+    value = models.TextField()
+
+    class Meta:
+        constraints = [
+            # Also the index of the per-page lookup: one language, the ids of
+            # a page of objects of one model
+            models.UniqueConstraint(
+                fields=["content_type", "language", "object_id", "field"],
+                name="unique_translation",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.field} [{self.language}]"
@@ -0,0 +1,298 @@
+"""Query-plan audit of the public views (SQLite `EXPLAIN QUERY PLAN`).
+
+`audit()` requests every route from `app.routes.iter_routes` with the test
+client, captures the SQL, explains each distinct statement and reports:
+
+* ``full_scan``: a table read without any index (``SCAN app_country``);
+* ``temp_btree``: a sort or grouping done in a temporary B-tree;
+* ``or_lookup``: an OR across columns (``MULTI-INDEX OR``, or a scan of a
+  table filtered with OR), like a slug lookup with language fallbacks.
+
+For scans and sorts it suggests a `models.Index` from the columns the
+statement filters (equality first, then ranges) and orders by, unless an
+existing index already starts with them. Used by `manage.py
+audit_query_plans`.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, models
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import translation
+
+from .routes import Route, iter_routes
+
+FULL_SCAN = "full_scan"
+TEMP_BTREE = "temp_btree"
+OR_LOOKUP = "or_lookup"
+
+# Requests during the audit use a private, empty cache
+AUDIT_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "query-plan-audit",
+    }
+}
+
+_SCAN = re.compile(r"^SCAN (\w+)(?: AS (\w+))?$")
+_TEMP = re.compile(r"^USE TEMP B-TREE FOR (.+)$")
+_TABLE = re.compile(r'(?:FROM|JOIN)\s+"(\w+)"(?:\s+(?:AS\s+)?"?([A-Z]\d+)"?)?')
+_CONDITION = re.compile(
+    r'"(\w+)"\."(\w+)"\s*(=|IN\b|IS\b|>=|<=|>|<|LIKE\b|GLOB\b)', re.IGNORECASE
+)
+_ORDER = re.compile(r'"(\w+)"\."(\w+)"\s*(ASC|DESC)?', re.IGNORECASE)
+_RANGE_OPERATORS = {">", "<", ">=", "<="}
+_EQUALITY_OPERATORS = {"=", "IN", "IS"}
+
+
+def normalise_sql(sql: str) -> str:
+    """Strip literals so the same statement in any language compares equal."""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    return re.sub(r"\b\d+\b", "?", sql)
+
+
+@dataclass
+class Finding:
+    kind: str
+    table: str
+    detail: str
+    sql: str
+    routes: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "kind": self.kind,
+            "table": self.table,
+            "detail": self.detail,
+            "sql": self.sql,
+            "routes": self.routes,
+        }
+
+
+@dataclass
+class Suggestion:
+    model: str
+    fields: Tuple[str, ...]
+    name: str
+    reasons: List[str] = field(default_factory=list)
+
+    def declaration(self) -> str:
+        fields = ", ".join(f'"{f}"' for f in self.fields)
+        return f'models.Index(fields=[{fields}], name="{self.name}")'
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "model": self.model,
+            "fields": list(self.fields),
+            "name": self.name,
+            "declaration": self.declaration(),
+            "reasons": self.reasons,
+        }
+
+
+@dataclass
+class Report:
+    statements: int = 0
+    findings: List[Finding] = field(default_factory=list)
+    suggestions: List[Suggestion] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "statements": self.statements,
+            "findings": [f.as_dict() for f in self.findings],
+            "suggestions": [s.as_dict() for s in self.suggestions],
+        }
+
+
+def capture(routes: Iterable[Route]) -> Dict[str, Tuple[str, List[str]]]:
+    """Distinct SELECT statements per normalised SQL: (example, route keys)."""
+    statements: Dict[str, Tuple[str, List[str]]] = {}
+    client = Client()
+    with override_settings(RATE_LIMIT_ENABLED=False, CACHES=AUDIT_CACHES):
+        for route in routes:
+            client.cookies[settings.LANGUAGE_COOKIE_NAME] = route.language
+            # Cached views would otherwise hide their queries after one run;
+            # this is the audit's own cache, not the site's
+            cache.clear()
+            with (
+                translation.override(route.language),
+                CaptureQueriesContext(connection) as ctx,
+            ):
+                client.get(route.path)
+            for query in ctx.captured_queries:
+                sql = query["sql"]
+                if not sql.lstrip().upper().startswith("SELECT"):
+                    continue
+                keys = statements.setdefault(normalise_sql(sql), (sql, []))[1]
+                if route.key not in keys:
+                    keys.append(route.key)
+    return statements
+
+
+def explain(sql: str) -> List[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _aliases(sql: str) -> Dict[str, str]:
+    aliases = {}
+    for table, alias in _TABLE.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def _split(sql: str) -> Tuple[str, str]:
+    """(FROM ... WHERE part, ORDER BY part) of the outermost statement."""
+    body = sql[sql.upper().find(" FROM ") :]
+    position = body.upper().rfind(" ORDER BY ")
+    if position == -1:
+        return body, ""
+    return body[:position], body[position:]
+
+
+def _columns(sql: str, table: str) -> Tuple[List[str], List[str], List[str]]:
+    """Equality, range and ORDER BY columns of `table` in `sql`."""
+    aliases = _aliases(sql)
+    where, order = _split(sql)
+    equality: List[str] = []
+    ranges: List[str] = []
+    for alias, column, operator in _CONDITION.findall(where):
+        if aliases.get(alias, alias) != table:
+            continue
+        operator = operator.upper()
+        if operator in _EQUALITY_OPERATORS and column not in equality:
+            equality.append(column)
+        elif operator in _RANGE_OPERATORS and column not in ranges:
+            ranges.append(column)
+    ordering = [
+        f"-{column}" if (direction or "").upper() == "DESC" else column
+        for alias, column, direction in _ORDER.findall(order)
+        if aliases.get(alias, alias) == table
+    ]
+    return equality, ranges, ordering
+
+
+def _has_or(sql: str) -> bool:
+    return re.search(r"\bOR\b", _split(sql)[0], re.IGNORECASE) is not None
+
+
+def _existing_indexes(table: str) -> List[Tuple[str, ...]]:
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [
+        tuple(c["columns"])
+        for c in constraints.values()
+        if c["columns"] and (c["index"] or c["unique"] or c["primary_key"])
+    ]
+
+
+def _model_for(table: str) -> Optional[type[models.Model]]:
+    for model in apps.get_models():
+        if model._meta.db_table == table:
+            return model
+    return None
+
+
+def _index_name(model: type[models.Model], fields: Sequence[str]) -> str:
+    # Django limits index names to 30 characters
+    stem = "_".join([model._meta.model_name] + [f.lstrip("-") for f in fields])
+    return f"{stem[:26].rstrip('_')}_idx"
+
+
+def suggest(
+    table: str, sql: str
+) -> Optional[Tuple[type[models.Model], Tuple[str, ...]]]:
+    """Index fields for `table` that would serve `sql`, or None."""
+    model = _model_for(table)
+    if model is None or _has_or(sql):
+        # An OR over columns needs one index per column, not a composite
+        return None
+    equality, ranges, ordering = _columns(sql, table)
+    by_column = {f.column: f.name for f in model._meta.concrete_fields}
+    pk = model._meta.pk.column
+    columns: List[str] = [c for c in equality if c != pk]
+    # One range column can follow the equalities, or the sort columns
+    if ranges:
+        columns.append(ranges[0])
+    else:
+        columns += [c for c in ordering if c.lstrip("-") not in columns]
+    columns = [c for c in columns if c.lstrip("-") in by_column]
+    if not columns:
+        return None
+    plain = tuple(c.lstrip("-") for c in columns)
+    for existing in _existing_indexes(table):
+        if existing[: len(plain)] == plain:
+            return None
+    fields = tuple(
+        ("-" if c.startswith("-") else "") + by_column[c.lstrip("-")] for c in columns
+    )
+    return model, fields
+
+
+def analyse(statements: Dict[str, Tuple[str, List[str]]]) -> Report:
+    report = Report(statements=len(statements))
+    suggestions: Dict[Tuple[str, Tuple[str, ...]], Suggestion] = {}
+
+    def add_suggestion(table: str, sql: str, reason: str) -> None:
+        result = suggest(table, sql)
+        if result is None:
+            return
+        model, fields = result
+        label = model._meta.label
+        item = suggestions.setdefault(
+            (label, fields), Suggestion(label, fields, _index_name(model, fields))
+        )
+        if reason not in item.reasons:
+            item.reasons.append(reason)
+
+    for normalised, (sql, routes) in statements.items():
+        plan = explain(sql)
+        view = routes[0].split("|")[0]
+        tables = [t for t, _ in _TABLE.findall(sql)]
+        main_table = tables[0] if tables else ""
+        scanned = set()
+        for detail in plan:
+            scan = _SCAN.match(detail)
+            if scan:
+                table = _aliases(sql).get(scan.group(1), scan.group(1))
+                scanned.add(table)
+                report.findings.append(
+                    Finding(FULL_SCAN, table, detail, normalised, routes)
+                )
+                add_suggestion(table, sql, f"{FULL_SCAN} in {view}")
+            elif detail == "MULTI-INDEX OR":
+                report.findings.append(
+                    Finding(OR_LOOKUP, main_table, detail, normalised, routes)
+                )
+            elif _TEMP.match(detail):
+                report.findings.append(
+                    Finding(TEMP_BTREE, main_table, detail, normalised, routes)
+                )
+                add_suggestion(main_table, sql, f"{TEMP_BTREE} in {view}")
+        if scanned and _has_or(sql):
+            for table in scanned:
+                report.findings.append(
+                    Finding(OR_LOOKUP, table, "OR over a scan", normalised, routes)
+                )
+    report.suggestions = list(suggestions.values())
+    return report
+
+
+def audit(
+    languages: Iterable[str] | None = None, names: Iterable[str] | None = None
+) -> Report:
+    """Request every route and analyse the plans of the SQL it runs."""
+    if connection.vendor != "sqlite":
+        raise ValueError("The query-plan audit reads SQLite plans only")
+    return analyse(capture(iter_routes(languages, names)))
@@ -0,0 +1,180 @@
+"""Token-bucket rate limiting per client IP and route.
+
+`settings.RATE_LIMITS` maps URL names to a bucket size (`burst`) and refill
+rate (`rate`, tokens per second). Every request to a limited route takes one
+token from the bucket of its (route, client IP); an empty bucket gets a 429
+with `Retry-After` from `app.middleware.RateLimitMiddleware` before the view
+runs.
+
+Buckets live in process memory by default. With `RATE_LIMIT_BACKEND =
+"sqlite"` they are kept in a small SQLite file of their own (not the site
+database), so all workers on a host share the same limits. When that file
+stays locked past its timeout the request is let through, with a warning.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+# Buckets untouched for this long are full again and can be forgotten
+_PRUNE_AGE = 3600.0
+_PRUNE_EVERY = 10_000
+
+
+@dataclass(frozen=True)
+class Rule:
+    rate: float
+    burst: int
+
+    def refill(self, tokens: float, elapsed: float) -> float:
+        return min(float(self.burst), tokens + elapsed * self.rate)
+
+    def wait(self, tokens: float) -> float:
+        """Seconds until one token is available."""
+        return (1.0 - tokens) / self.rate if self.rate > 0 else _PRUNE_AGE
+
+
+class MemoryBackend:
+    """Buckets in a dict; limits are per worker process."""
+
+    def __init__(self) -> None:
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def take(self, key: str, rule: Rule, now: float) -> float:
+        """Take a token; return 0 if granted, else seconds to wait."""
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(rule.burst), now))
+            tokens = rule.refill(tokens, now - updated)
+            granted = tokens >= 1.0
+            if granted:
+                tokens -= 1.0
+            self._buckets[key] = (tokens, now)
+            self._calls += 1
+            if self._calls % _PRUNE_EVERY == 0:
+                self._buckets = {
+                    k: v for k, v in self._buckets.items() if now - v[1] < _PRUNE_AGE
+                }
+        return 0.0 if granted else rule.wait(tokens)
+
+
+class SQLiteBackend:
+    """Buckets in a shared SQLite file; limits hold across processes."""
+
+    def __init__(self, path: str, timeout: float = 1.0) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._calls = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bucket "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, rule: Rule, now: float) -> float:
+        try:
+            return self._take(key, rule, now)
+        except sqlite3.OperationalError as exc:
+            # Locked past the timeout, or unusable: a missed limit is better
+            # than failing the request
+            logger.warning("Rate limit check skipped for %s: %s", key, exc)
+            return 0.0
+
+    def _take(self, key: str, rule: Rule, now: float) -> float:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM bucket WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (float(rule.burst), now)
+            tokens = rule.refill(tokens, now - updated)
+            granted = tokens >= 1.0
+            if granted:
+                tokens -= 1.0
+            conn.execute(
+                "INSERT OR REPLACE INTO bucket (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+            self._calls += 1
+            if self._calls % _PRUNE_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM bucket WHERE updated < ?", (now - _PRUNE_AGE,)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return 0.0 if granted else rule.wait(tokens)
+
+
+_backend: Optional[MemoryBackend | SQLiteBackend] = None
+_rules: Optional[Dict[str, Rule]] = None
+
+
+def get_backend() -> MemoryBackend | SQLiteBackend:
+    global _backend
+    if _backend is None:
+        if getattr(settings, "RATE_LIMIT_BACKEND", "memory") == "sqlite":
+            _backend = SQLiteBackend(str(settings.RATE_LIMIT_SQLITE_PATH))
+        else:
+            _backend = MemoryBackend()
+    return _backend
+
+
+def get_rules() -> Dict[str, Rule]:
+    global _rules
+    if _rules is None:
+        _rules = {
+            route: Rule(rate=float(conf["rate"]), burst=int(conf["burst"]))
+            for route, conf in getattr(settings, "RATE_LIMITS", {}).items()
+        }
+    return _rules
+
+
+@receiver(setting_changed)
+def _reset(setting: str, **kwargs) -> None:
+    global _backend, _rules
+    if setting.startswith("RATE_LIMIT"):
+        _backend = _rules = None
+
+
+def client_ip(request: HttpRequest) -> str:
+    """The client's address. With `RATE_LIMIT_TRUST_FORWARDED = N` (the
+    number of proxies in front of the app), the N-th `X-Forwarded-For`
+    entry from the right: the address the outermost trusted proxy saw.
+    Entries to its left are whatever the client sent and are ignored."""
+    hops = int(getattr(settings, "RATE_LIMIT_TRUST_FORWARDED", 0))
+    if hops > 0:
+        forwarded = [
+            address.strip()
+            for address in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")
+            if address.strip()
+        ]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.META.get("REMOTE_ADDR", "")
@@ -0,0 +1,94 @@
+"""Send reads to the read-only `replica` database, writes to `default`.
+
+Only active when `settings.DATABASES` has a `replica` alias (see
+`DB_REPLICA_PATH`). Reads stay on the primary while
+
+* the primary is inside a transaction, so code reads what it just wrote;
+* the request is pinned by `app.middleware.PrimaryDatabaseMiddleware`
+  (admin pages and every non-GET/HEAD request, including the parts of a
+  streamed body read after the view returned), or code runs inside
+  `use_primary()`.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    Optional,
+    TypeVar,
+)
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = "replica"
+
+T = TypeVar("T")
+
+_pinned: ContextVar[bool] = ContextVar("app_db_pinned", default=False)
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    """Read from the primary database inside the block."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def pinned_iterator(iterable: Iterable[T]) -> Iterator[T]:
+    """`iterable`, each item produced inside `use_primary()`.
+
+    For streamed response bodies, which are read after the view (and the
+    block that pinned it) returned. The pin is held per item rather than
+    across `yield`, so it never leaks into the code reading the stream.
+    """
+    iterator = iter(iterable)
+    while True:
+        with use_primary():
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+async def apinned_iterator(iterable: AsyncIterable[T]) -> AsyncIterator[T]:
+    """`pinned_iterator()` for async streams."""
+    iterator = aiter(iterable)
+    while True:
+        with use_primary():
+            try:
+                item = await anext(iterator)
+            except StopAsyncIteration:
+                return
+        yield item
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if REPLICA_DB_ALIAS not in settings.DATABASES or _pinned.get():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        # Both aliases hold the same data
+        aliases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> bool:
+        return db == DEFAULT_DB_ALIAS
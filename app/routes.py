@@ -0,0 +1,146 @@
+"""Enumerate the named routes in `app/urls.py` with sample arguments.
+
+Routes that take a slug or pk, or need a query string, are filled in from the
+first matching row in the database; a route is skipped for a language when no
+such row exists. The load-test harness, the query budget tests and the
+query-plan audit all use this so they exercise exactly the same URLs.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.urls import URLPattern, reverse
+from django.utils import translation
+
+from . import urls as app_urls
+from .models import (
+    Article,
+    ArticleCategory,
+    Country,
+    InvestmentObject,
+    LandingPage,
+    Service,
+)
+
+Kwargs = Optional[Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str
+    language: str
+    path: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}|{self.language}"
+
+
+def _first_slug(queryset) -> Optional[str]:
+    obj = queryset.order_by("pk").first()
+    # Reading `slug` goes through modeltranslation, so it is the active
+    # language's slug with the configured fallback.
+    return obj.slug if obj is not None and obj.slug else None
+
+
+def _country(lang: str) -> Kwargs:
+    slug = _first_slug(Country.objects.filter(active=True))
+    return {"country_slug": slug} if slug else None
+
+
+def _article(lang: str) -> Kwargs:
+    slug = _first_slug(Article.objects.filter(publish=True))
+    return {"slug": slug} if slug else None
+
+
+def _service(lang: str) -> Kwargs:
+    slug = _first_slug(Service.objects.filter(active=True))
+    return {"slug": slug} if slug else None
+
+
+def _landing(lang: str) -> Kwargs:
+    slug = _first_slug(LandingPage.objects.filter(publish=True))
+    return {"slug": slug} if slug else None
+
+
+def _object(lang: str) -> Kwargs:
+    pk = (
+        InvestmentObject.objects.filter(active=True)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    return {"pk": pk} if pk else None
+
+
+def _category_feed(lang: str) -> Kwargs:
+    slug = _first_slug(ArticleCategory.objects.all())
+    return {"slug": slug} if slug else None
+
+
+def _country_feed(lang: str) -> Kwargs:
+    kwargs = _country(lang)
+    return {"slug": kwargs["country_slug"]} if kwargs else None
+
+
+# Sample arguments for every route that needs them, by URL name
+SAMPLE_KWARGS: Dict[str, Callable[[str], Kwargs]] = {
+    "country_detail": _country,
+    "country_articles": _country,
+    "country_objects": _country,
+    "article_detail": _article,
+    "object_detail": _object,
+    "service_detail": _service,
+    "landing_page": _landing,
+    "category_feed": _category_feed,
+    "country_feed": _country_feed,
+}
+
+
+def _portfolio(lang: str) -> Optional[str]:
+    kwargs = _object(lang)
+    return f"holdings={kwargs['pk']}:10000" if kwargs else None
+
+
+# Sample query strings of routes that need one, by URL name
+SAMPLE_QUERIES: Dict[str, Callable[[str], Optional[str]]] = {
+    "portfolio": _portfolio,
+}
+
+
+def route_names() -> list[str]:
+    return [
+        p.name
+        for p in app_urls.urlpatterns
+        if isinstance(p, URLPattern) and p.name is not None
+    ]
+
+
+def iter_routes(
+    languages: Iterable[str] | None = None, names: Iterable[str] | None = None
+) -> Iterator[Route]:
+    """Yield a `Route` per named URL and language that can be resolved."""
+    languages = list(languages or settings.MODELTRANSLATION_LANGUAGES)
+    wanted = set(names) if names else None
+    for name in route_names():
+        if wanted is not None and name not in wanted:
+            continue
+        pattern_has_args = name in SAMPLE_KWARGS
+        for lang in languages:
+            with translation.override(lang):
+                kwargs = SAMPLE_KWARGS[name](lang) if pattern_has_args else {}
+                query = SAMPLE_QUERIES[name](lang) if name in SAMPLE_QUERIES else ""
+                if kwargs is None or query is None:
+                    continue
+                path = reverse(f"{app_urls.app_name}:{name}", kwargs=kwargs)
+                if query:
+                    path = f"{path}?{query}"
+            yield Route(name=name, language=lang, path=path)
+
+
+def language_headers(lang: str) -> Dict[str, str]:
+    """Request headers that make the site render in `lang`."""
+    return {"Cookie": f"{settings.LANGUAGE_COOKIE_NAME}={lang}"}
@@ -0,0 +1,133 @@
+"""Full-text index of articles for the admin search (SQLite FTS5).
+
+`app_article_search` is a contentless FTS5 table whose rowid is the article
+id, with two columns: `title` and `content`, each holding every language's
+text joined together. Triggers on `app_article` keep it in sync.
+
+Django rebuilds a SQLite table (dropping its triggers) when a migration
+alters it, so the triggers are (re)installed from `post_migrate` rather than
+from a migration; the index is refilled whenever they had to be recreated.
+On other databases nothing is installed and the admin falls back to its
+plain `search_fields`.
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.utils.text import smart_split, unescape_string_literal
+
+TABLE = "app_article_search"
+COLUMNS = ("title", "content")
+_TRIGGERS = {
+    "ai": "AFTER INSERT ON app_article BEGIN {insert}; END",
+    "ad": "AFTER DELETE ON app_article BEGIN {delete}; END",
+    "au": "AFTER UPDATE OF {watched} ON app_article BEGIN {delete}; {insert}; END",
+}
+
+
+def _suffixes() -> List[str]:
+    languages = getattr(settings, "MODELTRANSLATION_LANGUAGES", ())
+    return [code.replace("-", "_") for code in languages]
+
+
+def _values(prefix: str) -> str:
+    joined = (
+        " || ' ' || ".join(
+            f"coalesce({prefix}{column}_{suffix}, '')" for suffix in _suffixes()
+        )
+        for column in COLUMNS
+    )
+    return ", ".join(joined)
+
+
+def _trigger_sql() -> List[str]:
+    columns = ", ".join(COLUMNS)
+    insert = (
+        f"INSERT INTO {TABLE} (rowid, {columns}) VALUES (new.id, {_values('new.')})"
+    )
+    # Contentless tables forget the text, so a delete must repeat it
+    delete = (
+        f"INSERT INTO {TABLE} ({TABLE}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {_values('old.')})"
+    )
+    watched = ", ".join(f"{c}_{s}" for c in COLUMNS for s in _suffixes())
+    return [
+        f"CREATE TRIGGER {TABLE}_{name} "
+        + body.format(insert=insert, delete=delete, watched=watched)
+        for name, body in _TRIGGERS.items()
+    ]
+
+
+def is_available(connection: BaseDatabaseWrapper) -> bool:
+    if connection.vendor != "sqlite":
+        return False
+    return TABLE in connection.introspection.table_names()
+
+
+def install(connection: BaseDatabaseWrapper) -> bool:
+    """Create the index and its triggers if needed; return True if refilled."""
+    if connection.vendor != "sqlite":
+        return False
+    if "app_article" not in connection.introspection.table_names():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master "
+            "WHERE type = 'trigger' AND name LIKE %s",
+            [f"{TABLE}_%"],
+        )
+        complete = cursor.fetchone()[0] == len(_TRIGGERS)
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+            f"{', '.join(COLUMNS)}, content='', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        for name in _TRIGGERS:
+            # Always recreate: the language list may have changed
+            cursor.execute(f"DROP TRIGGER IF EXISTS {TABLE}_{name}")
+        for statement in _trigger_sql():
+            cursor.execute(statement)
+        if complete:
+            return False
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('delete-all')")
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, {', '.join(COLUMNS)}) "
+            f"SELECT id, {_values('')} FROM app_article"
+        )
+    return True
+
+
+def install_after_migrate(sender, using: str = "default", **kwargs) -> None:
+    """`post_migrate` receiver, connected in `AppConfig.ready`."""
+    if sender.name == "app":
+        install(connections[using])
+
+
+def match_expression(term: str, columns: Sequence[str] = ()) -> str:
+    """FTS5 query matching every word of `term` as a prefix.
+
+    Words are quoted, so user input cannot inject FTS operators; `columns`
+    restricts the match (all columns when empty).
+    """
+    words = []
+    for bit in smart_split(term):
+        if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+            bit = unescape_string_literal(bit)
+        bit = bit.replace('"', '""')
+        if bit:
+            words.append(f'"{bit}"*')
+    if not words:
+        return ""
+    expression = "(" + " ".join(words) + ")"
+    if columns:
+        expression = "{" + " ".join(columns) + "} : " + expression
+    return expression
+
+
+def matching_ids_sql(expression: str) -> tuple[str, List[str]]:
+    """SQL selecting the ids of articles matching an FTS5 expression."""
+    return f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s", [expression]
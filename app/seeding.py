@@ -0,0 +1,234 @@
+"""Deterministic row generators for `seed_fake_data --scale`.
+
+Nothing in this module touches the database or the model classes, so the
+generators can run in worker processes. Each chunk of rows is produced from
+its own `random.Random` seeded with `(seed, kind, chunk)`, which makes the
+output independent of the number of workers and of scheduling order. The
+command turns the returned dicts into model instances and bulk-inserts them.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Sequence, Tuple
+
+from django.utils.text import slugify
+
+# Faker locale used to build the word pool of each site language
+FAKER_LOCALES = {
+    "es": "es_ES",
+    "en": "en_US",
+    "ru": "ru_RU",
+    "fr": "fr_FR",
+    "de": "de_DE",
+    "ar": "ar_AA",
+    "zh-hans": "zh_CN",
+}
+
+LEAD_SOURCES = (("form", 6), ("landing", 3), ("article", 2), ("header", 1))
+METALS = (("gold", 1950.0), ("silver", 23.0), ("platinum", 960.0))
+FUEL_BASE_PRICE = 78.0
+TICK_INTERVAL = timedelta(minutes=5)
+ARTICLE_SPAN_DAYS = 5 * 365
+
+
+@dataclass(frozen=True)
+class Vocabulary:
+    """Word pools per language attribute suffix (e.g. `zh_hans`)."""
+
+    words: Dict[str, Tuple[str, ...]]
+    first_names: Tuple[str, ...]
+    last_names: Tuple[str, ...]
+    domains: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ScalePlan:
+    """Everything a worker needs besides the vocabulary."""
+
+    seed: int
+    languages: Tuple[str, ...]
+    country_ids: Tuple[int, ...]
+    country_weights: Tuple[float, ...]
+    category_ids: Tuple[int, ...]
+    category_weights: Tuple[float, ...]
+    now: datetime
+
+
+def build_vocabulary(
+    seed: int, languages: Sequence[str], size: int = 400
+) -> Vocabulary:
+    """Sample word pools once with Faker so workers never call it per field."""
+    from faker import Faker
+
+    words: Dict[str, Tuple[str, ...]] = {}
+    for code in languages:
+        fake = Faker(FAKER_LOCALES.get(code, "en_US"))
+        fake.seed_instance(seed)
+        words[code.replace("-", "_")] = tuple(dict.fromkeys(fake.words(size)))
+    fake = Faker("en_US")
+    fake.seed_instance(seed)
+    return Vocabulary(
+        words=words,
+        first_names=tuple(dict.fromkeys(fake.first_name() for _ in range(200))),
+        last_names=tuple(dict.fromkeys(fake.last_name() for _ in range(200))),
+        domains=tuple(dict.fromkeys(fake.free_email_domain() for _ in range(20))),
+    )
+
+
+def zipf_weights(n: int, exponent: float = 1.1) -> List[float]:
+    """Long-tailed weights: a few popular items and many rarely used ones."""
+    return [1.0 / (rank**exponent) for rank in range(1, n + 1)]
+
+
+_vocabulary: Vocabulary | None = None
+_plan: ScalePlan | None = None
+
+
+def init_worker(vocabulary: Vocabulary, plan: ScalePlan) -> None:
+    """Pool initializer: ship the shared inputs once per worker process."""
+    global _vocabulary, _plan
+    _vocabulary, _plan = vocabulary, plan
+
+
+def _rng(kind: str, chunk: int) -> random.Random:
+    assert _plan is not None
+    return random.Random(f"{_plan.seed}:{kind}:{chunk}")
+
+
+def _sentence(rng: random.Random, pool: Sequence[str], words: int) -> str:
+    text = " ".join(rng.choices(pool, k=words))
+    return text[:1].upper() + text[1:]
+
+
+def _paragraphs(rng: random.Random, pool: Sequence[str], count: int) -> str:
+    return "".join(
+        "<p>{}.</p>".format(
+            ". ".join(_sentence(rng, pool, rng.randint(8, 16)) for _ in range(4))
+        )
+        for _ in range(count)
+    )
+
+
+def _article_row(rng: random.Random, index: int) -> Dict[str, Any]:
+    assert _plan is not None and _vocabulary is not None
+    row: Dict[str, Any] = {
+        "category_id": rng.choices(_plan.category_ids, _plan.category_weights)[0],
+        # Roughly 60% of articles are about a specific country
+        "country_id": (
+            rng.choices(_plan.country_ids, _plan.country_weights)[0]
+            if rng.random() < 0.6
+            else None
+        ),
+        "publish": rng.random() < 0.92,
+        # Skewed towards recent dates: publishing volume grows over time
+        "created_at": _plan.now
+        - timedelta(days=ARTICLE_SPAN_DAYS * (rng.random() ** 2)),
+    }
+    for code in _plan.languages:
+        suffix = code.replace("-", "_")
+        pool = _vocabulary.words[suffix]
+        title = _sentence(rng, pool, rng.randint(5, 9))
+        summary = _sentence(rng, pool, rng.randint(18, 30))
+        row[f"title_{suffix}"] = title
+        row[f"slug_{suffix}"] = f"{slugify(title)[:200] or 'article'}-{index}"
+        row[f"content_{suffix}"] = _paragraphs(rng, pool, rng.randint(3, 8))
+        row[f"meta_title_{suffix}"] = title[:70]
+        row[f"meta_description_{suffix}"] = summary[:320]
+        row[f"og_title_{suffix}"] = title[:100]
+        row[f"og_description_{suffix}"] = summary
+    return row
+
+
+def _object_row(rng: random.Random, index: int) -> Dict[str, Any]:
+    assert _plan is not None and _vocabulary is not None
+    row: Dict[str, Any] = {
+        "country_id": rng.choices(_plan.country_ids, _plan.country_weights)[0],
+        # Log-normal prices: median around 250k, long tail into the millions
+        "price": Decimal(f"{rng.lognormvariate(math.log(250_000), 1.0):.2f}"),
+        "expected_roi": Decimal(min(max(rng.gauss(9.0, 4.0), 1.0), 35.0)).quantize(
+            Decimal("0.01")
+        ),
+        "active": rng.random() < 0.85,
+        "images": [
+            f"https://picsum.photos/seed/{index}-{n}/800/600"
+            for n in range(rng.randint(0, 4))
+        ],
+    }
+    for code in _plan.languages:
+        suffix = code.replace("-", "_")
+        pool = _vocabulary.words[suffix]
+        row[f"title_{suffix}"] = _sentence(rng, pool, rng.randint(3, 6))
+        row[f"description_{suffix}"] = _sentence(rng, pool, rng.randint(25, 60))
+    return row
+
+
+def _lead_row(rng: random.Random, index: int) -> Dict[str, Any]:
+    assert _plan is not None and _vocabulary is not None
+    first = rng.choice(_vocabulary.first_names)
+    last = rng.choice(_vocabulary.last_names)
+    sources, weights = zip(*LEAD_SOURCES)
+    return {
+        "name": f"{first} {last}",
+        "email": f"{slugify(first)}.{slugify(last)}{index}@{rng.choice(_vocabulary.domains)}",
+        "phone": f"+{rng.randint(1, 99)} {rng.randint(100, 999)} {rng.randint(1_000_000, 9_999_999)}",
+        "message": _sentence(rng, _vocabulary.words["en"], rng.randint(6, 30)),
+        "source": rng.choices(sources, weights)[0],
+        "created_at": _plan.now - timedelta(days=730 * rng.random()),
+    }
+
+
+def _tick_row(rng: random.Random, index: int) -> Dict[str, Any]:
+    """One price tick; ticks are spread evenly backwards from `now`."""
+    assert _plan is not None
+    slot = len(METALS) + 1
+    timestamp = _plan.now - TICK_INTERVAL * (index // slot)
+    # Slow yearly cycle plus daily noise, so charts look plausible
+    cycle = 0.08 * math.sin(index / slot / (288 * 365) * 2 * math.pi)
+    drift = math.exp(cycle + rng.gauss(0.0, 0.01))
+    kind = index % slot
+    if kind < len(METALS):
+        metal, base = METALS[kind]
+        return {
+            "model": "metal",
+            "metal": metal,
+            "price": Decimal(f"{base * drift:.6f}"),
+            "timestamp": timestamp,
+        }
+    return {
+        "model": "fuel",
+        "fuel_type": "Fuel Platts",
+        "price": Decimal(f"{FUEL_BASE_PRICE * drift:.6f}"),
+        "currency": "USD",
+        "timestamp": timestamp,
+    }
+
+
+_GENERATORS = {
+    "article": _article_row,
+    "object": _object_row,
+    "lead": _lead_row,
+    "tick": _tick_row,
+}
+
+
+def generate_chunk(task: Tuple[str, int, int, int]) -> Tuple[str, List[Dict[str, Any]]]:
+    """Generate rows `start..start+count` of `kind` for chunk number `chunk`."""
+    kind, chunk, start, count = task
+    rng = _rng(kind, chunk)
+    make = _GENERATORS[kind]
+    return kind, [make(rng, index) for index in range(start, start + count)]
+
+
+def plan_tasks(
+    kind: str, total: int, batch_size: int, offset: int = 0
+) -> List[Tuple[str, int, int, int]]:
+    """Split `total` rows into chunks; row indexes start at `offset`."""
+    return [
+        (kind, chunk, offset + start, min(batch_size, total - start))
+        for chunk, start in enumerate(range(0, total, batch_size))
+    ]
@@ -0,0 +1,94 @@
+"""Signal receivers of the app, connected in `AppConfig.ready`.
+
+`CountryStats` follows every save and delete of `Article` and
+`InvestmentObject` (see `app.country_stats`). A save reads the row's
+previous share first, unless `update_fields` leaves out every field the
+stats depend on. Fixture loading (`raw`) is skipped; rebuild afterwards.
+"""
+
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .country_stats import article_changed, article_share, object_changed, object_share
+from .models import Article, InvestmentObject
+
+ARTICLE_FIELDS = {"country", "country_id", "publish", "created_at"}
+OBJECT_FIELDS = {"country", "country_id", "active", "price", "expected_roi"}
+_UNCHANGED = object()
+
+
+def _previous(instance, fields, update_fields, share):
+    """`share` of the stored row, or `_UNCHANGED` when the save cannot change
+    it. `fields` are also `share`'s arguments."""
+    if update_fields is not None and not fields & set(update_fields):
+        return _UNCHANGED
+    if instance._state.adding or instance.pk is None:
+        return None
+    names = fields - {"country"}
+    row = type(instance)._base_manager.filter(pk=instance.pk).values(*names).first()
+    return share(**row) if row else None
+
+
+@receiver(pre_save, sender=Article)
+def _article_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        instance._stats_share = _previous(
+            instance,
+            ARTICLE_FIELDS,
+            update_fields,
+            article_share,
+        )
+
+
+@receiver(post_save, sender=Article)
+def _article_saved(sender, instance, raw=False, **kwargs):
+    old = getattr(instance, "_stats_share", None)
+    if raw or old is _UNCHANGED:
+        return
+    article_changed(
+        old, article_share(instance.country_id, instance.publish, instance.created_at)
+    )
+
+
+@receiver(post_delete, sender=Article)
+def _article_deleted(sender, instance, **kwargs):
+    article_changed(
+        article_share(instance.country_id, instance.publish, instance.created_at),
+        None,
+    )
+
+
+@receiver(pre_save, sender=InvestmentObject)
+def _object_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        instance._stats_share = _previous(
+            instance,
+            OBJECT_FIELDS,
+            update_fields,
+            object_share,
+        )
+
+
+@receiver(post_save, sender=InvestmentObject)
+def _object_saved(sender, instance, raw=False, **kwargs):
+    old = getattr(instance, "_stats_share", None)
+    if raw or old is _UNCHANGED:
+        return
+    object_changed(
+        old,
+        object_share(
+            instance.country_id, instance.active, instance.price, instance.expected_roi
+        ),
+    )
+
+
+@receiver(post_delete, sender=InvestmentObject)
+def _object_deleted(sender, instance, **kwargs):
+    object_changed(
+        object_share(
+            instance.country_id, instance.active, instance.price, instance.expected_roi
+        ),
+        None,
+    )
@@ -0,0 +1,227 @@
+"""Sharded, gzip-compressed sitemaps with hreflang alternates.
+
+Every section (articles, countries, services, landing pages) is split into
+shards that cover a fixed primary-key range, so a shard boundary never moves
+when rows are added or removed elsewhere. A small JSON manifest remembers the
+row count and newest `updated_at` of each shard; on the next build only the
+shards whose numbers changed are rewritten.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+from xml.sax.saxutils import escape, quoteattr
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Count, ExpressionWrapper, F, Max
+from django.urls import reverse
+from django.utils import translation
+
+from .models import Article, Country, LandingPage, Service
+
+MAX_URLS_PER_SHARD = 50_000
+CHUNK_SIZE = 2_000
+INDEX_NAME = "sitemap.xml"
+MANIFEST_NAME = "manifest.json"
+_SLUG_PLACEHOLDER = "__slug__"
+
+
+@dataclass(frozen=True)
+class Section:
+    name: str
+    model: type[models.Model]
+    route: str
+    url_kwarg: str
+    filters: Dict[str, Any]
+
+
+SECTIONS = (
+    Section("articles", Article, "app:article_detail", "slug", {"publish": True}),
+    Section(
+        "countries", Country, "app:country_detail", "country_slug", {"active": True}
+    ),
+    Section("services", Service, "app:service_detail", "slug", {"active": True}),
+    Section("landing", LandingPage, "app:landing_page", "slug", {"publish": True}),
+)
+
+
+def _languages() -> List[str]:
+    return list(getattr(settings, "MODELTRANSLATION_LANGUAGES", ("en",)))
+
+
+def _slug_column(code: str) -> str:
+    return f"slug_{code.replace('-', '_')}"
+
+
+def objects_per_shard() -> int:
+    """Rows per shard; each row yields at most one URL per language."""
+    return max(1, MAX_URLS_PER_SHARD // len(_languages()))
+
+
+def shard_name(section: Section, bucket: int) -> str:
+    return f"{section.name}-{bucket:04d}.xml.gz"
+
+
+def _root() -> Path:
+    return Path(settings.SITEMAP_ROOT)
+
+
+def _url_templates(section: Section) -> Dict[str, str]:
+    """Reverse the route once per language and reuse it as a format string."""
+    templates = {}
+    for code in _languages():
+        with translation.override(code):
+            path = reverse(section.route, kwargs={section.url_kwarg: _SLUG_PLACEHOLDER})
+        templates[code] = settings.SITE_URL.rstrip("/") + path.replace(
+            _SLUG_PLACEHOLDER, "{}"
+        )
+    return templates
+
+
+def _bucket_stats(section: Section, per_shard: int) -> Dict[str, Dict[str, Any]]:
+    """Return `{bucket: {"count", "modified"}}` in a single grouped query."""
+    bucket = ExpressionWrapper(
+        (F("pk") - 1) / per_shard, output_field=models.IntegerField()
+    )
+    rows = (
+        section.model.objects.rewrite(False)
+        .filter(**section.filters)
+        .annotate(bucket=bucket)
+        .values("bucket")
+        .annotate(count=Count("pk"), modified=Max("updated_at"))
+        .order_by("bucket")
+    )
+    return {
+        str(row["bucket"]): {
+            "count": row["count"],
+            "modified": row["modified"].isoformat() if row["modified"] else None,
+        }
+        for row in rows
+    }
+
+
+def _iter_urls(section: Section, bucket: int, per_shard: int) -> Iterator[str]:
+    """Stream `<url>` elements for one shard without materialising the rows."""
+    languages = _languages()
+    columns = [_slug_column(code) for code in languages]
+    templates = _url_templates(section)
+    default = getattr(settings, "MODELTRANSLATION_DEFAULT_LANGUAGE", languages[0])
+    low = bucket * per_shard + 1
+    rows = (
+        section.model.objects.rewrite(False)
+        .filter(**section.filters, pk__gte=low, pk__lt=low + per_shard)
+        .order_by("pk")
+        .values_list("updated_at", *columns)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for updated_at, *slugs in rows:
+        urls = {
+            code: templates[code].format(slug)
+            for code, slug in zip(languages, slugs)
+            if slug
+        }
+        if not urls:
+            continue
+        lastmod = f"<lastmod>{updated_at.isoformat()}</lastmod>" if updated_at else ""
+        alternates = "".join(
+            f'<xhtml:link rel="alternate" hreflang="{code}" href={quoteattr(url)}/>'
+            for code, url in urls.items()
+        )
+        if default in urls:
+            alternates += (
+                '<xhtml:link rel="alternate" hreflang="x-default" '
+                f"href={quoteattr(urls[default])}/>"
+            )
+        for url in urls.values():
+            yield f"<url><loc>{escape(url)}</loc>{lastmod}{alternates}</url>\n"
+
+
+def _write_shard(section: Section, bucket: int, per_shard: int, path: Path) -> None:
+    tmp = path.with_suffix(".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as fh:
+        fh.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+            'xmlns:xhtml="http://www.w3.org/1999/xhtml">\n'
+        )
+        for chunk in _iter_urls(section, bucket, per_shard):
+            fh.write(chunk)
+        fh.write("</urlset>\n")
+    os.replace(tmp, path)
+
+
+def _write_index(manifest: Dict[str, Any], path: Path) -> None:
+    base = settings.SITE_URL.rstrip("/")
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        )
+        for section in SECTIONS:
+            shards = manifest["sections"].get(section.name, {})
+            for bucket in sorted(shards, key=int):
+                info = shards[bucket]
+                loc = base + reverse(
+                    "sitemap_shard", kwargs={"name": shard_name(section, int(bucket))}
+                )
+                lastmod = (
+                    f"<lastmod>{info['modified']}</lastmod>" if info["modified"] else ""
+                )
+                fh.write(f"<sitemap><loc>{escape(loc)}</loc>{lastmod}</sitemap>\n")
+        fh.write("</sitemapindex>\n")
+    os.replace(tmp, path)
+
+
+def _load_manifest(root: Path) -> Dict[str, Any]:
+    try:
+        with open(root / MANIFEST_NAME, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_sitemaps(full: bool = False) -> Dict[str, int]:
+    """Regenerate changed shards and the index; return write/skip/remove counts.
+
+    A full rebuild is forced when `full` is set or when the language list (and
+    therefore the shard size) differs from the one recorded in the manifest.
+    """
+    root = _root()
+    root.mkdir(parents=True, exist_ok=True)
+    per_shard = objects_per_shard()
+    previous = _load_manifest(root)
+    layout = {"languages": _languages(), "per_shard": per_shard}
+    if full or previous.get("layout") != layout:
+        previous = {}
+    old_sections = previous.get("sections", {})
+
+    manifest: Dict[str, Any] = {"layout": layout, "sections": {}}
+    stats = {"written": 0, "skipped": 0, "removed": 0}
+    for section in SECTIONS:
+        current = _bucket_stats(section, per_shard)
+        old = old_sections.get(section.name, {})
+        for bucket, info in current.items():
+            path = root / shard_name(section, int(bucket))
+            if old.get(bucket) == info and path.exists():
+                stats["skipped"] += 1
+                continue
+            _write_shard(section, int(bucket), per_shard, path)
+            stats["written"] += 1
+        for bucket in set(old) - set(current):
+            (root / shard_name(section, int(bucket))).unlink(missing_ok=True)
+            stats["removed"] += 1
+        manifest["sections"][section.name] = current
+
+    _write_index(manifest, root / INDEX_NAME)
+    tmp = root / (MANIFEST_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh)
+    os.replace(tmp, root / MANIFEST_NAME)
+    return stats
@@ -0,0 +1,158 @@
+"""Translations stored as rows instead of per-language columns.
+
+modeltranslation gives every translated field (`app/translation.py`) one
+column per language in `MODELTRANSLATION_LANGUAGES`, in every row, mostly
+empty. A language that is in `settings.LANGUAGES` but not in
+`MODELTRANSLATION_LANGUAGES` has no columns: its values are `Translation`
+rows, (object, field, language) -> value, so adding one is a settings and
+data change instead of a migration that rebuilds the translated tables.
+
+`TranslatedQuerySet.for_language()` attaches the rows of the active language
+to each page of results with one query (`attach`). A field without a row
+shows the default-language value, like an empty column would. Slugs are not
+stored as rows: pages in these languages use the default-language slugs.
+Attached values replace the default-language ones on the instance, so those
+instances are for display only and must not be saved.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import Q
+from modeltranslation.translator import NotRegistered, translator
+
+from .models import Translation
+
+
+def sparse_languages() -> List[str]:
+    """Codes of `settings.LANGUAGES` without translation columns."""
+    columns = set(getattr(settings, "MODELTRANSLATION_LANGUAGES", ()))
+    return [code for code, _ in settings.LANGUAGES if code not in columns]
+
+
+def is_sparse(lang: str | None) -> bool:
+    return bool(lang) and lang in sparse_languages()
+
+
+def translated_fields(model: type[models.Model]) -> List[str]:
+    """Translated fields of `model` that can be stored as rows."""
+    try:
+        options = translator.get_options_for_model(model)
+    except NotRegistered:
+        return []
+    return [name for name in options.fields if name != "slug"]
+
+
+def store(obj: models.Model, lang: str, **values: str) -> None:
+    """Save `values` (field name -> text) of `obj` in `lang`.
+
+    An empty value deletes the row, so the field falls back again.
+    """
+    if not is_sparse(lang):
+        raise ValueError(f"{lang!r} is not a language stored as rows")
+    unknown = set(values) - set(translated_fields(type(obj)))
+    if unknown:
+        raise ValueError(f"Not translated fields: {', '.join(sorted(unknown))}")
+    content_type = ContentType.objects.get_for_model(obj)
+    rows = [
+        Translation(
+            content_type=content_type,
+            object_id=obj.pk,
+            field=field,
+            language=lang,
+            value=value,
+        )
+        for field, value in values.items()
+        if value
+    ]
+    empty = [field for field, value in values.items() if not value]
+    with transaction.atomic():
+        Translation.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["content_type", "language", "object_id", "field"],
+            update_fields=["value"],
+        )
+        if empty:
+            Translation.objects.filter(
+                content_type=content_type,
+                object_id=obj.pk,
+                language=lang,
+                field__in=empty,
+            ).delete()
+
+
+def attach(instances: Iterable[models.Model], lang: str) -> None:
+    """Set the `lang` values of `instances`, of any models, with one query."""
+    by_key: Dict[Tuple[int, int], List[models.Model]] = defaultdict(list)
+    ids: Dict[int, set] = defaultdict(set)
+    for obj in instances:
+        if obj.pk is None or not translated_fields(type(obj)):
+            continue
+        content_type = ContentType.objects.get_for_model(obj)
+        by_key[(content_type.pk, obj.pk)].append(obj)
+        ids[content_type.pk].add(obj.pk)
+    if not ids:
+        return
+    condition = Q()
+    for content_type_id, object_ids in ids.items():
+        condition |= Q(content_type_id=content_type_id, object_id__in=object_ids)
+    rows = Translation.objects.filter(condition, language=lang).values_list(
+        "content_type_id", "object_id", "field", "value"
+    )
+    for content_type_id, object_id, field, value in rows:
+        for obj in by_key[(content_type_id, object_id)]:
+            setattr(obj, field, value)
+
+
+def copy_columns(lang: str, batch_size: int = 500) -> int:
+    """Copy the non-empty `lang` translation columns of every translated model
+    into rows; return the number of rows written.
+
+    This is the first step of moving a language out of
+    `MODELTRANSLATION_LANGUAGES`: afterwards the language is removed there and
+    `makemigrations` drops its columns.
+    """
+    suffix = lang.replace("-", "_")
+    written = 0
+
+    def flush(rows: List[Translation]) -> int:
+        Translation.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["content_type", "language", "object_id", "field"],
+            update_fields=["value"],
+        )
+        return len(rows)
+
+    for model in translator.get_registered_models(abstract=False):
+        fields = translated_fields(model)
+        if not fields:
+            continue
+        content_type = ContentType.objects.get_for_model(model)
+        columns = [f"{field}_{suffix}" for field in fields]
+        values = model._default_manager.values_list("pk", *columns)
+        rows: List[Translation] = []
+        for pk, *texts in values.iterator(chunk_size=batch_size):
+            rows += [
+                Translation(
+                    content_type=content_type,
+                    object_id=pk,
+                    field=field,
+                    language=lang,
+                    value=text,
+                )
+                for field, text in zip(fields, texts)
+                if text
+            ]
+            if len(rows) >= batch_size:
+                written += flush(rows)
+                rows = []
+        if rows:
+            written += flush(rows)
+    return written
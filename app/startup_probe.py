@@ -0,0 +1,56 @@
+"""Measure one cold worker start; run by `manage.py benchmark_startup`.
+
+    DJANGO_SETTINGS_MODULE=... python -m app.startup_probe /path/
+
+Loads the WSGI application, serves `path` once through it (no test client)
+and prints one JSON line: seconds to load, seconds for the first response,
+its status, peak RSS and the number of imported modules.
+"""
+
+import io
+import json
+import resource
+import sys
+import time
+
+
+def main(path: str) -> None:
+    start = time.perf_counter()
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    loaded = time.perf_counter()
+    statuses = []
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "HTTP_HOST": "localhost",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.url_scheme": "http",
+        "wsgi.errors": sys.stderr,
+    }
+    response = application(environ, lambda status, headers: statuses.append(status))
+    b"".join(response)
+    response.close()
+    served = time.perf_counter()
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        rss //= 1024
+    print(
+        json.dumps(
+            {
+                "load_s": loaded - start,
+                "first_response_s": served - loaded,
+                "status": int(statuses[0].split()[0]),
+                "max_rss_kib": rss,
+                "modules": len(sys.modules),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "/")
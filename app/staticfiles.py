@@ -0,0 +1,225 @@
+"""Static files: hashed names, precompressed variants and in-process serving.
+
+`PrecompressedManifestStorage` (`STORAGES["staticfiles"]`) is Django's
+manifest storage, so `collectstatic` writes every file under a content-hashed
+name as well, and also writes `.gz` and, when the `brotli` package is
+installed, `.br` variants of the text files. When no CDN or web server serves
+`STATIC_ROOT`, `app.middleware.StaticFilesMiddleware` does: it indexes the
+collected files once (`build_index`) and answers with the smallest variant the
+client accepts (`serve`), hashed names with a year-long `immutable` lifetime.
+
+The Inter font is self-hosted as per-script subsets (`FONT_SUBSETS`, built by
+`manage.py subset_fonts`); `styles.css` declares them with the same
+`unicode-range`, so a browser only downloads the scripts a page uses.
+`preload_links` names the stylesheet and the page language's regular font for
+the `Link: rel=preload` header that `PreloadLinkMiddleware` adds to pages.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import mimetypes
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage,
+    staticfiles_storage,
+)
+from django.core.files.base import ContentFile
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import FileResponse, HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it only gzip variants are written
+    brotli = None
+
+COMPRESSIBLE = (".css", ".js", ".mjs", ".svg", ".json", ".txt", ".xml", ".map")
+# Smaller files gain less than the extra file costs
+MIN_COMPRESS_SIZE = 256
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=300"
+# Content-Encoding by variant suffix, most preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+FONT_DIR = "fonts/inter"
+FONT_WEIGHTS = (400, 600, 700)
+# Same ranges as the @font-face rules in static/css/styles.css
+FONT_SUBSETS = {
+    "latin": (
+        "U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, "
+        "U+02DC, U+2000-206F, U+2074, U+20AC, U+2122, U+2191, U+2193, "
+        "U+2212, U+2215, U+FEFF, U+FFFD"
+    ),
+    "cyrillic": "U+0301, U+0400-045F, U+0490-0491, U+04B0-04B1, U+2116",
+}
+# Subset each language needs; None where Inter lacks the script and pages
+# use the system fonts. Other languages use "latin".
+LANGUAGE_FONT_SUBSETS: Dict[str, Optional[str]] = {
+    "ru": "cyrillic",
+    "ar": None,
+    "zh-hans": None,
+}
+PRELOAD_STYLES = ("css/styles.css",)
+
+
+def font_name(subset: str, weight: int) -> str:
+    return f"{FONT_DIR}/inter-{subset}-{weight}.woff2"
+
+
+def compress(data: bytes) -> Dict[str, bytes]:
+    """Encoded variants of `data` by suffix, only those clearly smaller."""
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return {
+        suffix: body
+        for suffix, body in variants.items()
+        if len(body) < len(data) * 0.95
+    }
+
+
+class PrecompressedManifestStorage(ManifestStaticFilesStorage):
+    """Hashed names plus `.gz`/`.br` variants of the text files."""
+
+    def stored_name(self, name: str) -> str:
+        if not self.hashed_files:
+            # No manifest before the first collectstatic (tests, development)
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options) -> Iterator:
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if not name.endswith(COMPRESSIBLE) or not self.exists(name):
+                continue
+            with self.open(name) as f:
+                data = f.read()
+            if len(data) < MIN_COMPRESS_SIZE:
+                continue
+            for suffix, body in compress(data).items():
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(body))
+                yield name, name + suffix, True
+
+
+@dataclass(frozen=True)
+class StaticFile:
+    path: Path
+    content_type: str
+    cache_control: str
+    etag: str
+    last_modified: str
+    # Content-Encoding -> precompressed file
+    variants: Dict[str, Path] = field(default_factory=dict)
+
+
+def build_index(root: Path, url_prefix: str) -> Dict[str, StaticFile]:
+    """URL path -> `StaticFile` for every file collected into `root`."""
+    manifest = root / ManifestStaticFilesStorage.manifest_name
+    hashed = set()
+    if manifest.is_file():
+        hashed = set(json.loads(manifest.read_text()).get("paths", {}).values())
+    suffixes = tuple(suffix for _, suffix in ENCODINGS)
+    index: Dict[str, StaticFile] = {}
+    for path in root.rglob("*"):
+        if not path.is_file() or path == manifest:
+            continue
+        if path.suffix in suffixes and path.with_suffix("").is_file():
+            continue
+        name = path.relative_to(root).as_posix()
+        stat = path.stat()
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type.endswith(
+            ("javascript", "json", "xml")
+        ):
+            content_type += "; charset=utf-8"
+        variants = {}
+        for encoding, suffix in ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            if variant.is_file():
+                variants[encoding] = variant
+        index[url_prefix + name] = StaticFile(
+            path=path,
+            content_type=content_type,
+            cache_control=IMMUTABLE if name in hashed else REVALIDATE,
+            etag=f'"{int(stat.st_mtime):x}-{stat.st_size:x}"',
+            last_modified=http_date(stat.st_mtime),
+            variants=variants,
+        )
+    return index
+
+
+def _accepts(header: str, encoding: str) -> bool:
+    match = re.search(rf"(?:^|,)\s*{encoding}\s*(?:;\s*q=([0-9.]+))?", header)
+    return match is not None and (match.group(1) is None or float(match.group(1)) > 0)
+
+
+def _choose(request: HttpRequest, entry: StaticFile) -> Tuple[Path, Optional[str]]:
+    header = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    for encoding, _ in ENCODINGS:
+        if encoding in entry.variants and _accepts(header, encoding):
+            return entry.variants[encoding], encoding
+    return entry.path, None
+
+
+def _etag(entry: StaticFile, encoding: Optional[str]) -> str:
+    # Each encoding is its own representation, so it needs its own strong ETag
+    return entry.etag if encoding is None else f'{entry.etag[:-1]}-{encoding}"'
+
+
+def serve(request: HttpRequest, entry: StaticFile) -> HttpResponse:
+    path, encoding = _choose(request, entry)
+    etag = _etag(entry, encoding)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = FileResponse(open(path, "rb"), content_type=entry.content_type)
+        # FileResponse names the file it sent, i.e. the `.br`/`.gz` variant
+        response.headers.pop("Content-Disposition", None)
+        if encoding:
+            response["Content-Encoding"] = encoding
+    if entry.variants:
+        response["Vary"] = "Accept-Encoding"
+    response["Cache-Control"] = entry.cache_control
+    response["ETag"] = etag
+    response["Last-Modified"] = entry.last_modified
+    return response
+
+
+_preload: Dict[str, str] = {}
+
+
+@receiver(setting_changed)
+def _reset(setting: str, **kwargs) -> None:
+    if setting.startswith("STATIC") or setting in ("STORAGES", "DEBUG"):
+        _preload.clear()
+
+
+def preload_links(lang: str) -> str:
+    """`Link` header value preloading the stylesheet and `lang`'s font."""
+    links = _preload.get(lang)
+    if links is None:
+        items = [
+            f"<{staticfiles_storage.url(name)}>; rel=preload; as=style"
+            for name in PRELOAD_STYLES
+        ]
+        subset = LANGUAGE_FONT_SUBSETS.get(lang, "latin")
+        if subset is not None:
+            url = staticfiles_storage.url(font_name(subset, 400))
+            items.append(
+                f'<{url}>; rel=preload; as=font; type="font/woff2"; crossorigin'
+            )
+        links = _preload[lang] = ", ".join(items)
+    return links
@@ -0,0 +1,90 @@
+"""Pages sent while their lists are still being read from the database.
+
+`render_streaming()` is `render()` for templates whose long lists use
+`{% streamfor %}` (`app/templatetags/streaming.py`) over a `Stream`. The
+template is rendered once with every `Stream` left as a marker, which costs
+no query; the response then sends the `<head>` and the page chrome up to the
+first list straight away, and each list's items as `QuerySet.iterator()`
+returns them, `STREAM_CHUNK_SIZE` at a time. Memory stays flat whatever the
+list length, since no list or page string is ever built whole.
+
+Queries and template work done while streaming happen after the view has
+returned: `RequestTimingMiddleware` counts them in its log record and in
+`/metrics` once the body is sent, but its `Server-Timing` header, sent first,
+cannot include them. An error in the middle of a list can only cut the page
+short: the status line is already sent.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.db.models import QuerySet
+from django.http import HttpRequest, StreamingHttpResponse
+from django.template import Context
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.safestring import mark_safe
+
+STREAM_CHUNK_SIZE = 100
+
+
+class Stream:
+    """A list for `{% streamfor %}`, rendered after the rest of the page."""
+
+    def __init__(self, items: Iterable[Any]) -> None:
+        self.items = items
+        self.marker = mark_safe(f"<!--stream:{uuid.uuid4().hex}-->")
+        self._node: Any = None
+        self._context: Optional[Context] = None
+
+    def bind(self, node: Any, context: Context) -> str:
+        """Remember where the list goes; return the marker to render there."""
+        self._node = node
+        # The template's context is popped once rendering ends
+        self._context = context.new(context.flatten())
+        return self.marker
+
+    def render(self) -> Iterator[str]:
+        if self._node is None:
+            return
+        items = self.items
+        if isinstance(items, QuerySet):
+            items = items.iterator(chunk_size=STREAM_CHUNK_SIZE)
+        buffer: List[str] = []
+        empty = True
+        for item in items:
+            empty = False
+            buffer.append(self._node.render_item(self._context, item))
+            if len(buffer) >= STREAM_CHUNK_SIZE:
+                yield "".join(buffer)
+                buffer = []
+        if empty:
+            buffer.append(self._node.nodelist_empty.render(self._context))
+        yield "".join(buffer)
+
+
+def _chunks(html: str, streams: List[Stream], language: str) -> Iterator[str]:
+    with translation.override(language):
+        for stream in streams:
+            head, html = html.split(stream.marker, 1)
+            yield head
+            yield from stream.render()
+        yield html
+
+
+def render_streaming(
+    request: HttpRequest, template_name: str, context: Dict[str, Any]
+) -> StreamingHttpResponse:
+    """`render()`, streamed: every `Stream` value of `context` is sent as it
+    is read (see the module docstring)."""
+    html = render_to_string(template_name, context, request)
+    streams = sorted(
+        (v for v in context.values() if isinstance(v, Stream) and v.marker in html),
+        key=lambda stream: html.index(stream.marker),
+    )
+    return StreamingHttpResponse(
+        _chunks(html, streams, translation.get_language()),
+        content_type="text/html; charset=utf-8",
+    )
@@ -0,0 +1,99 @@
+"""`{% fast_date_hierarchy cl %}`: Django's `date_hierarchy` tag without the
+full-table `SELECT DISTINCT`; see `app.changelists`."""
+
+import datetime
+
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+from django.template import Library
+from django.utils import formats
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+from ..changelists import date_range, distinct_dates, local_date
+
+register = Library()
+
+
+def fast_date_hierarchy(cl):
+    """Same context as `django.contrib.admin.templatetags.admin_list.
+    date_hierarchy`, for a `date_hierarchy` on a local, indexed field."""
+    if not cl.date_hierarchy:
+        return None
+    field_name = cl.date_hierarchy
+    field = cl.model._meta.get_field(field_name)
+    year_field = f"{field_name}__year"
+    month_field = f"{field_name}__month"
+    day_field = f"{field_name}__day"
+    year_lookup = cl.params.get(year_field)
+    month_lookup = cl.params.get(month_field)
+    day_lookup = cl.params.get(day_field)
+
+    def link(filters):
+        return cl.get_query_string(filters, [f"{field_name}__"])
+
+    if not (year_lookup or month_lookup or day_lookup):
+        # Start at the month or year level when everything falls inside it
+        first, last = date_range(cl.queryset, field_name)
+        if first is not None and last is not None:
+            first, last = local_date(first), local_date(last)
+            if first.year == last.year:
+                year_lookup = first.year
+                if first.month == last.month:
+                    month_lookup = first.month
+
+    context = {"show": True, "field_name": field.verbose_name}
+    if year_lookup and month_lookup and day_lookup:
+        day = datetime.date(int(year_lookup), int(month_lookup), int(day_lookup))
+        context["back"] = {
+            "link": link({year_field: year_lookup, month_field: month_lookup}),
+            "title": capfirst(formats.date_format(day, "YEAR_MONTH_FORMAT")),
+        }
+        context["choices"] = [
+            {"title": capfirst(formats.date_format(day, "MONTH_DAY_FORMAT"))}
+        ]
+    elif year_lookup and month_lookup:
+        context["back"] = {
+            "link": link({year_field: year_lookup}),
+            "title": str(year_lookup),
+        }
+        context["choices"] = [
+            {
+                "link": link(
+                    {
+                        year_field: year_lookup,
+                        month_field: month_lookup,
+                        day_field: day.day,
+                    }
+                ),
+                "title": capfirst(formats.date_format(day, "MONTH_DAY_FORMAT")),
+            }
+            for day in distinct_dates(cl.queryset, field_name, "day")
+        ]
+    elif year_lookup:
+        context["back"] = {"link": link({}), "title": _("All dates")}
+        context["choices"] = [
+            {
+                "link": link({year_field: year_lookup, month_field: month.month}),
+                "title": capfirst(formats.date_format(month, "YEAR_MONTH_FORMAT")),
+            }
+            for month in distinct_dates(cl.queryset, field_name, "month")
+        ]
+    else:
+        context["back"] = None
+        context["choices"] = [
+            {"link": link({year_field: str(year.year)}), "title": str(year.year)}
+            for year in distinct_dates(cl.queryset, field_name, "year")
+        ]
+    return context
+
+
+@register.tag(name="fast_date_hierarchy")
+def fast_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(
+        "fast_date_hierarchy",
+        parser,
+        token,
+        func=fast_date_hierarchy,
+        template_name="date_hierarchy.html",
+        takes_context=False,
+    )
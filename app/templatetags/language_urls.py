@@ -0,0 +1,24 @@
+"""`{% translated_url code %}`: the current page in another language.
+
+Pages are served under a language prefix (see `InvestAllies/urls_public.py`),
+so switching language is a plain link instead of a POST to `set_language`:
+no CSRF token in every page and no `Vary: Cookie`.
+"""
+
+from django.template import Library
+from django.urls import translate_url
+
+register = Library()
+
+
+@register.simple_tag(takes_context=True)
+def translated_url(context, code: str) -> str:
+    """The current URL with the `code` prefix.
+
+    Slugs are kept as they are; the view then redirects to the slug in
+    `code`.
+    """
+    request = context.get("request")
+    if request is None:
+        return f"/{code}/"
+    return translate_url(request.get_full_path(), code)
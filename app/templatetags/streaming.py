@@ -0,0 +1,54 @@
+"""`{% streamfor item in items %}...{% empty %}...{% endstreamfor %}`.
+
+A `{% for %}` loop over one variable. When `items` is an `app.streaming.Stream`
+the loop only leaves a marker, and `render_streaming` renders the items later,
+as the response is sent; any other value is looped over like `{% for %}`.
+"""
+
+from django.template import Library, Node, NodeList, TemplateSyntaxError
+from django.template.defaulttags import ForNode
+
+from ..streaming import Stream
+
+register = Library()
+
+
+class StreamForNode(Node):
+    child_nodelists = ("nodelist_loop", "nodelist_empty")
+
+    def __init__(self, loopvar, sequence, nodelist_loop, nodelist_empty):
+        self.loopvar = loopvar
+        self.sequence = sequence
+        self.nodelist_loop = nodelist_loop
+        self.nodelist_empty = nodelist_empty
+        self.for_node = ForNode(
+            [loopvar], sequence, False, nodelist_loop, nodelist_empty
+        )
+
+    def render(self, context) -> str:
+        items = self.sequence.resolve(context, ignore_failures=True)
+        if isinstance(items, Stream):
+            return items.bind(self, context)
+        return self.for_node.render(context)
+
+    def render_item(self, context, item) -> str:
+        with context.push({self.loopvar: item}):
+            return self.nodelist_loop.render(context)
+
+
+@register.tag
+def streamfor(parser, token) -> StreamForNode:
+    bits = token.split_contents()
+    if len(bits) != 4 or bits[2] != "in":
+        raise TemplateSyntaxError(
+            f"'{bits[0]}' statements should look like '{bits[0]} x in y'"
+        )
+    sequence = parser.compile_filter(bits[3])
+    nodelist_loop = parser.parse(("empty", "endstreamfor"))
+    token = parser.next_token()
+    if token.contents == "empty":
+        nodelist_empty = parser.parse(("endstreamfor",))
+        parser.delete_first_token()
+    else:
+        nodelist_empty = NodeList()
+    return StreamForNode(bits[1], sequence, nodelist_loop, nodelist_empty)
@@ -1,7 +1,64 @@
-from django.test import TestCase
+import difflib
+import gzip
+import io
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+from urllib.parse import urlsplit
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.template import Context as TemplateContext, Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone, translation
 from django.utils.text import slugify
 
-from .models import Article, ArticleCategory, Country
+from . import fx, metrics, portfolio, staticfiles, views, warmup
+from .admin import ArticleResource
+from .imports import run_job
+from .leads import LeadWriter
+from .log import JsonFormatter, QueueHandler, RouteSampler
+from .middleware import PrimaryDatabaseMiddleware
+from .models import (
+    Article,
+    ArticleCategory,
+    Country,
+    CountryStats,
+    FuelPrice,
+    ImportJob,
+    ImportStatus,
+    InvestmentObject,
+    LandingPage,
+    Lead,
+    MetalPrice,
+    Service,
+    SocialLink,
+    Translation,
+)
+from .queryplans import OR_LOOKUP, audit
+from .ratelimit import Rule, SQLiteBackend, client_ip
+from .routers import PrimaryReplicaRouter
+from .routes import Route, iter_routes, route_names
+from .sitemaps import build_sitemaps
+from .sparse_translations import copy_columns, store
+from .streaming import STREAM_CHUNK_SIZE
 
 
 class SlugTranslationTests(TestCase):
@@ -25,3 +82,1333 @@ class SlugTranslationTests(TestCase):
 
         self.assertEqual(getattr(a, "slug_es"), slugify("Mi Título Español"))
         self.assertEqual(getattr(a, "slug_fr"), slugify("Mon Titre Français"))
+
+
+class SitemapTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        override = override_settings(
+            SITEMAP_ROOT=self.root, SITE_URL="https://example.com"
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.article = Article.objects.create(
+            title="Gold outlook", content="Hello", publish=True
+        )
+        self.article.title_es = "Perspectiva del oro"
+        self.article.slug_es = ""
+        self.article.save()
+
+    def _read_shard(self, name):
+        with gzip.open(self.root / name, "rt", encoding="utf-8") as fh:
+            return fh.read()
+
+    def test_shards_contain_hreflang_alternates(self):
+        stats = build_sitemaps()
+        self.assertGreaterEqual(stats["written"], 1)
+        xml = self._read_shard("articles-0000.xml.gz")
+        self.assertIn("https://example.com/en/articles/gold-outlook/", xml)
+        self.assertIn(
+            'hreflang="es" href="https://example.com/es/articles/perspectiva-del-oro/"',
+            xml,
+        )
+        self.assertIn('hreflang="x-default"', xml)
+        response = self.client.get("/sitemap.xml")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"/sitemaps/articles-0000.xml.gz", b"".join(response))
+
+    def test_incremental_build_only_rewrites_changed_shards(self):
+        build_sitemaps()
+        self.assertEqual(build_sitemaps()["written"], 0)
+        Article.objects.create(title="Fuel outlook", content="Hi", publish=True)
+        stats = build_sitemaps()
+        self.assertEqual(stats["written"], 1)
+        self.assertIn("fuel-outlook", self._read_shard("articles-0000.xml.gz"))
+
+
+class FeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = ArticleCategory.objects.create(name="Gold", slug="gold")
+        Article.objects.create(
+            title="Gold outlook",
+            content="<p>Long body</p>",
+            meta_description="Where gold is heading",
+            category=self.category,
+            publish=True,
+        )
+
+    def test_feed_is_cached_and_revalidated_with_etag(self):
+        url = "/en/feeds/category/gold/"
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Gold outlook", response.content)
+        self.assertNotIn(b"Long body", response.content)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(2):
+            cached = self.client.get(url)
+        self.assertEqual(cached.content, response.content)
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+
+        Article.objects.create(
+            title="Gold rally", content="x", category=self.category, publish=True
+        )
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn(b"Gold rally", changed.content)
+
+    def test_renaming_the_category_changes_the_feed(self):
+        url = "/en/feeds/category/gold/"
+        etag = self.client.get(url)["ETag"]
+        self.category.name = "Precious metals"
+        self.category.save()
+        renamed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(renamed.status_code, 200)
+        self.assertIn(b"Precious metals", renamed.content)
+
+    def test_unknown_language_is_404(self):
+        self.assertEqual(self.client.get("/xx/feeds/category/gold/").status_code, 404)
+
+
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ArticleCategory.objects.create(name="Gold", slug="gold")
+
+    def test_server_timing_header_and_log_record(self):
+        url = "/en/feeds/category/gold/"
+        with self.assertLogs("app.requests", "INFO") as logs:
+            first = self.client.get(url)
+            second = self.client.get(url)
+        self.assertIn('desc="0 hits, 1 misses"', first["Server-Timing"])
+        self.assertIn('desc="1 hits, 0 misses"', second["Server-Timing"])
+        self.assertIn("db;dur=", second["Server-Timing"])
+
+        record = logs.records[0].timing
+        self.assertEqual(record["route"], "app:category_feed")
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["db_queries"], 3)
+        self.assertEqual(record["cache_misses"], 1)
+
+    def test_template_time_is_recorded(self):
+        with self.assertLogs("app.requests", "INFO") as logs:
+            self.client.get("/en/")
+        record = logs.records[0].timing
+        self.assertEqual(record["route"], "app:home")
+        self.assertGreater(record["template_ms"], 0)
+
+
+class ScaleSeedTests(TestCase):
+    def _seed(self):
+        call_command(
+            "seed_fake_data",
+            countries=3,
+            services=1,
+            scale=40,
+            seed=11,
+            workers=2,
+            batch_size=16,
+            stdout=io.StringIO(),
+        )
+
+    def test_scale_mode_bulk_inserts_translated_rows(self):
+        self._seed()
+        self.assertEqual(Article.objects.count(), 40)
+        self.assertEqual(InvestmentObject.objects.count(), 2)
+        self.assertEqual(Lead.objects.count(), 10)
+        self.assertEqual(MetalPrice.objects.count() + FuelPrice.objects.count(), 40)
+        article = Article.objects.order_by("pk").first()
+        for code in ("es", "ru", "zh_hans"):
+            self.assertTrue(getattr(article, f"title_{code}"))
+            self.assertTrue(getattr(article, f"slug_{code}"))
+
+    def test_scale_mode_is_deterministic_and_rerunnable(self):
+        self._seed()
+        first = list(Article.objects.order_by("pk").values_list("title_fr", flat=True))
+        Article.objects.all().delete()
+        self._seed()
+        again = list(Article.objects.order_by("pk").values_list("title_fr", flat=True))
+        self.assertEqual(first, again)
+
+
+class RouteEnumerationTests(TestCase):
+    def test_every_named_route_is_enumerated_when_data_exists(self):
+        call_command("seed_fake_data", countries=2, services=1, stdout=io.StringIO())
+        routes = list(iter_routes(["en", "es"]))
+        self.assertEqual({r.name for r in routes}, set(route_names()))
+        for route in routes:
+            with translation.override(route.language):
+                path = urlsplit(route.path).path
+                self.assertEqual(resolve(path).url_name, route.name)
+
+
+class StructuredLoggingTests(TestCase):
+    def _record(self, level=logging.INFO, msg="%s called", args=("home",)):
+        return logging.LogRecord("app.views", level, __file__, 1, msg, args, None)
+
+    def test_queue_handler_defers_plain_formatting_and_emits_json(self):
+        q = queue.SimpleQueue()
+        handler = QueueHandler(q)
+        handler.emit(self._record())
+        queued = q.get_nowait()
+        self.assertEqual(queued.args, ("home",))
+        handler.emit(self._record(args=(Country(name="Chile"),)))
+        self.assertEqual(q.get_nowait().getMessage(), "Chile called")
+
+        entry = json.loads(JsonFormatter().format(queued))
+        self.assertEqual(entry["message"], "home called")
+        self.assertEqual(entry["logger"], "app.views")
+
+    def test_route_sampler_only_drops_low_levels_of_sampled_routes(self):
+        sampler = RouteSampler({"app:home": 0.0})
+        home = self._record()
+        home.route = "app:home"
+        self.assertFalse(sampler.filter(home))
+        warning = self._record(level=logging.WARNING)
+        warning.route = "app:home"
+        self.assertTrue(sampler.filter(warning))
+        other = self._record()
+        other.route = "app:search"
+        self.assertTrue(sampler.filter(other))
+
+
+@override_settings(LEAD_FLUSH_INTERVAL=0, RATE_LIMIT_ENABLED=False)
+class LeadCaptureTests(TestCase):
+    def test_subscribe_validates_and_dedupes_on_email_and_source(self):
+        url = "/en/subscribe/"
+        for email in ("Ana@Example.com", "ana@example.com"):
+            response = self.client.post(url, {"email": email, "source": "landing"})
+            self.assertEqual(response.status_code, 200)
+        self.client.post(url, {"email": "ana@example.com"})
+        self.assertEqual(
+            sorted(Lead.objects.values_list("email", "source")),
+            [("ana@example.com", "form"), ("ana@example.com", "landing")],
+        )
+        self.assertEqual(self.client.post(url, {"email": "nope"}).status_code, 400)
+
+    def test_writer_batches_queued_leads_into_one_insert(self):
+        writer = LeadWriter()
+        with override_settings(LEAD_FLUSH_INTERVAL=60):
+            writer._ensure_thread = lambda: None  # flushed by hand below
+            for n in range(5):
+                writer.submit({"email": f"lead{n % 3}@example.com", "source": "form"})
+            self.assertFalse(Lead.objects.exists())
+        with self.assertNumQueries(1):
+            self.assertEqual(writer.flush(), 3)
+        self.assertEqual(Lead.objects.count(), 3)
+
+
+class RateLimitTests(TestCase):
+    limits = {"app:search": {"rate": 0.001, "burst": 2}}
+
+    def _assert_limited(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get("/en/search/?q=x").status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get("/en/search/?q=x")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 1)
+        other_ip = self.client.get("/en/search/?q=x", REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(other_ip.status_code, 200)
+        self.assertEqual(self.client.get("/en/").status_code, 200)
+
+    def test_memory_buckets(self):
+        with override_settings(RATE_LIMITS=self.limits, RATE_LIMIT_BACKEND="memory"):
+            self._assert_limited()
+
+    def test_sqlite_buckets_are_shared(self):
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            override_settings(
+                RATE_LIMITS=self.limits,
+                RATE_LIMIT_BACKEND="sqlite",
+                RATE_LIMIT_SQLITE_PATH=Path(tmp) / "buckets.sqlite3",
+            ),
+        ):
+            self._assert_limited()
+            # A second backend (another worker) sees the same empty bucket
+            other = SQLiteBackend(str(Path(tmp) / "buckets.sqlite3"))
+            rule = Rule(rate=0.001, burst=2)
+            self.assertGreater(other.take("app:search|127.0.0.1", rule, time.time()), 0)
+
+    def test_locked_store_lets_requests_through(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "buckets.sqlite3")
+            backend = SQLiteBackend(path, timeout=0.01)
+            rule = Rule(rate=0.001, burst=1)
+            backend.take("key", rule, time.time())
+            holder = sqlite3.connect(path, isolation_level=None)
+            holder.execute("BEGIN IMMEDIATE")
+            try:
+                with self.assertLogs("app.ratelimit", "WARNING"):
+                    self.assertEqual(backend.take("key", rule, time.time()), 0)
+            finally:
+                holder.execute("ROLLBACK")
+                holder.close()
+            # Usable again once the lock is gone
+            self.assertGreater(backend.take("key", rule, time.time()), 0)
+
+    def test_forwarded_client_is_the_address_the_proxy_saw(self):
+        factory = RequestFactory()
+        request = factory.get(
+            "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="1.2.3.4, 203.0.113.9"
+        )
+        with override_settings(RATE_LIMIT_TRUST_FORWARDED=0):
+            self.assertEqual(client_ip(request), "10.0.0.1")
+        with override_settings(RATE_LIMIT_TRUST_FORWARDED=1):
+            # The leftmost entry is the client's to choose
+            self.assertEqual(client_ip(request), "203.0.113.9")
+        with override_settings(RATE_LIMIT_TRUST_FORWARDED=2):
+            self.assertEqual(client_ip(request), "1.2.3.4")
+        with override_settings(RATE_LIMIT_TRUST_FORWARDED=3):
+            self.assertEqual(client_ip(request), "10.0.0.1")
+
+
+class StreamingExportTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(user)
+        Lead.objects.create(name="Ana", email="ana@example.com", message="Hi")
+        Lead.objects.create(
+            name="Bo", email="bo@example.com", message="Yo", source="landing"
+        )
+
+    def _body(self, response) -> bytes:
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_csv_export_applies_changelist_filters_and_columns(self):
+        response = self.client.get(
+            "/admin/app/lead/stream-export/",
+            {"source__exact": "landing", "fields": "email,source"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self._body(response).decode().splitlines(),
+            ["email,source", "bo@example.com,landing"],
+        )
+
+    def test_export_does_not_count_or_page_the_changelist(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/admin/app/lead/stream-export/")
+            self._body(response)
+        queries = [q["sql"] for q in ctx.captured_queries]
+        self.assertFalse([sql for sql in queries if "COUNT(" in sql], queries)
+        self.assertEqual(len([sql for sql in queries if '"app_lead"' in sql]), 1)
+
+    def test_gzipped_jsonl_export_of_translated_columns(self):
+        Article.objects.create(title="Gold outlook", content="<p>Body</p>")
+        response = self.client.get(
+            "/admin/app/article/stream-export/",
+            {"format": "jsonl", "gzip": "1", "fields": "id,title_en,content_es"},
+        )
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        rows = gzip.decompress(self._body(response)).decode().splitlines()
+        self.assertEqual(
+            json.loads(rows[0]),
+            {"id": 1, "title_en": "Gold outlook", "content_es": None},
+        )
+
+    def test_unknown_column_is_rejected(self):
+        response = self.client.get(
+            "/admin/app/lead/stream-export/", {"fields": "password"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_changelist_links_to_streaming_export(self):
+        response = self.client.get("/admin/app/lead/?source__exact=form")
+        self.assertContains(
+            response, "/admin/app/lead/stream-export/?source__exact=form&amp;format=csv"
+        )
+
+
+class BulkImportTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        Article.objects.create(title="Gold outlook", content="x")
+
+    def _job(self, csv_text: str) -> ImportJob:
+        return ImportJob.objects.create(
+            resource="article",
+            file=SimpleUploadedFile("articles.csv", csv_text.encode()),
+        )
+
+    def test_job_imports_rows_in_bulk_with_unique_slugs(self):
+        job = self._job(
+            "title_en,title_es,content_en,publish\n"
+            "Gold outlook,Perspectiva del oro,<p>a</p>,1\n"
+            "Gold outlook,,<p>b</p>,1\n"
+        )
+        job = run_job(job.pk, ArticleResource)
+        self.assertEqual(job.status, ImportStatus.DONE)
+        self.assertEqual(job.errors, "")
+        self.assertEqual((job.total, job.processed, job.created), (2, 2, 2))
+        slugs = list(
+            Article.objects.rewrite(False)
+            .order_by("pk")
+            .values_list("slug", "slug_en", "slug_es")
+        )
+        self.assertEqual(
+            slugs[1:],
+            [
+                ("gold-outlook-1", "gold-outlook-1", "perspectiva-del-oro"),
+                ("gold-outlook-2", "gold-outlook-2", None),
+            ],
+        )
+
+    def test_updated_rows_get_a_new_updated_at(self):
+        article = Article.objects.get()
+        stale = timezone.now() - timezone.timedelta(days=30)
+        Article.objects.filter(pk=article.pk).update(updated_at=stale)
+        job = self._job(f"id,title_en\n{article.pk},Gold 2027\n")
+        job = run_job(job.pk, ArticleResource)
+        self.assertEqual((job.status, job.updated), (ImportStatus.DONE, 1))
+        article.refresh_from_db()
+        self.assertEqual(article.title_en, "Gold 2027")
+        self.assertGreater(article.updated_at, stale)
+
+    def test_failed_job_rebuilds_stats_of_committed_batches(self):
+        chile = Country.objects.create(name="Chile", slug="chile")
+        job = self._job(
+            "title_en,content_en,publish,country\n"
+            f"First,x,1,{chile.pk}\nSecond,x,1,{chile.pk}\n"
+        )
+        with (
+            mock.patch("app.imports.BATCH_SIZE", 1),
+            mock.patch(
+                "app.imports._errors", side_effect=[[], RuntimeError("disk full")]
+            ),
+        ):
+            with self.assertLogs("app.imports", "ERROR"):
+                job = run_job(job.pk, ArticleResource)
+        self.assertEqual(job.status, ImportStatus.FAILED)
+        self.assertEqual(CountryStats.objects.get(country=chile).article_count, 2)
+
+    def test_admin_view_queues_job_after_commit(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(user)
+        upload = SimpleUploadedFile("objects.csv", b"title_en\nVilla\n")
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                "/admin/app/investmentobject/bulk-import/",
+                {"file": upload, "input_format": "csv", "skip_diff": "on"},
+            )
+        job = ImportJob.objects.get()
+        self.assertRedirects(response, f"/admin/app/importjob/{job.pk}/change/")
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(job.status, ImportStatus.PENDING)
+
+
+class FastChangeListTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(user)
+
+    def _titles(self, q: str) -> list:
+        response = self.client.get("/admin/app/article/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return sorted(str(a) for a in response.context["cl"].result_list)
+
+    def test_article_search_uses_titles_unless_deep(self):
+        with translation.override("en"):
+            Article.objects.create(
+                title_en="Gold outlook",
+                title_es="Perspectiva del oro",
+                content_en="<p>Silver rising</p>",
+            )
+            fuel = Article.objects.create(title_en="Fuel", content_en="<p>Diesel</p>")
+            self.assertEqual(self._titles("gold"), ["Gold outlook"])
+            self.assertEqual(self._titles("perspectiva ORO"), ["Gold outlook"])
+            self.assertEqual(self._titles("silver"), [])
+            self.assertEqual(self._titles("all: silv"), ["Gold outlook"])
+
+            # The index follows edits and deletes
+            fuel.title_en = "Silver fuel"
+            fuel.save()
+            self.assertEqual(self._titles("silver"), ["Silver fuel"])
+            fuel.delete()
+            self.assertEqual(self._titles("silver"), [])
+
+    def test_date_hierarchy_without_distinct_scan(self):
+        stamps = ["2024-12-31 23:00", "2025-03-02 10:00", "2025-03-09 10:00"]
+        for stamp in stamps:
+            MetalPrice.objects.create(
+                metal="gold",
+                price=Decimal("1"),
+                timestamp=timezone.make_aware(datetime.fromisoformat(stamp)),
+            )
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/admin/app/metalprice/")
+        self.assertContains(response, "timestamp__year=2024")
+        self.assertContains(response, "timestamp__year=2025")
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn("DISTINCT", sql)
+        self.assertNotIn("COUNT(", sql)
+
+        response = self.client.get(
+            "/admin/app/metalprice/",
+            {"timestamp__year": "2025", "timestamp__month": "3"},
+        )
+        self.assertContains(response, "timestamp__day=2")
+        self.assertContains(response, "timestamp__day=9")
+        self.assertEqual(len(response.context["cl"].result_list), 2)
+
+
+class SQLiteProfileTests(TestCase):
+    def test_connection_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+
+@override_settings(
+    DATABASES={**settings.DATABASES, "replica": settings.DATABASES["default"]}
+)
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def _read_db(self, method: str, path: str) -> str:
+        middleware = PrimaryDatabaseMiddleware(
+            lambda request: HttpResponse(PrimaryReplicaRouter().db_for_read(Country))
+        )
+        return middleware(RequestFactory().generic(method, path)).content.decode()
+
+    def test_reads_go_to_replica_unless_pinned(self):
+        self.assertEqual(self._read_db("GET", "/es/"), "replica")
+        self.assertEqual(self._read_db("POST", "/es/subscribe/"), "default")
+        self.assertEqual(self._read_db("GET", "/admin/app/article/"), "default")
+        self.assertEqual(PrimaryReplicaRouter().db_for_write(Country), "default")
+        self.assertFalse(PrimaryReplicaRouter().allow_migrate("replica", "app"))
+
+    def test_streamed_bodies_keep_the_pin(self):
+        def stream(request):
+            reads = (PrimaryReplicaRouter().db_for_read(Country) for _ in range(2))
+            return StreamingHttpResponse(reads)
+
+        middleware = PrimaryDatabaseMiddleware(stream)
+        paths = {"/admin/app/lead/stream-export/": "default", "/es/": "replica"}
+        for path, db in paths.items():
+            response = middleware(RequestFactory().get(path))
+            self.assertEqual(b"".join(response.streaming_content), db.encode() * 2)
+
+
+class QueryPlanAuditTests(TestCase):
+    def test_reports_or_lookups_and_suggests_indexes(self):
+        Country.objects.create(name="Chile", slug="chile")
+        SocialLink.objects.create(platform="x", url="https://x.example.com/ia")
+        cache.set("site-entry", 1)
+        report = audit(["es"], ["home", "country_detail"])
+
+        self.assertGreater(report.statements, 0)
+        # The audit clears its own cache, not the site's
+        self.assertEqual(cache.get("site-entry"), 1)
+        # The Spanish slug lookup also matches the English fallback column
+        or_tables = {f.table for f in report.findings if f.kind == OR_LOOKUP}
+        self.assertIn("app_country", or_tables)
+        # The default language has no fallback: one column, no OR
+        english = audit(["en"], ["country_detail"])
+        self.assertFalse([f for f in english.findings if f.kind == OR_LOOKUP])
+        declarations = {s.model: s.fields for s in report.suggestions}
+        self.assertEqual(declarations["app.SocialLink"], ("active", "order"))
+
+
+class LanguagePrefixTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Article.objects.create(
+            title="Gold outlook",
+            title_es="Perspectiva del oro",
+            content="<p>Body</p>",
+            publish=True,
+        )
+
+    def tearDown(self):
+        translation.activate(settings.LANGUAGE_CODE)
+
+    def test_unprefixed_url_redirects_to_the_negotiated_language(self):
+        self.client.cookies[settings.LANGUAGE_COOKIE_NAME] = "es"
+        response = self.client.get("/articles/gold-outlook/?ref=x")
+        self.assertRedirects(
+            response,
+            "/es/articles/gold-outlook/?ref=x",
+            status_code=302,
+            target_status_code=301,
+        )
+
+    def test_slug_of_another_language_redirects_to_the_canonical_url(self):
+        response = self.client.get("/es/articles/gold-outlook/")
+        self.assertRedirects(
+            response, "/es/articles/perspectiva-del-oro/", status_code=301
+        )
+        self.assertEqual(self.client.get("/es/articles/missing/").status_code, 404)
+
+    def test_prefixed_page_does_not_vary_on_language_negotiation(self):
+        response = self.client.get("/es/articles/perspectiva-del-oro/")
+        self.assertContains(response, "Perspectiva del oro")
+        self.assertContains(response, '<html lang="es">')
+        self.assertContains(response, 'href="/en/articles/perspectiva-del-oro/"')
+        vary = response.get("Vary", "")
+        self.assertNotIn("Cookie", vary)
+        self.assertNotIn("Accept-Language", vary)
+        self.assertNotIn(settings.CSRF_COOKIE_NAME, response.cookies)
+
+
+class StaticFilesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        cls.root = Path(tmp.name)
+        cls.enterClassContext(
+            override_settings(
+                STATIC_ROOT=cls.root,
+                STATIC_SERVE=True,
+                DEBUG=False,
+                # The project's own files; the admin apps' would only be slower
+                STATICFILES_FINDERS=[
+                    "django.contrib.staticfiles.finders.FileSystemFinder"
+                ],
+            )
+        )
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+    def _stylesheet(self):
+        manifest = json.loads((self.root / "staticfiles.json").read_text())
+        return manifest["paths"]["css/styles.css"]
+
+    def test_collectstatic_writes_hashed_and_precompressed_files(self):
+        name = self._stylesheet()
+        self.assertRegex(name, r"^css/styles\.[0-9a-f]{12}\.css$")
+        css = (self.root / name).read_bytes()
+        self.assertEqual(gzip.decompress((self.root / f"{name}.gz").read_bytes()), css)
+        if staticfiles.brotli is not None:
+            br = (self.root / f"{name}.br").read_bytes()
+            self.assertEqual(staticfiles.brotli.decompress(br), css)
+        # Fonts are referenced by their hashed names and not compressed again
+        self.assertRegex(css.decode(), r"inter-latin-400\.[0-9a-f]{12}\.woff2")
+        self.assertFalse(list(self.root.glob("fonts/inter/*.woff2.gz")))
+
+    def test_served_with_the_accepted_encoding_and_long_lifetime(self):
+        url = f"/static/{self._stylesheet()}"
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Cache-Control"], staticfiles.IMMUTABLE)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        css = gzip.decompress(b"".join(response.streaming_content))
+        self.assertIn(b"@font-face", css)
+
+        self.assertFalse(response.has_header("Content-Disposition"))
+
+        plain = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip;q=0")
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(plain.streaming_content), css)
+        self.assertNotEqual(plain["ETag"], response["ETag"])
+
+        cached = self.client.get(
+            url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(cached.status_code, 304)
+        # The gzip ETag does not validate the identity body
+        other = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(other.status_code, 200)
+        unhashed = self.client.get("/static/css/styles.css")
+        self.assertEqual(unhashed["Cache-Control"], staticfiles.REVALIDATE)
+
+    def test_pages_preload_the_stylesheet_and_language_font(self):
+        with translation.override("ru"):
+            response = self.client.get("/ru/")
+        link = response["Link"]
+        self.assertIn(f"</static/{self._stylesheet()}>; rel=preload; as=style", link)
+        self.assertRegex(link, r"inter-cyrillic-400\.[0-9a-f]{12}\.woff2>; rel=preload")
+        self.assertNotIn("fonts.googleapis.com", response.content.decode())
+        with translation.override("ar"):
+            self.assertNotIn("as=font", self.client.get("/ar/")["Link"])
+
+
+class StreamingRenderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.country = Country.objects.create(name="Chile", slug="chile")
+        Article.objects.bulk_create(
+            Article(
+                title=f"Article {n}",
+                slug=f"article-{n}",
+                content="<p>Body</p>",
+                country=cls.country,
+                publish=True,
+            )
+            for n in range(STREAM_CHUNK_SIZE + 5)
+        )
+
+    def test_chrome_is_sent_before_the_list_is_read(self):
+        with translation.override("en"):
+            response = self.client.get("/en/investments/chile/articles/")
+            self.assertTrue(response.streaming)
+            chunks = iter(response.streaming_content)
+            with self.assertNumQueries(0):
+                head = next(chunks).decode()
+            self.assertIn("</head>", head)
+            self.assertNotIn("Article 0", head)
+            with self.assertNumQueries(1):
+                rest = b"".join(chunks).decode()
+        self.assertEqual(rest.count('<li><a href="/en/articles/article-'), 105)
+        self.assertIn("</html>", rest)
+
+    def test_streamed_work_is_timed_once_the_body_is_sent(self):
+        with translation.override("en"), self.assertLogs("app.requests") as logs:
+            response = self.client.get("/en/investments/chile/articles/")
+            self.assertEqual(logs.records, [])
+            with CaptureQueriesContext(connection) as queries:
+                b"".join(response.streaming_content)
+        (record,) = logs.records
+        self.assertEqual(record.timing["route"], "app:country_articles")
+        # The header went out first and holds only the queries before the list
+        header = re.search(r'"(\d+) queries"', response["Server-Timing"])
+        self.assertEqual(record.timing["db_queries"], int(header[1]) + len(queries))
+        self.assertGreater(record.timing["template_ms"], 0)
+
+    def test_empty_list_and_non_stream_values(self):
+        with translation.override("en"):
+            response = self.client.get("/en/search/", {"q": "nothing"})
+        body = b"".join(response.streaming_content).decode()
+        self.assertIn("No articles found.", body)
+        self.assertIn("No objects found.", body)
+        template = Template(
+            "{% load streaming %}{% streamfor x in items %}{{ x }},{% endstreamfor %}"
+        )
+        self.assertEqual(template.render(TemplateContext({"items": [1, 2]})), "1,2,")
+
+
+class CountryStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.chile = Country.objects.create(name="Chile", slug="chile")
+        cls.peru = Country.objects.create(name="Peru", slug="peru")
+
+    def _object(self, price, roi, **kwargs) -> InvestmentObject:
+        return InvestmentObject.objects.create(
+            title="Villa",
+            description="x",
+            country=kwargs.pop("country", self.chile),
+            price=price,
+            expected_roi=roi,
+            **kwargs,
+        )
+
+    def _stats(self, country) -> tuple:
+        stats = CountryStats.objects.get(country=country)
+        return (
+            stats.object_count,
+            stats.price_min,
+            stats.price_max,
+            stats.price_avg,
+            stats.roi_avg,
+        )
+
+    def assertMatchesRebuild(self):
+        def snapshot():
+            # A country never touched has no row until a rebuild writes an empty one
+            empty = {
+                f.attname: f.get_default()
+                for f in CountryStats._meta.concrete_fields
+                if not f.primary_key
+            }
+            rows = CountryStats.objects.order_by("pk").values(*empty)
+            return [row for row in rows if row != empty]
+
+        before = snapshot()
+        call_command("rebuild_country_stats", stdout=io.StringIO())
+        self.assertEqual(before, snapshot())
+
+    def test_objects_update_stats_incrementally(self):
+        cheap = self._object(Decimal("100"), Decimal("4"))
+        dear = self._object(Decimal("300"), Decimal("8"))
+        self._object(None, Decimal("6"))
+        self._object(Decimal("50"), Decimal("9"), active=False)
+        self.assertEqual(
+            self._stats(self.chile),
+            (3, Decimal("100"), Decimal("300"), Decimal("200.00"), Decimal("6.00")),
+        )
+        cheap.price = Decimal("200")
+        cheap.save()
+        dear.country = self.peru
+        dear.save()
+        self.assertEqual(
+            self._stats(self.chile),
+            (2, Decimal("200"), Decimal("200"), Decimal("200.00"), Decimal("5.00")),
+        )
+        self.assertEqual(
+            self._stats(self.peru)[:3], (1, Decimal("300"), Decimal("300"))
+        )
+        cheap.delete()
+        self.assertEqual(
+            self._stats(self.chile), (1, None, None, None, Decimal("6.00"))
+        )
+        self.assertMatchesRebuild()
+
+    def test_articles_update_count_and_latest_date(self):
+        old = Article.objects.create(
+            title="Old", content="x", country=self.chile, publish=True
+        )
+        new = Article.objects.create(
+            title="New", content="x", country=self.chile, publish=True
+        )
+        Article.objects.create(
+            title="Draft", content="x", country=self.chile, publish=False
+        )
+
+        def articles():
+            stats = CountryStats.objects.get(country=self.chile)
+            return stats.article_count, stats.latest_article_at
+
+        self.assertEqual(articles(), (2, new.created_at))
+        new.publish = False
+        new.save()
+        self.assertEqual(articles(), (1, old.created_at))
+        old.delete()
+        self.assertEqual(articles(), (0, None))
+        self.assertMatchesRebuild()
+
+    def test_deletes_survive_drifted_stats(self):
+        counted = Article.objects.create(
+            title="Counted", content="x", country=self.chile, publish=True
+        )
+        # bulk_create sends no signal: the stats count one article of two
+        Article.objects.bulk_create(
+            [Article(title="Bulk", slug="bulk", content="x", country=self.chile)]
+        )
+        Article.objects.filter(country=self.chile).order_by("-pk").first().delete()
+        counted.delete()
+        self.assertEqual(CountryStats.objects.get(country=self.chile).article_count, 0)
+
+    def test_country_page_shows_its_stats(self):
+        self._object(Decimal("100"), Decimal("4"))
+        self._object(Decimal("300"), Decimal("8"))
+        with translation.override("en"):
+            response = self.client.get("/en/investments/chile/")
+            body = b"".join(response.streaming_content).decode()
+        self.assertIn('<dl class="country-stats">', body)
+        self.assertIn("100.00 – 300.00", body)
+
+    def test_saves_that_cannot_change_stats_skip_the_lookup(self):
+        obj = self._object(Decimal("100"), Decimal("4"))
+        obj.title = "Renamed"
+        with self.assertNumQueries(1):
+            obj.save(update_fields=["title"])
+
+    def test_index_cards_come_from_one_query(self):
+        self._object(Decimal("100"), Decimal("4"))
+        self._object(Decimal("300"), Decimal("8"))
+        with translation.override("en"):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get("/en/investments/")
+        stats_queries = [q for q in queries if "app_countrystats" in q["sql"]]
+        self.assertEqual(len(stats_queries), 1)
+        self.assertIn("app_country", stats_queries[0]["sql"])
+        self.assertContains(response, "100.00 – 300.00")
+        self.assertContains(response, "200.00")
+        self.assertContains(response, "No listings yet.")
+
+
+class PortfolioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(name="Chile", slug="chile")
+        cls.villa, cls.farm = (
+            InvestmentObject.objects.create(
+                title=title,
+                description="x",
+                country=country,
+                price=Decimal("100000"),
+                expected_roi=roi,
+            )
+            for title, roi in (("Villa", Decimal("8")), ("Farm", Decimal("4")))
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_simulation_matches_compounding_and_is_reproducible(self):
+        args = (np.array([1000.0, 3000.0]), np.array([0.08, 0.04]), 10, 4000)
+        result = portfolio.simulate(*args, 0.15, 0.3, seed=7)
+        expected = 1000 * 1.08**10 + 3000 * 1.04**10
+        self.assertAlmostEqual(result["deterministic"][-1], expected, places=1)
+        self.assertEqual(result["percentiles"]["p50"][0], 4000.0)
+        self.assertLess(abs(result["mean"] / expected - 1), 0.03)
+        finals = [result["percentiles"][f"p{p}"][-1] for p in portfolio.PERCENTILES]
+        self.assertEqual(finals, sorted(finals))
+        self.assertEqual(result, portfolio.simulate(*args, 0.15, 0.3, seed=7))
+
+    def test_endpoint_projects_and_caches_by_portfolio(self):
+        query = {"holdings": f"{self.farm.pk}:3000,{self.villa.pk}:1000", "years": 5}
+        with translation.override("en"):
+            response = self.client.get("/en/portfolio/", query)
+            data = response.json()
+            self.assertEqual(len(data["years"]), 6)
+            self.assertEqual(data["invested"], 4000.0)
+            # The same portfolio in another order is the cached projection
+            query["holdings"] = f"{self.villa.pk}:1000,{self.farm.pk}:3000"
+            with mock.patch.object(portfolio, "simulate") as simulate:
+                self.assertEqual(self.client.get("/en/portfolio/", query).json(), data)
+            simulate.assert_not_called()
+
+    def test_draws_are_capped(self):
+        holdings = f"{self.villa.pk}:1000,{self.farm.pk}:1000"
+        with translation.override("en"), override_settings(PORTFOLIO_MAX_DRAWS=1000):
+            data = self.client.get(
+                "/en/portfolio/", {"holdings": holdings, "years": 10}
+            ).json()
+        self.assertEqual(data["paths"], 50)
+
+    def test_invalid_portfolios_are_rejected(self):
+        with translation.override("en"):
+            for holdings in ("", "x:10", f"{self.villa.pk}:-5", "999999:100"):
+                with self.subTest(holdings=holdings):
+                    response = self.client.get("/en/portfolio/", {"holdings": holdings})
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn("holdings", response.json()["errors"])
+
+    def test_object_page_shows_projection(self):
+        with translation.override("en"):
+            response = self.client.get(
+                f"/en/objects/{self.villa.pk}/", {"amount": "2000", "years": "3"}
+            )
+        # 2000 * 1.08**3
+        self.assertContains(response, "<td>2519.42</td>")
+        self.assertContains(response, "<td>3</td>")
+
+    def test_object_projections_are_shared_across_amounts(self):
+        roi = self.villa.expected_roi
+        with mock.patch.object(
+            portfolio, "simulate", wraps=portfolio.simulate
+        ) as simulate:
+            small = portfolio.project_holding(
+                portfolio.Holding(self.villa.pk, Decimal("2000")), roi, 5
+            )
+            large = portfolio.project_holding(
+                portfolio.Holding(self.villa.pk, Decimal("6000")), roi, 5
+            )
+        self.assertEqual(simulate.call_count, 1)
+        self.assertEqual(small["invested"], 2000)
+        self.assertEqual(large["invested"], 6000)
+        medians = zip(small["percentiles"]["p50"], large["percentiles"]["p50"])
+        for value, tripled in medians:
+            self.assertAlmostEqual(value * 3, tripled, delta=0.05)
+        self.assertEqual(
+            small["holdings"], [{"object": self.villa.pk, "amount": "2000"}]
+        )
+
+
+class DisplayCurrencyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.country = Country.objects.create(name="Chile", slug="chile")
+        InvestmentObject.objects.bulk_create(
+            InvestmentObject(
+                title=f"Object {n}",
+                description="x",
+                country=cls.country,
+                price=Decimal("100.00") if n else None,
+                expected_roi=Decimal("5"),
+            )
+            for n in range(STREAM_CHUNK_SIZE + 5)
+        )
+
+    def setUp(self):
+        self.rates = Path(tempfile.mkdtemp()) / "rates.json"
+        self.addCleanup(self.rates.unlink, missing_ok=True)
+        self._write_rates({"EUR": "0.5"})
+        override = override_settings(FX_RATES_FILE=self.rates, FX_CHECK_INTERVAL=0)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _write_rates(self, rates, mtime_ns=None):
+        self.rates.write_text(json.dumps({"base": "USD", "rates": rates}))
+        if mtime_ns is not None:
+            os.utime(self.rates, ns=(mtime_ns, mtime_ns))
+
+    def test_batch_conversion(self):
+        table = fx.get_table()
+        self.assertEqual(table.codes, ("EUR", "USD"))
+        prices = table.convert(
+            [Decimal("10"), None, Decimal("3"), Decimal("7")],
+            ["EUR", "USD", "USD", "XYZ"],
+            "USD",
+        )
+        self.assertEqual(
+            prices,
+            [
+                fx.Money(Decimal("20.00"), "USD"),
+                None,
+                fx.Money(Decimal("3.00"), "USD"),
+                fx.Money(Decimal("7"), "XYZ"),
+            ],
+        )
+
+    def test_rates_reload_when_the_file_changes(self):
+        def euros():
+            return fx.get_table().convert([Decimal(1)], "USD", "EUR")[0].amount
+
+        self.assertEqual(euros(), Decimal("0.50"))
+        self._write_rates({"EUR": "0.25", "GBP": "2"}, mtime_ns=10**18)
+        self.assertEqual(euros(), Decimal("0.25"))
+        self.assertIn("GBP", fx.get_table())
+
+    def test_large_amounts_convert_exactly(self):
+        table = fx.get_table()
+        amount = Decimal("123456789012345678.91")
+        self.assertEqual(
+            table.convert([amount, amount], ["USD", "EUR"], "USD"),
+            [
+                fx.Money(amount, "USD"),
+                fx.Money(Decimal("246913578024691357.82"), "USD"),
+            ],
+        )
+
+    def test_broken_rates_keep_the_last_good_ones(self):
+        self.assertIn("EUR", fx.get_table())
+        self.rates.write_text("{", encoding="utf-8")
+        os.utime(self.rates, ns=(10**18, 10**18))
+        with self.assertLogs("app.fx", "ERROR"):
+            self.assertIn("EUR", fx.get_table())
+            with translation.override("en"):
+                response = self.client.get(
+                    "/en/investments/chile/objects/", {"currency": "eur"}
+                )
+        self.assertEqual(response.status_code, 200)
+        self._write_rates({"EUR": "0.25", "GBP": "2"}, mtime_ns=2 * 10**18)
+        self.assertIn("GBP", fx.get_table())
+
+    def test_listings_in_the_chosen_currency(self):
+        with translation.override("en"):
+            response = self.client.get(
+                "/en/investments/chile/objects/", {"currency": "eur"}
+            )
+            self.assertEqual(response.cookies[fx.FX_COOKIE_NAME].value, "EUR")
+            self.assertIn("Cookie", response["Vary"])
+            self.assertContains(response, "— 50.00 EUR —", count=STREAM_CHUNK_SIZE + 4)
+            # The cookie keeps the choice; streamed lists convert chunk by chunk
+            response = self.client.get("/en/investments/chile/")
+            body = b"".join(response.streaming_content).decode()
+        self.assertEqual(body.count("— 50.00 EUR</li>"), STREAM_CHUNK_SIZE + 4)
+        self.assertIn('<option value="EUR" selected>', body)
+
+    def test_api_converts_on_request(self):
+        MetalPrice.objects.create(
+            metal="gold", price=Decimal("2000"), timestamp=timezone.now()
+        )
+        factory = RequestFactory()
+        data = json.loads(views.api_gold_price(factory.get("/")).content)
+        self.assertEqual((data["price"], data["currency"]), ("2000.000000", "USD"))
+        request = factory.get("/", {"currency": "EUR"})
+        data = json.loads(views.api_gold_price(request).content)
+        self.assertEqual((data["price"], data["currency"]), ("1000.00", "EUR"))
+
+
+class LanguageScopedQuerySetTests(TestCase):
+    def test_article_detail_selects_active_and_fallback_columns(self):
+        category = ArticleCategory.objects.create(name="Gold", slug="gold")
+        country = Country.objects.create(name="Chile", slug="chile")
+        Article.objects.create(
+            title="Gold in Chile",
+            title_es="Oro en Chile",
+            content="<p>Body</p>",
+            category=category,
+            country=country,
+        )
+        with translation.override("es"), CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/es/articles/oro-en-chile/")
+
+        self.assertContains(response, "Oro en Chile")
+        self.assertContains(response, "Chile")
+        sql = next(q["sql"] for q in ctx.captured_queries if "app_article" in q["sql"])
+        for column in ("title_es", "title_en", "content_es", "name_es"):
+            self.assertIn(f'"{column}"', sql)
+        for column in ("title_fr", "content_de", '"title"', "name_ru"):
+            self.assertNotIn(column, sql)
+
+    def test_for_language_reads_fallback_and_other_languages_lazily(self):
+        Country.objects.create(name="Chile", name_fr="Chili", slug="chile")
+        with translation.override("de"):
+            country = Country.objects.for_language().get()
+            with self.assertNumQueries(0):
+                self.assertEqual(str(country), "Chile")
+        self.assertEqual(country.name_fr, "Chili")
+
+
+@override_settings(LANGUAGES=[*settings.LANGUAGES, ("it", "Italiano")])
+class SparseTranslationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.country = Country.objects.create(name="Chile", slug="chile")
+        cls.articles = [
+            Article.objects.create(title=title, content="<p>Body</p>", country=country)
+            for title, country in (("Gold", cls.country), ("Fuel", cls.country))
+        ]
+
+    def test_page_of_objects_loads_rows_in_one_query(self):
+        store(self.articles[0], "it", title="Oro", content="<p>Testo</p>")
+        store(self.country, "it", name="Cile")
+
+        with translation.override("it"), self.assertNumQueries(2):
+            articles = list(Article.objects.for_language("country").order_by("pk"))
+            titles = [a.title for a in articles]
+            countries = {str(a.country) for a in articles}
+        self.assertEqual(titles, ["Oro", "Fuel"])
+        self.assertEqual(countries, {"Cile"})
+        self.assertEqual(articles[0].content, "<p>Testo</p>")
+
+    def test_public_view_renders_the_rows(self):
+        store(self.articles[1], "it", title="Carburante")
+        with translation.override("it"):
+            response = self.client.get("/it/investments/chile/articles/")
+        self.assertContains(response, "Carburante")
+        self.assertContains(response, "Gold")
+
+    def test_copy_columns_and_store_validation(self):
+        Article.objects.filter(pk=self.articles[0].pk).update(title_fr="Or")
+        self.assertEqual(copy_columns("fr"), 1)
+        row = Translation.objects.get(language="fr")
+        self.assertEqual(
+            (row.object_id, row.field, row.value), (self.articles[0].pk, "title", "Or")
+        )
+        with self.assertRaises(ValueError):
+            store(self.articles[0], "fr", title="Or")
+        with self.assertRaises(ValueError):
+            store(self.articles[0], "it", slug="oro")
+
+
+class PublicProfileTests(TestCase):
+    def test_public_profile_leaves_admin_out(self):
+        from InvestAllies import settings_public
+
+        for name in ("django.contrib.admin", "import_export", "ckeditor"):
+            self.assertNotIn(name, settings_public.INSTALLED_APPS)
+        with override_settings(ROOT_URLCONF=settings_public.ROOT_URLCONF):
+            self.assertEqual(self.client.get("/admin/").status_code, 404)
+            self.assertEqual(self.client.get("/ckeditor/upload/").status_code, 404)
+            self.assertEqual(self.client.get("/en/").status_code, 200)
+
+
+class WarmUpTests(TestCase):
+    def test_ready_only_after_warm_up(self):
+        self.addCleanup(setattr, warmup, "_ready", warmup.is_ready())
+        warmup._ready = False
+        self.assertEqual(self.client.get("/ready/").status_code, 503)
+
+        timings = warmup.warm_up(freeze=False)
+
+        self.assertEqual(set(timings), {"urls", "templates", "catalogs", "caches"})
+        response = self.client.get("/ready/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"ready": True})
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings_override = override_settings(
+            METRICS_DIR=self.directory, RATE_LIMIT_ENABLED=False
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_counters_histograms_and_price_age(self):
+        MetalPrice.objects.create(
+            metal="gold", price=Decimal("1950"), timestamp=timezone.now()
+        )
+        for _ in range(2):
+            self.client.get("/en/gold/price/")
+        # Another worker's file is summed in
+        other = metrics.MmapValues(self.directory / "1.db")
+        labels = [["route", "app:gold_price"], ["status", "200"]]
+        other.add(json.dumps([metrics.REQUESTS, labels]), 3)
+        other.close()
+
+        body = self.client.get("/metrics").content.decode()
+
+        self.assertIn(
+            'app_http_requests_total{route="app:gold_price",status="200"} 5', body
+        )
+        self.assertIn(
+            'app_http_request_duration_seconds_count{route="app:gold_price"} 2', body
+        )
+        self.assertIn(
+            'app_db_queries_per_request_bucket{route="app:gold_price",le="+Inf"} 2',
+            body,
+        )
+        self.assertRegex(body, r'app_price_age_seconds\{feed="metal",kind="gold"\} ')
+
+    def test_only_allowed_addresses_can_scrape(self):
+        response = self.client.get("/metrics", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, 404)
+        # A forged header counts for nothing, whatever the proxy settings
+        for hops in (0, 1):
+            with override_settings(RATE_LIMIT_TRUST_FORWARDED=hops):
+                response = self.client.get(
+                    "/metrics", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="127.0.0.1"
+                )
+                self.assertEqual(response.status_code, 404)
+        # Relayed by a local proxy: the peer is localhost, the client is not
+        response = self.client.get(
+            "/metrics", REMOTE_ADDR="127.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.9"
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+
+# Maximum SQL statements per view (any language), including the context
+# processors and everything the templates touch.
+QUERY_BUDGETS = {
+    "home": 4,
+    "investments_index": 2,
+    "country_detail": 4,
+    "country_articles": 3,
+    "country_objects": 3,
+    "article_detail": 2,
+    "object_detail": 2,
+    "gold_index": 3,
+    "gold_price": 2,
+    "gold_articles": 2,
+    "fuel_index": 2,
+    "fuel_price": 2,
+    "fuel_articles": 2,
+    "offshore_services": 2,
+    "legal_articles": 2,
+    "services_index": 2,
+    "service_detail": 2,
+    "landing_page": 2,
+    "category_feed": 3,
+    "country_feed": 3,
+}
+DEFAULT_QUERY_BUDGET = 1
+# Maximum rendered response size in bytes for the budget dataset.
+SIZE_BUDGETS = {
+    "category_feed": 4_000,
+    "country_feed": 4_000,
+}
+DEFAULT_SIZE_BUDGET = 16_000
+
+
+def _normalise_sql(sql: str) -> str:
+    """Strip literals so repeated statements compare equal."""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    return re.sub(r"\b\d+\b", "?", sql)
+
+
+@override_settings(RATE_LIMIT_ENABLED=False)
+class QueryBudgetTests(TestCase):
+    """Every view, in every language, stays within a fixed query and size
+    budget, and list views issue the same statements however many rows
+    they show (an N+1 shows up as a diff of the captured SQL)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.countries = [
+            Country.objects.create(name=name, slug=slugify(name))
+            for name in ("Portugal", "Chile")
+        ]
+        cls.categories = [
+            ArticleCategory.objects.create(name=name.title(), slug=name)
+            for name in ("gold", "fuel", "legal")
+        ]
+        cls.service = Service.objects.create(
+            title="Company formation", description="We set up companies."
+        )
+        LandingPage.objects.create(
+            title="Open a company", content="<p>Landing</p>", service=cls.service
+        )
+        now = timezone.now()
+        MetalPrice.objects.create(metal="gold", price=Decimal("1950.25"), timestamp=now)
+        FuelPrice.objects.create(price=Decimal("78.45"), timestamp=now)
+        SocialLink.objects.create(platform="x", url="https://x.example.com/ia")
+        cls._grow(1)
+
+    @classmethod
+    def _grow(cls, per_group: int) -> None:
+        """Add `per_group` articles per category/country pair and objects
+        and services per country."""
+        for country in cls.countries:
+            for category in cls.categories:
+                for _ in range(per_group):
+                    n = Article.objects.count()
+                    Article.objects.create(
+                        title=f"{category.name} in {country.name} {n}",
+                        content="<p>Body</p>",
+                        category=category,
+                        country=country,
+                        publish=True,
+                    )
+            for _ in range(per_group):
+                n = InvestmentObject.objects.count()
+                InvestmentObject.objects.create(
+                    title=f"Object {n}",
+                    description="Nice",
+                    country=country,
+                    price=Decimal("100000"),
+                    expected_roi=Decimal("7.5"),
+                )
+                Service.objects.create(title=f"Service {n}", description="x")
+
+    def _get(self, route: Route):
+        self.client.cookies[settings.LANGUAGE_COOKIE_NAME] = route.language
+        # The locale middleware activates the language for the thread;
+        # override() puts the previous one back afterwards.
+        with (
+            translation.override(route.language),
+            CaptureQueriesContext(connection) as ctx,
+        ):
+            response = self.client.get(route.path)
+            body = b"".join(response) if response.streaming else response.content
+        return response, body, [q["sql"] for q in ctx.captured_queries]
+
+    def test_views_stay_within_query_and_size_budgets(self):
+        routes = list(iter_routes())
+        self.assertEqual({r.name for r in routes}, set(route_names()))
+        for route in routes:
+            with self.subTest(route=route.key):
+                response, body, queries = self._get(route)
+                self.assertEqual(response.status_code, 200, route.path)
+                budget = QUERY_BUDGETS.get(route.name, DEFAULT_QUERY_BUDGET)
+                self.assertLessEqual(
+                    len(queries),
+                    budget,
+                    f"{route.path} ran {len(queries)} queries (budget {budget}):\n"
+                    + "\n".join(queries),
+                )
+                ceiling = SIZE_BUDGETS.get(route.name, DEFAULT_SIZE_BUDGET)
+                self.assertLessEqual(len(body), ceiling, route.path)
+
+    def test_query_count_does_not_grow_with_list_length(self):
+        before = {r.key: (r, self._get(r)[2]) for r in iter_routes()}
+        with translation.override("en"):
+            self._grow(3)
+        for key, (route, small) in before.items():
+            with self.subTest(route=key):
+                large = self._get(route)[2]
+                if len(large) == len(small):
+                    continue
+                diff = difflib.unified_diff(
+                    [_normalise_sql(q) for q in small],
+                    [_normalise_sql(q) for q in large],
+                    "1 row per list",
+                    "4 rows per list",
+                    lineterm="",
+                )
+                self.fail(
+                    f"{route.path}: {len(small)} -> {len(large)} queries\n"
+                    + "\n".join(diff)
+                )
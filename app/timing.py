@@ -0,0 +1,182 @@
+"""Per-request timing: database, template rendering and cache counters.
+
+`RequestTimingMiddleware` (in `app.middleware`) records every request into a
+`RequestMetrics` with `recording()`, which keeps it in a context variable.
+Database time is collected with a connection execute wrapper, template time
+by the `DjangoTemplates` backend below, and cache hits/misses by code that
+reads the cache through `cache_get`. Outside a request every recorder is a
+no-op.
+
+A streamed body is produced after the view returned; `TimedStream` records
+each of its chunks the same way, and counts the time spent producing them
+outside SQL as template time (the lists of a streamed page are rendered as
+they are read).
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from django.core.cache import cache
+from django.db import connections
+from django.template.backends import django as django_backend
+
+_MISSING = object()
+
+
+@dataclass
+class RequestMetrics:
+    route: str = ""
+    db_seconds: float = 0.0
+    db_queries: int = 0
+    template_seconds: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """`connection.execute_wrapper` hook timing every statement."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.db_queries += 1
+
+    def as_dict(self, total_seconds: float) -> Dict[str, Any]:
+        return {
+            "route": self.route,
+            "total_ms": round(total_seconds * 1000, 2),
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "db_queries": self.db_queries,
+            "template_ms": round(self.template_seconds * 1000, 2),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Format the metrics as a `Server-Timing` header value."""
+        return ", ".join(
+            (
+                f"total;dur={total_seconds * 1000:.1f}",
+                f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"',
+                f"tpl;dur={self.template_seconds * 1000:.1f}",
+                f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            )
+        )
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def using(metrics: RequestMetrics) -> Iterator[None]:
+    """Make `metrics` the current request's inside the block."""
+    token = _current.set(metrics)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def recording(metrics: RequestMetrics) -> Iterator[None]:
+    """Count the database, template and cache work of the block in `metrics`."""
+    with using(metrics), ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(metrics.db_wrapper))
+        yield
+
+
+class TimedStream:
+    """A streamed response body whose chunks are recorded in `metrics`.
+
+    `on_close` runs once, when the body is exhausted or the response closed
+    (also when the server sent it without iterating, e.g. a file wrapper).
+    """
+
+    def __init__(
+        self,
+        content: Iterable[bytes],
+        metrics: RequestMetrics,
+        on_close: Callable[[], None],
+    ) -> None:
+        self._iterator = iter(content)
+        self.metrics = metrics
+        self._on_close: Optional[Callable[[], None]] = on_close
+
+    def __iter__(self) -> "TimedStream":
+        return self
+
+    def __next__(self) -> bytes:
+        start = time.perf_counter()
+        db_before = self.metrics.db_seconds
+        with recording(self.metrics):
+            chunk = next(self._iterator, _MISSING)
+        elapsed = time.perf_counter() - start
+        self.metrics.template_seconds += elapsed - (self.metrics.db_seconds - db_before)
+        if chunk is _MISSING:
+            self.close()
+            raise StopIteration
+        return chunk
+
+    def close(self) -> None:
+        on_close, self._on_close = self._on_close, None
+        if on_close is not None:
+            on_close()
+
+
+def record_cache(hit: bool) -> None:
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+def cache_get(key: str, default: Any = None) -> Any:
+    """`cache.get` that counts a hit or miss for the current request."""
+    value = cache.get(key, _MISSING)
+    record_cache(value is not _MISSING)
+    return default if value is _MISSING else value
+
+
+class _TimedTemplate:
+    """Wrap a backend template and add its render time to the request."""
+
+    def __init__(self, template: Any) -> None:
+        self.template = template
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None) -> str:
+        metrics = _current.get()
+        if metrics is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.template_seconds += time.perf_counter() - start
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """The stock Django template backend with render timing."""
+
+    def from_string(self, template_code: str) -> _TimedTemplate:
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name: str) -> _TimedTemplate:
+        return _TimedTemplate(super().get_template(template_name))
@@ -1,6 +1,9 @@
+"""Public pages. `InvestAllies.urls_public` mounts them under a language
+prefix (`/es/`, `/en/`, ...), which selects the language of the page."""
+
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = "app"
 
@@ -23,6 +26,7 @@ urlpatterns = [
         name="country_objects",
     ),
     path("objects/<int:pk>/", views.object_detail, name="object_detail"),
+    path("portfolio/", views.portfolio, name="portfolio"),
     # Gold
     path("gold/", views.gold_index, name="gold_index"),
     path("gold/price/", views.gold_price, name="gold_price"),
@@ -54,4 +58,15 @@ urlpatterns = [
     # Utilities
     path("search/", views.search, name="search"),
     path("subscribe/", views.subscribe, name="subscribe"),
+    # Feeds
+    path(
+        "feeds/category/<slug:slug>/",
+        feeds.category_feed,
+        name="category_feed",
+    ),
+    path(
+        "feeds/country/<slug:slug>/",
+        feeds.country_feed,
+        name="country_feed",
+    ),
 ]
@@ -1,11 +1,30 @@
 import logging
+import re
+from pathlib import Path
 from typing import Any, Dict
 
-from django.http import HttpRequest, HttpResponse, JsonResponse, Http404
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponsePermanentRedirect,
+    JsonResponse,
+)
 from django.shortcuts import get_object_or_404, render
 from django.conf import settings
 from django.db.models import Q
+from django.urls import reverse
+from modeltranslation.utils import (
+    build_localized_fieldname,
+    get_language,
+    resolution_order,
+)
 
+from . import fx
+from . import metrics as app_metrics
+from .forms import LeadForm, PortfolioForm, ProjectionForm
+from .leads import lead_writer
 from .models import (
     Article,
     Country,
@@ -15,22 +34,22 @@ from .models import (
     MetalPrice,
     Service,
 )
+from .portfolio import Holding, project, project_holding, rows
+from .sitemaps import INDEX_NAME
+from .streaming import Stream, render_streaming
+from .warmup import is_ready
 
-# Logger for views
+# Logger for views; handlers and sampling are configured in settings.LOGGING
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-if not logger.handlers:
-    handler = logging.StreamHandler()
-    fmt = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
-    handler.setFormatter(fmt)
-    logger.addHandler(handler)
 
 
 def home(request: HttpRequest) -> HttpResponse:
     logger.info("home called")
-    countries = Country.objects.filter(active=True)
-    featured_objects = InvestmentObject.objects.filter(active=True)[:6]
-    latest_articles = Article.objects.filter(publish=True).order_by("-created_at")[:5]
+    countries = Country.objects.for_language().filter(active=True)
+    featured_objects = InvestmentObject.objects.for_language().filter(active=True)[:6]
+    latest_articles = (
+        Article.objects.for_language().filter(publish=True).order_by("-created_at")[:5]
+    )
     ctx: Dict[str, Any] = {
         "countries": countries,
         "featured_objects": featured_objects,
@@ -41,73 +60,148 @@ def home(request: HttpRequest) -> HttpResponse:
 
 def investments_index(request: HttpRequest) -> HttpResponse:
     logger.info("investments_index called")
-    countries = Country.objects.filter(active=True)
-    return render(request, "app/investments_index.html", {"countries": countries})
+    # Cards read `CountryStats` through the same join: one query for the list
+    countries = list(Country.objects.for_language("stats").filter(active=True))
+    currency = fx.currency_context(request)
+    fx.convert_prices(
+        [c.stats for c in countries if hasattr(c, "stats")],
+        currency["display_currency"],
+        fields=("price_min", "price_max", "price_avg"),
+    )
+    return render(
+        request, "app/investments_index.html", {"countries": countries, **currency}
+    )
 
 
 def country_detail(request: HttpRequest, country_slug: str) -> HttpResponse:
-    logger.info(f"country_detail called country_slug={country_slug}")
-    country = _get_by_slug_or_404(Country, country_slug, {"active": True})
-    articles = Article.objects.filter(country=country, publish=True).order_by(
-        "-created_at"
+    logger.info("country_detail called country_slug=%s", country_slug)
+    # The summary above the lists reads `CountryStats` through the same join
+    country = _get_by_slug_or_404(
+        Country, country_slug, {"active": True}, related=("stats",)
     )
-    objects = InvestmentObject.objects.filter(country=country, active=True)
-    return render(
+    redirect = _canonical_redirect(request, country_slug, country)
+    if redirect:
+        return redirect
+    articles = (
+        Article.objects.for_language()
+        .filter(country=country, publish=True)
+        .order_by("-created_at")
+    )
+    objects = InvestmentObject.objects.for_language().filter(
+        country=country, active=True
+    )
+    currency = fx.currency_context(request)
+    if hasattr(country, "stats"):
+        fx.convert_prices(
+            [country.stats],
+            currency["display_currency"],
+            fields=("price_min", "price_max", "price_avg"),
+        )
+    objects = fx.converted(objects, currency["display_currency"])
+    return render_streaming(
         request,
         "app/country_detail.html",
-        {"country": country, "articles": articles, "objects": objects},
+        {
+            "country": country,
+            "articles": Stream(articles),
+            "objects": Stream(objects),
+            **currency,
+        },
     )
 
 
 def country_articles(request: HttpRequest, country_slug: str) -> HttpResponse:
-    logger.info(f"country_articles called country_slug={country_slug}")
+    logger.info("country_articles called country_slug=%s", country_slug)
     country = _get_by_slug_or_404(Country, country_slug, {"active": True})
-    articles = Article.objects.filter(country=country, publish=True).order_by(
-        "-created_at"
+    redirect = _canonical_redirect(request, country_slug, country)
+    if redirect:
+        return redirect
+    articles = (
+        Article.objects.for_language()
+        .filter(country=country, publish=True)
+        .order_by("-created_at")
     )
-    return render(
+    return render_streaming(
         request,
         "app/country_articles.html",
-        {"country": country, "articles": articles},
+        {"country": country, "articles": Stream(articles)},
     )
 
 
 def article_detail(request: HttpRequest, slug: str) -> HttpResponse:
-    logger.info(f"article_detail called slug={slug}")
-    article = _get_by_slug_or_404(Article, slug, {"publish": True})
+    logger.info("article_detail called slug=%s", slug)
+    article = _get_by_slug_or_404(
+        Article, slug, {"publish": True}, related=("category", "country")
+    )
+    redirect = _canonical_redirect(request, slug, article)
+    if redirect:
+        return redirect
     return render(request, "app/article_detail.html", {"article": article})
 
 
 def country_objects(request: HttpRequest, country_slug: str) -> HttpResponse:
-    logger.info(f"country_objects called country_slug={country_slug}")
-    country = get_object_or_404(Country, slug=country_slug, active=True)
-    objects = InvestmentObject.objects.filter(country=country, active=True)
+    logger.info("country_objects called country_slug=%s", country_slug)
+    country = _get_by_slug_or_404(Country, country_slug, {"active": True})
+    redirect = _canonical_redirect(request, country_slug, country)
+    if redirect:
+        return redirect
+    objects = InvestmentObject.objects.for_language().filter(
+        country=country, active=True
+    )
+    currency = fx.currency_context(request)
+    objects = fx.convert_prices(objects, currency["display_currency"])
     return render(
         request,
         "app/country_objects.html",
-        {"country": country, "objects": objects},
+        {"country": country, "objects": objects, **currency},
     )
 
 
 def object_detail(request: HttpRequest, pk: int) -> HttpResponse:
-    logger.info(f"object_detail called pk={pk}")
-    obj = get_object_or_404(InvestmentObject, pk=pk, active=True)
-    return render(request, "app/object_detail.html", {"object": obj})
+    logger.info("object_detail called pk=%s", pk)
+    obj = get_object_or_404(
+        InvestmentObject.objects.for_language("country"), pk=pk, active=True
+    )
+    currency = fx.currency_context(request)
+    fx.convert_prices([obj], currency["display_currency"])
+    form = ProjectionForm(request.GET if "amount" in request.GET else None)
+    values = form.values()
+    projection = None
+    if values is not None:
+        amount, years = values
+        projection = project_holding(Holding(obj.pk, amount), obj.expected_roi, years)
+    return render(
+        request,
+        "app/object_detail.html",
+        {
+            "object": obj,
+            "form": form,
+            "projection": projection,
+            "projection_rows": rows(projection) if projection else [],
+            **currency,
+        },
+    )
 
 
 def gold_index(request: HttpRequest) -> HttpResponse:
     logger.info("gold_index called")
     latest = MetalPrice.objects.filter(metal="gold").first()
-    articles = Article.objects.filter(category__slug="gold")[:10]
+    articles = _category_articles("gold")[:10]
+    currency = fx.currency_context(request)
+    fx.convert_prices([latest] if latest else [], currency["display_currency"])
     return render(
-        request, "app/gold_index.html", {"price": latest, "articles": articles}
+        request,
+        "app/gold_index.html",
+        {"price": latest, "articles": articles, **currency},
     )
 
 
 def gold_price(request: HttpRequest) -> HttpResponse:
     logger.info("gold_price called")
     latest = MetalPrice.objects.filter(metal="gold").first()
-    return render(request, "app/gold_price.html", {"price": latest})
+    currency = fx.currency_context(request)
+    fx.convert_prices([latest] if latest else [], currency["display_currency"])
+    return render(request, "app/gold_price.html", {"price": latest, **currency})
 
 
 def gold_calculator(request: HttpRequest) -> HttpResponse:
@@ -117,8 +211,10 @@ def gold_calculator(request: HttpRequest) -> HttpResponse:
 
 def gold_articles(request: HttpRequest) -> HttpResponse:
     logger.info("gold_articles called")
-    articles = Article.objects.filter(category__slug="gold", publish=True)
-    return render(request, "app/gold_articles.html", {"articles": articles})
+    articles = _category_articles("gold")
+    return render_streaming(
+        request, "app/gold_articles.html", {"articles": Stream(articles)}
+    )
 
 
 def gold_buy(request: HttpRequest) -> HttpResponse:
@@ -130,13 +226,25 @@ def gold_buy(request: HttpRequest) -> HttpResponse:
 def fuel_index(request: HttpRequest) -> HttpResponse:
     logger.info("fuel_index called")
     latest = FuelPrice.objects.first()
-    return render(request, "app/fuel_index.html", {"price": latest})
+    currency = fx.currency_context(request)
+    fx.convert_prices(
+        [latest] if latest else [],
+        currency["display_currency"],
+        currency_attr="currency",
+    )
+    return render(request, "app/fuel_index.html", {"price": latest, **currency})
 
 
 def fuel_price(request: HttpRequest) -> HttpResponse:
     logger.info("fuel_price called")
     latest = FuelPrice.objects.first()
-    return render(request, "app/fuel_price.html", {"price": latest})
+    currency = fx.currency_context(request)
+    fx.convert_prices(
+        [latest] if latest else [],
+        currency["display_currency"],
+        currency_attr="currency",
+    )
+    return render(request, "app/fuel_price.html", {"price": latest, **currency})
 
 
 def fuel_calculator(request: HttpRequest) -> HttpResponse:
@@ -146,8 +254,10 @@ def fuel_calculator(request: HttpRequest) -> HttpResponse:
 
 def fuel_articles(request: HttpRequest) -> HttpResponse:
     logger.info("fuel_articles called")
-    articles = Article.objects.filter(category__slug="fuel", publish=True)
-    return render(request, "app/fuel_articles.html", {"articles": articles})
+    articles = _category_articles("fuel")
+    return render_streaming(
+        request, "app/fuel_articles.html", {"articles": Stream(articles)}
+    )
 
 
 def fuel_offers(request: HttpRequest) -> HttpResponse:
@@ -168,7 +278,7 @@ def offshore_jurisdictions(request: HttpRequest) -> HttpResponse:
 
 def offshore_services(request: HttpRequest) -> HttpResponse:
     logger.info("offshore_services called")
-    services = Service.objects.filter(active=True)
+    services = Service.objects.for_language().filter(active=True)
     return render(request, "app/offshore_services.html", {"services": services})
 
 
@@ -179,33 +289,59 @@ def legal_index(request: HttpRequest) -> HttpResponse:
 
 def legal_articles(request: HttpRequest) -> HttpResponse:
     logger.info("legal_articles called")
-    articles = Article.objects.filter(category__slug="legal", publish=True)
-    return render(request, "app/legal_articles.html", {"articles": articles})
+    articles = _category_articles("legal")
+    return render_streaming(
+        request, "app/legal_articles.html", {"articles": Stream(articles)}
+    )
 
 
 def services_index(request: HttpRequest) -> HttpResponse:
     logger.info("services_index called")
-    services = Service.objects.filter(active=True)
+    services = Service.objects.for_language().filter(active=True)
     return render(request, "app/services_index.html", {"services": services})
 
 
 def service_detail(request: HttpRequest, slug: str) -> HttpResponse:
-    logger.info(f"service_detail called slug={slug}")
+    logger.info("service_detail called slug=%s", slug)
     service = _get_by_slug_or_404(Service, slug, {"active": True})
+    redirect = _canonical_redirect(request, slug, service)
+    if redirect:
+        return redirect
     return render(request, "app/service_detail.html", {"service": service})
 
 
 def landing_page(request: HttpRequest, slug: str) -> HttpResponse:
-    logger.info(f"landing_page called slug={slug}")
-    landing = _get_by_slug_or_404(LandingPage, slug, {"publish": True})
+    logger.info("landing_page called slug=%s", slug)
+    landing = _get_by_slug_or_404(
+        LandingPage, slug, {"publish": True}, related=("service",)
+    )
+    redirect = _canonical_redirect(request, slug, landing)
+    if redirect:
+        return redirect
     return render(request, "app/landing_page.html", {"landing": landing})
 
 
-def _get_by_slug_or_404(model, slug: str, extra_filters: dict | None = None):
+def _category_articles(slug: str):
+    """Published articles of a fixed section category (gold, fuel, legal).
+
+    The section slugs are the default-language ones; filtering on
+    `category__slug` would be rewritten to the active language's column.
+    """
+    default = getattr(settings, "MODELTRANSLATION_DEFAULT_LANGUAGE", "en")
+    column = f"category__slug_{default.replace('-', '_')}"
+    return Article.objects.for_language().filter(publish=True, **{column: slug})
+
+
+def _get_by_slug_or_404(
+    model, slug: str, extra_filters: dict | None = None, related: tuple = ()
+):
     """Try to resolve an instance by slug across translated slug fields.
 
-    - Tries the current language slug first, then the base `slug`, then other
-      translated slug fields. Raises Http404 if nothing matches.
+    - Tries the current language slug and its fallbacks first, then the base
+      `slug` and the other translated slug fields. Raises Http404 if nothing
+      matches.
+    - Loads the active language's columns only, with the `related` foreign
+      keys (see `TranslatedQuerySet.for_language`).
     """
     extra_filters = extra_filters or {}
     lang_codes = getattr(settings, "MODELTRANSLATION_LANGUAGES", [])
@@ -218,37 +354,116 @@ def _get_by_slug_or_404(model, slug: str, extra_filters: dict | None = None):
     # Determine which fields actually exist on the model to avoid FieldError
     existing = {f.name for f in model._meta.get_fields() if hasattr(f, "name")}
 
+    qs = model.objects.for_language(*related).filter(**extra_filters)
+    # Canonical URLs carry the active language's slug, or its fallback: look
+    # up those columns first, the other languages' only for redirects
+    active = [
+        build_localized_fieldname("slug", code)
+        for code in resolution_order(get_language())
+    ]
     q = Q()
-    for field in candidates:
+    for field in active:
         if field in existing:
             q |= Q(**{field: slug})
+    if q:
+        obj = qs.filter(q).first()
+        if obj:
+            return obj
+
+    q = Q()
+    for field in candidates:
+        if field in existing and field not in active:
+            q |= Q(**{field: slug})
 
     if not q:
         raise Http404("Not found")
 
-    qs = model.objects.filter(**extra_filters).filter(q)
-    obj = qs.first()
+    obj = qs.filter(q).first()
     if not obj:
         raise Http404("Not found")
     return obj
 
 
+def _canonical_redirect(
+    request: HttpRequest, slug: str, obj
+) -> HttpResponsePermanentRedirect | None:
+    """Redirect to the URL with `obj`'s slug in the active language when
+    `slug`, from the current URL, is another one (another language's slug)."""
+    if not obj.slug or obj.slug == slug:
+        return None
+    match = request.resolver_match
+    kwargs = {k: obj.slug if v == slug else v for k, v in match.kwargs.items()}
+    url = reverse(match.view_name, kwargs=kwargs)
+    if request.META.get("QUERY_STRING"):
+        url = f"{url}?{request.META['QUERY_STRING']}"
+    return HttpResponsePermanentRedirect(url)
+
+
 def search(request: HttpRequest) -> HttpResponse:
     q = request.GET.get("q", "").strip()
-    logger.info(f"search called q={q}")
-    articles = Article.objects.filter(title__icontains=q)[:20] if q else []
-    objects = InvestmentObject.objects.filter(title__icontains=q)[:20] if q else []
-    return render(
-        request, "app/search.html", {"q": q, "articles": articles, "objects": objects}
+    logger.info("search called q=%s", q)
+    articles = (
+        Article.objects.for_language().filter(title__icontains=q)[:20] if q else []
+    )
+    objects = (
+        InvestmentObject.objects.for_language().filter(title__icontains=q)[:20]
+        if q
+        else []
+    )
+    return render_streaming(
+        request,
+        "app/search.html",
+        {"q": q, "articles": Stream(articles), "objects": Stream(objects)},
     )
 
 
 def subscribe(request: HttpRequest) -> HttpResponse:
-    logger.info(f"subscribe called method={request.method}")
+    logger.info("subscribe called method=%s", request.method)
     if request.method == "POST":
-        # minimal handling: create Lead entry or similar in future
-        return render(request, "app/subscribe_thanks.html", {})
-    return render(request, "app/subscribe.html", {})
+        form = LeadForm(request.POST)
+        if form.is_valid():
+            # Acknowledge now; the lead writer inserts it with the next batch
+            lead_writer.submit(form.cleaned_data)
+            return render(request, "app/subscribe_thanks.html", {})
+        return render(request, "app/subscribe.html", {"form": form}, status=400)
+    return render(request, "app/subscribe.html", {"form": LeadForm()})
+
+
+def portfolio(request: HttpRequest) -> JsonResponse:
+    """Projected value of `holdings=<object id>:<amount>,...` over `years`
+    (see `app.portfolio`)."""
+    logger.info("portfolio called holdings=%s", request.GET.get("holdings"))
+    form = PortfolioForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    holdings = form.cleaned_data["holdings"]
+    rois = dict(
+        InvestmentObject.objects.filter(
+            pk__in=[h.object_id for h in holdings], active=True
+        ).values_list("pk", "expected_roi")
+    )
+    missing = sorted({h.object_id for h in holdings} - rois.keys())
+    if missing:
+        errors = {"holdings": [f"Unknown investment objects: {missing}"]}
+        return JsonResponse({"errors": errors}, status=400)
+    return JsonResponse(project(holdings, rois, form.cleaned_data["years"]))
+
+
+def _api_price(
+    request: HttpRequest, row: Any, currency_attr: str | None = None
+) -> Dict[str, Any]:
+    """`price` and `currency` of `row` for the JSON APIs: as stored, or in
+    the `?currency=` of the request."""
+    if row is None:
+        return {"price": None, "currency": fx.BASE_CURRENCY}
+    target = fx.requested_currency(request)
+    if target is not None:
+        fx.convert_prices([row], target, currency_attr=currency_attr)
+        price = row.display_price
+    else:
+        stored = getattr(row, currency_attr) if currency_attr else fx.BASE_CURRENCY
+        price = fx.Money(row.price, stored)
+    return {"price": str(price.amount), "currency": price.currency}
 
 
 def api_gold_price(request: HttpRequest) -> JsonResponse:
@@ -256,9 +471,8 @@ def api_gold_price(request: HttpRequest) -> JsonResponse:
     latest = MetalPrice.objects.filter(metal="gold").first()
     data: Dict[str, Any] = {
         "metal": "gold",
-        "price": str(latest.price) if latest else None,
         "timestamp": latest.timestamp.isoformat() if latest else None,
-        "currency": "USD",
+        **_api_price(request, latest),
     }
     return JsonResponse(data)
 
@@ -268,8 +482,49 @@ def api_fuel_price(request: HttpRequest) -> JsonResponse:
     latest = FuelPrice.objects.first()
     data: Dict[str, Any] = {
         "fuel": latest.fuel_type if latest else "platts",
-        "price": str(latest.price) if latest else None,
         "timestamp": latest.timestamp.isoformat() if latest else None,
-        "currency": latest.currency if latest else "USD",
+        **_api_price(request, latest, currency_attr="currency"),
     }
     return JsonResponse(data)
+
+
+_SITEMAP_SHARD_RE = re.compile(r"^[a-z]+-\d{4}\.xml\.gz$")
+
+
+def sitemap_index(request: HttpRequest) -> FileResponse:
+    """Serve the sitemap index written by `manage.py build_sitemaps`."""
+    path = Path(settings.SITEMAP_ROOT) / INDEX_NAME
+    if not path.is_file():
+        raise Http404("Sitemap has not been generated")
+    return FileResponse(open(path, "rb"), content_type="application/xml")
+
+
+def sitemap_shard(request: HttpRequest, name: str) -> FileResponse:
+    """Serve one pre-compressed sitemap shard as-is."""
+    path = Path(settings.SITEMAP_ROOT) / name
+    if not _SITEMAP_SHARD_RE.match(name) or not path.is_file():
+        raise Http404("Not found")
+    return FileResponse(open(path, "rb"), content_type="application/gzip")
+
+
+def ready(request: HttpRequest) -> JsonResponse:
+    """Readiness probe: 503 until this worker has finished `app.warmup`."""
+    warm = is_ready()
+    return JsonResponse({"ready": warm}, status=200 if warm else 503)
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Prometheus scrape endpoint, for the addresses in METRICS_ALLOWED_IPS.
+
+    Only the peer address counts, never `X-Forwarded-For`, which clients can
+    forge; and a request relayed by a proxy is refused outright, since its
+    peer is the proxy (often localhost) whoever the client is. Scrape the
+    workers directly.
+    """
+    relayed = "HTTP_X_FORWARDED_FOR" in request.META
+    peer = request.META.get("REMOTE_ADDR", "")
+    if relayed or peer not in settings.METRICS_ALLOWED_IPS:
+        raise Http404("Not found")
+    return HttpResponse(
+        app_metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
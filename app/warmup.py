@@ -0,0 +1,126 @@
+"""Warm a worker up before it takes traffic.
+
+Everything Django otherwise does lazily on the first requests after a start:
+
+* URLs: compile every pattern's regex and build the reverse lookup tables, in
+  every language (Django keeps them per language);
+* templates: load and compile every template under `app/templates/app/`
+  through the cached loader;
+* translations: load the catalogs of every language in `settings.LANGUAGES`;
+* reference data: content types of the app's models, the rate-limit rules
+  and the exchange rates.
+
+Then database connections are closed and, with `freeze=True`, `gc.freeze()`
+moves every object created so far out of the collector's reach, so forked
+workers keep sharing those pages instead of copying them when a collection
+touches them. `InvestAllies/wsgi.py` and `asgi.py` call `warm_up()` when
+`settings.WARMUP_ON_LOAD` is set; with gunicorn's `preload_app` (see
+`InvestAllies/gunicorn.py`) that happens once, in the master, before the
+fork. `is_ready()` backs the `/ready/` endpoint.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import URLPattern, URLResolver, get_resolver, resolve, reverse
+from django.utils import translation
+
+from . import fx, ratelimit
+
+logger = logging.getLogger(__name__)
+
+_ready = False
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+def _patterns(patterns: Iterable) -> Iterable[URLPattern | URLResolver]:
+    for pattern in patterns:
+        yield pattern
+        if isinstance(pattern, URLResolver):
+            yield from _patterns(pattern.url_patterns)
+
+
+def resolve_urls() -> int:
+    """Compile every URL pattern in every language; return the pattern count."""
+    patterns: list = []
+    for code, _ in settings.LANGUAGES:
+        with translation.override(code):
+            resolver = get_resolver()
+            # Both are built lazily, and once per language
+            resolver.reverse_dict
+            patterns = list(_patterns(resolver.url_patterns))
+            for pattern in patterns:
+                pattern.pattern.regex
+            resolve(reverse("app:home"))
+    return len(patterns)
+
+
+def compile_templates() -> int:
+    """Load every template of the app through the cached loader."""
+    root = Path(apps.get_app_config("app").path) / "templates"
+    names = sorted(
+        path.relative_to(root).as_posix() for path in (root / "app").rglob("*.html")
+    )
+    for name in names:
+        get_template(name)
+    return len(names)
+
+
+def activate_catalogs() -> int:
+    codes = [code for code, _ in settings.LANGUAGES]
+    for code in codes:
+        with translation.override(code):
+            translation.gettext("")
+    return len(codes)
+
+
+def prime_caches() -> int:
+    models = list(apps.get_app_config("app").get_models())
+    ContentType.objects.get_for_models(*models)
+    ratelimit.get_rules()
+    fx.get_table()
+    return len(models)
+
+
+def _close_connections() -> None:
+    # Inherited SQLite handles must not be used by forked workers
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def warm_up(freeze: bool = True) -> Dict[str, float]:
+    """Run every step; return the seconds each took."""
+    global _ready
+    timings: Dict[str, float] = {}
+    steps = {
+        "urls": resolve_urls,
+        "templates": compile_templates,
+        "catalogs": activate_catalogs,
+        "caches": prime_caches,
+    }
+    for name, step in steps.items():
+        start = time.perf_counter()
+        count = step()
+        timings[name] = time.perf_counter() - start
+        logger.debug("warm-up %s: %d in %.1fms", name, count, timings[name] * 1000)
+    _close_connections()
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    _ready = True
+    logger.info("warm-up done in %.1fms", sum(timings.values()) * 1000)
+    return timings